@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Classification Benchmark - keyword ladder vs compiled rule table
+Times per-line lab type / task classification on checker-script messages
+Usage: python3 benchmarks/bench_classification.py [--lines N] [--config path]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from grade_labs import LabClassifier, DEFAULT_CONFIG_FILE
+
+# Messages logged by scripts/checklabs/*.sh (after the "STATUS: " prefix)
+CHECKER_MESSAGES = [
+    "User sally exists", "User sally does not exist", "Home directory missing",
+    "Found 7 source files", "No source files found", "Collection directory missing",
+    "Found 7 collected files", "No files collected", "Find command executed successfully",
+    "Partial collection detected", "Find command not executed", "Command found in history",
+    "All checks successful", "Some checks failed",
+    "/etc/fstab not found", "usershare found in fstab", "usershare correctly configured for /home/shares",
+    "usershare mount point differs", "usershare not in fstab", "Mount point /home/shares does not exist",
+    "Mount detected at /home/shares", "usershare mounted at /home/shares", "Non-usershare mount at /home/shares",
+    "Nothing mounted at /home/shares", "User eric does not exist", "User eric home in /home/shares",
+    "User eric home inside /home/shares", "User eric home not in /home/shares",
+    "eric home directory exists", "eric home directory does not exist",
+    "/etc/yum.repos.d directory missing", "Repository directory exists", "example.com found in 2 repo files",
+    "example.com not found in repo files", "baseurl with example.com found", "mirrorlist with example.com found",
+    "DNF command found in root history", "DNF activity found in /var/log/dnf.log",
+    "example.com repo active in DNF", "Manual creation commands found",
+    "Both DNF and manual creation evidence found", "DNF creation method confirmed",
+    "Manual creation method confirmed", "Repository creation method unclear",
+    "example.com repository configured", "example.com repository missing",
+]
+
+def legacy_classify(message):
+    """The if/elif keyword ladder LabGrader used before the rule table"""
+    message_lower = message.lower()
+    
+    if any(keyword in message_lower for keyword in ['user', 'sally', 'eric', 'file collection']):
+        lab_type = 'User Management'
+    elif any(keyword in message_lower for keyword in ['nfs', 'mount', 'shares', 'usershare']):
+        lab_type = 'NFS Configuration'
+    elif any(keyword in message_lower for keyword in ['yum', 'dnf', 'repository', 'repo', 'example.com']):
+        lab_type = 'Package Management'
+    elif any(keyword in message_lower for keyword in ['network', 'service', 'daemon']):
+        lab_type = 'Network Services'
+    elif any(keyword in message_lower for keyword in ['file', 'directory', 'permission']):
+        lab_type = 'File System'
+    else:
+        lab_type = 'General'
+    
+    if 'user' in message_lower and 'exists' in message_lower:
+        task_name = 'User Creation'
+    elif 'user' in message_lower and 'home' in message_lower:
+        task_name = 'User Home Directory'
+    elif 'files' in message_lower and ('owned' in message_lower or 'collection' in message_lower):
+        task_name = 'File Ownership'
+    elif 'mount' in message_lower and any(x in message_lower for x in ['nfs', 'shares']):
+        task_name = 'NFS Mount'
+    elif 'fstab' in message_lower:
+        task_name = 'FSTAB Configuration'
+    elif any(x in message_lower for x in ['repository', 'repo']) and 'example.com' in message_lower:
+        task_name = 'Repository Configuration'
+    elif 'dnf' in message_lower and ('command' in message_lower or 'usage' in message_lower):
+        task_name = 'DNF Command Usage'
+    elif 'verification passed' in message_lower or 'verification failed' in message_lower:
+        if 'nfs' in message_lower:
+            task_name = 'NFS Lab Complete'
+        elif 'repo' in message_lower or 'yum' in message_lower:
+            task_name = 'Repository Lab Complete'
+        else:
+            task_name = 'User Lab Complete'
+    else:
+        task_name = ' '.join(message.split()[:3]).title()
+    
+    return lab_type, task_name
+
+def time_per_line(classify, messages):
+    """Nanoseconds per message for the given classify function"""
+    start = time.perf_counter()
+    for message in messages:
+        classify(message)
+    return (time.perf_counter() - start) / len(messages) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark log message classification')
+    parser.add_argument('--lines', type=int, default=200000, help='Messages to classify (default: 200000)')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_FILE), help='config.json with the "labs" rules')
+    args = parser.parse_args()
+    
+    random.seed(42)
+    messages = [random.choice(CHECKER_MESSAGES) for _ in range(args.lines)]
+    
+    classifier = LabClassifier.from_config(args.config)
+    mismatches = [message for message in CHECKER_MESSAGES if classifier.classify(message) != legacy_classify(message)]
+    if mismatches:
+        print(f"Error: rule table disagrees with the keyword ladder on: {mismatches}")
+        return 1
+    
+    uncached = LabClassifier.from_config(args.config)
+    results = [
+        ('keyword ladder (before)', time_per_line(legacy_classify, messages)),
+        ('rule table, uncached', time_per_line(uncached._classify, messages)),
+        ('rule table, LRU cached (after)', time_per_line(LabClassifier.from_config(args.config).classify, messages)),
+    ]
+    
+    print(f"Classified {args.lines} messages ({len(CHECKER_MESSAGES)} distinct)")
+    for name, ns_per_line in results:
+        print(f"  {name:32} {ns_per_line:8.0f} ns/line")
+    print(f"Speedup (cached vs ladder): {results[0][1] / results[2][1]:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Memory Benchmark - bytes retained per parsed log line
+Compares the per-line dicts, the compact column store (with and without raw
+lines) and streaming aggregation on a synthetic labresults.log
+Usage: python3 benchmarks/bench_memory.py [--lines N] [--log-file path]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from grade_labs import LabGrader, LabClassifier, DEFAULT_CONFIG_FILE
+from generate_log import generate_log
+
+MODES = [
+    ('dicts (default)', {}),
+    ('dicts, no raw lines', {'keep_raw_lines': False}),
+    ('compact columns', {'compact': True}),
+    ('compact, no raw lines', {'compact': True, 'keep_raw_lines': False}),
+    ('streaming', {'streaming': True}),
+]
+
+def measure(log_file, classifier, options):
+    """Parse log_file and return (bytes retained, parse seconds, entries)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    grader = LabGrader(log_file, classifier=classifier, **options)
+    grader.parse_log_file()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, elapsed, grader.total_entries
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory retained per parsed log line')
+    parser.add_argument('--lines', type=int, default=300000, help='Synthetic log lines (default: 300000)')
+    parser.add_argument('--log-file', help='Measure an existing log instead of a synthetic one')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_FILE), help='config.json with the "labs" rules')
+    args = parser.parse_args()
+    
+    classifier = LabClassifier.from_config(args.config)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_file = args.log_file
+        if log_file is None:
+            log_file = Path(temp_dir) / 'labresults.log'
+            generate_log(log_file, args.lines)
+            
+        # Warm the classifier cache so it is not counted against the first mode
+        measure(log_file, classifier, {'streaming': True})
+        
+        print(f"Parsed {log_file}")
+        for name, options in MODES:
+            retained, elapsed, entries = measure(log_file, classifier, options)
+            print(f"  {name:24} {retained / max(entries, 1):8.1f} bytes/line  {elapsed:6.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark - grade_labs.py phase timings from 10k to 10M log lines
+Times parse_log_file, calculate_lab_results and each generate_*_report on
+synthetic logs and writes throughput and peak RSS to a JSON results file
+Usage: python3 benchmarks/bench_scaling.py [--sizes 10000,1000000,10000000] [--output results.json]
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from grade_labs import LabGrader
+from generate_log import generate_log
+
+DEFAULT_SIZES = '10000,1000000,10000000'
+
+# LabGrader options for each --modes entry
+MODES = {
+    'default': {},
+    'streaming': {'streaming': True},
+    'compact': {'compact': True, 'keep_raw_lines': False},
+}
+
+REPORT_METHODS = ['generate_text_report', 'generate_json_report', 'generate_html_report']
+
+def _parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_phases(log_file, mode):
+    """Time each grading phase on log_file; runs in a fresh process per measurement"""
+    phases = {}
+    grader = LabGrader(log_file, **MODES[mode])
+    
+    start = time.perf_counter()
+    grader.parse_log_file()
+    phases['parse_log_file'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    lab_results = grader.calculate_lab_results()
+    phases['calculate_lab_results'] = time.perf_counter() - start
+    
+    for method in REPORT_METHODS:
+        start = time.perf_counter()
+        getattr(grader, method)(lab_results)
+        phases[method] = time.perf_counter() - start
+        
+    return {
+        'entries': grader.total_entries,
+        'phases': phases,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def measure(log_file, lines, mode):
+    """Run run_phases in a child process so peak RSS covers only that measurement"""
+    completed = subprocess.run([sys.executable, __file__, '--worker', str(log_file), '--modes', mode],
+                               capture_output=True, text=True)
+    result = {'lines': lines, 'mode': mode, 'log_bytes': Path(log_file).stat().st_size}
+    if completed.returncode != 0:
+        # e.g. killed for running out of memory on the largest logs
+        stderr_lines = completed.stderr.strip().splitlines()
+        result['error'] = stderr_lines[-1] if stderr_lines else f"exit status {completed.returncode}"
+        return result
+        
+    result.update(json.loads(completed.stdout))
+    parse_seconds = result['phases']['parse_log_file']
+    result['total_seconds'] = sum(result['phases'].values())
+    result['parse_lines_per_second'] = lines / parse_seconds if parse_seconds else None
+    result['parse_mb_per_second'] = result['log_bytes'] / (1024 * 1024) / parse_seconds if parse_seconds else None
+    return result
+
+def git_revision():
+    """Short commit hash of the checkout being measured, if it is a git repository"""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                   cwd=Path(__file__).resolve().parent)
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+def compare(results, baseline_file):
+    """Print each phase's time relative to a previous results file"""
+    with open(baseline_file, 'r') as f:
+        baseline = {(entry['lines'], entry['mode']): entry for entry in json.load(f)['results']}
+        
+    print(f"\nCompared with {baseline_file} (ratio < 1.0 is faster):")
+    for result in results:
+        before = baseline.get((result['lines'], result['mode']))
+        if before is None or 'error' in before or 'error' in result:
+            continue
+        ratios = ', '.join(f"{name} {result['phases'][name] / seconds:.2f}"
+                           for name, seconds in before['phases'].items() if seconds and name in result['phases'])
+        print(f"  {result['lines']:>10} lines, {result['mode']}: {ratios}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark grading phases on synthetic logs of increasing size')
+    parser.add_argument('--sizes', type=_parse_list, default=DEFAULT_SIZES,
+                       help=f'Comma-separated log line counts (default: {DEFAULT_SIZES})')
+    parser.add_argument('--modes', type=_parse_list, default='default,streaming',
+                       help=f"Comma-separated grader modes: {', '.join(MODES)} (default: default,streaming)")
+    parser.add_argument('--students', type=int, default=100, help='Students per synthetic cohort (default: 100)')
+    parser.add_argument('--jsonl', action='store_true',
+                       help='Generate structured JSONL results (LAB_RESULTS_FORMAT=jsonl) instead of text lines')
+    parser.add_argument('--log-dir', help='Keep generated logs here and reuse them on later runs')
+    parser.add_argument('--output', default='bench_scaling_results.json',
+                       help='Results file (default: bench_scaling_results.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    unknown = [mode for mode in args.modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown mode {', '.join(unknown)} (choose from {', '.join(MODES)})")
+        
+    if args.worker:
+        print(json.dumps(run_phases(args.worker, args.modes[0])))
+        return 0
+        
+    try:
+        sizes = [int(size) for size in args.sizes]
+    except ValueError:
+        parser.error(f"--sizes must be integers: {','.join(args.sizes)}")
+        
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        log_dir = Path(args.log_dir or temp_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        
+        for lines in sizes:
+            suffix = '.jsonl' if args.jsonl else '.log'
+            log_file = log_dir / f"labresults_{lines}_{args.students}{suffix}"
+            if not log_file.exists():
+                print(f"Generating {lines} lines...", flush=True)
+                generate_log(log_file, lines, students=args.students, structured=args.jsonl)
+                
+            for mode in args.modes:
+                result = measure(log_file, lines, mode)
+                results.append(result)
+                if 'error' in result:
+                    print(f"  {lines:>10} lines, {mode:9} failed: {result['error']}")
+                    continue
+                print(f"  {lines:>10} lines, {mode:9} parse {result['phases']['parse_log_file']:8.2f}s "
+                      f"({result['parse_lines_per_second']:>9,.0f} lines/s), "
+                      f"total {result['total_seconds']:8.2f}s, peak RSS {result['peak_rss_mb']:7.1f} MiB", flush=True)
+                      
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'bench_scaling',
+            'run_at': datetime.now().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'students': args.students,
+            'jsonl': args.jsonl,
+            'results': results
+        }, f, indent=2)
+    print(f"Results saved to {args.output}")
+    
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
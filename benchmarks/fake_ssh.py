@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Fake ssh/scp - stand-in VMs for exercising lab_fleet.py without a lab
+Each host is a directory under $FAKE_VM_ROOT; running a checker script appends
+simulated results to the host's /tmp/labresults.log. Bundles (lab_fleet.py --bundle)
+are extracted and run as bundle_runner.sh would
+Usage: python3 benchmarks/fake_ssh.py --install DIR, then PATH=DIR:$PATH python3 lab_fleet.py ...
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import shlex
+import random
+import shutil
+import tarfile
+import posixpath
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_log import CHECKER_SCRIPTS, VM_OS_INFO, LogGenerator
+
+# Environment settings
+FAKE_VM_ROOT = Path(os.environ.get('FAKE_VM_ROOT', '/tmp/fake_vms'))
+LATENCY = float(os.environ.get('FAKE_VM_LATENCY', '0.1'))  # Seconds per command; scripts take 10x
+FAIL_RATE = float(os.environ.get('FAKE_VM_FAIL_RATE', '0'))  # Chance a connection drops
+PASS_RATE = float(os.environ.get('FAKE_VM_PASS_RATE', '0.6'))  # As generate_log.py --pass-rate
+UNREACHABLE = set(filter(None, os.environ.get('FAKE_VM_UNREACHABLE', '').split(',')))  # Host addresses
+HANGING = set(filter(None, os.environ.get('FAKE_VM_HANG', '').split(',')))  # Hosts that never answer
+# Connections every host refuses, numbered from 1 per host, e.g. "1" to make each host's first attempt fail
+REFUSED = {int(number) for number in os.environ.get('FAKE_VM_REFUSE', '').split(',') if number}
+
+# Options taking a value, for both ssh and scp
+VALUE_OPTIONS = {'-o', '-p', '-P', '-i', '-l', '-F'}
+
+CONNECTION_ERROR = 255
+
+def split_arguments(argv):
+    """Positional arguments with the options removed"""
+    positional = []
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument in VALUE_OPTIONS:
+            next(arguments, None)
+        elif not argument.startswith('-'):
+            positional.append(argument)
+    return positional
+
+def host_path(host, remote_path):
+    """Local path for a path on a fake host; relative paths are relative to /tmp"""
+    path = posixpath.normpath(posixpath.join('/tmp', remote_path))
+    return FAKE_VM_ROOT / host / path.lstrip('/')
+
+def _connection_number(host):
+    """Count one more connection to host; returns how many there have been"""
+    counter = host_path(host, '/var/lib/fake_vm/connections')
+    counter.parent.mkdir(parents=True, exist_ok=True)
+    number = int(counter.read_text()) + 1 if counter.exists() else 1
+    counter.write_text(str(number))
+    return number
+
+def connect(destination):
+    """Host name of user@host, after simulating latency and connection failures"""
+    host = destination.rsplit('@', 1)[-1]
+    if host in HANGING:
+        time.sleep(3600)
+    time.sleep(LATENCY)
+    if host in UNREACHABLE or random.random() < FAIL_RATE or _connection_number(host) in REFUSED:
+        print(f"ssh: connect to host {host} port 22: Connection refused", file=sys.stderr)
+        sys.exit(CONNECTION_ERROR)
+    return host
+
+def run_checker(host, script_name, environment=None):
+    """Append one run of a checker script's results to the host's labresults.log, or $LAB_RESULTS_LOG"""
+    # Each run on a host fails less often, as students fix their labs between runs
+    runs_file = host_path(host, f'/var/lib/fake_vm/{script_name}.runs')
+    runs_file.parent.mkdir(parents=True, exist_ok=True)
+    runs = int(runs_file.read_text()) + 1 if runs_file.exists() else 1
+    runs_file.write_text(str(runs))
+    
+    environment = environment or {}
+    generator = LogGenerator(start=datetime.now(), structured=environment.get('LAB_RESULTS_FORMAT') == 'jsonl',
+                             student=environment.get('LAB_STUDENT', ''))
+    lines, _ = generator.script_lines(CHECKER_SCRIPTS[script_name], (1 - PASS_RATE) * 0.5 ** (runs - 1))
+    log_file = host_path(host, environment.get('LAB_RESULTS_LOG', '/tmp/labresults.log'))
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_file, 'a') as f:
+        f.write("".join(line + "\n" for line in lines))
+
+def run_bundle(host, command):
+    """Extract the bundle on stdin and write bundle_runner.sh's records for it"""
+    bundle_dir = host_path(host, f'/tmp/bundle.{os.getpid()}')
+    with tarfile.open(fileobj=sys.stdin.buffer, mode='r|gz') as archive:
+        archive.extractall(bundle_dir)
+    options = shlex.split(command.split('bundle_runner.sh"', 1)[1])
+    environment = {}
+    if '--jsonl' in options:
+        environment['LAB_RESULTS_FORMAT'] = 'jsonl'
+    if '--student' in options:
+        environment['LAB_STUDENT'] = options[options.index('--student') + 1]
+    parallel_checks = '--parallel-checks' in options
+    segment_dir = f'/tmp/bundle.{os.getpid()}/segments'
+    
+    print(f"@@LAB os {VM_OS_INFO}", flush=True)
+    phases = [('create', 'createlabs'), ('check', 'checklabs')]
+    for phase, directory in phases:
+        if f'--skip-{phase}' in options:
+            continue
+        parallel = phase == 'check' and parallel_checks
+        if parallel:
+            time.sleep(LATENCY * 10)  # The checkers run side by side
+        for script in sorted((bundle_dir / directory).glob('*.sh')):
+            shutil.copyfile(script, host_path(host, f'/tmp/{script.name}'))
+            if not parallel:
+                time.sleep(LATENCY * 10)
+            if script.name in CHECKER_SCRIPTS:
+                script_environment = environment
+                if parallel:
+                    script_environment = dict(environment, LAB_RESULTS_LOG=f'{segment_dir}/{script.name}.log')
+                run_checker(host, script.name, script_environment)
+            print(f"@@LAB script {phase} {script.name} 0", flush=True)
+            
+    log_file = host_path(host, '/tmp/labresults.log')
+    if '--skip-check' not in options and parallel_checks:
+        for segment in sorted(host_path(host, segment_dir).glob('*.log')):
+            print(f"@@LAB log {segment_dir}/{segment.name}")
+            with open(segment, 'r') as f:
+                for line in f:
+                    print(line.rstrip('\n'))
+            print("@@LAB end")
+    elif '--skip-check' not in options and log_file.is_file():
+        print("@@LAB log /tmp/labresults.log")
+        with open(log_file, 'r') as f:
+            for line in f:
+                print(line.rstrip('\n'))
+        print("@@LAB end")
+    shutil.rmtree(bundle_dir)
+    print("@@LAB done")
+    return 0
+
+def ssh(argv):
+    positional = split_arguments(argv)
+    if len(positional) < 2:
+        print("usage: ssh [options] destination command", file=sys.stderr)
+        return CONNECTION_ERROR
+    host = connect(positional[0])
+    command = ' '.join(positional[1:])
+    host_path(host, '/tmp').mkdir(parents=True, exist_ok=True)
+    
+    if 'tar xzf -' in command:
+        return run_bundle(host, command)
+    if command.startswith('echo '):
+        print(command[5:].strip('"\''))
+        return 0
+    if 'os-release' in command:
+        print(VM_OS_INFO)
+        return 0
+    match = re.match(r'test -f (\S+)$', command)
+    if match:
+        return 0 if host_path(host, match.group(1)).is_file() else 1
+    for path in re.findall(r'rm -rf (\S+)', command):
+        shutil.rmtree(host_path(host, path), ignore_errors=True)
+    # One script, or several started in the background and waited for (run_vm_labs.sh --parallel-checks)
+    runs = re.findall(r'sudo (?:env (.*?) )?(/tmp/\S+\.sh)', command)
+    if runs:
+        time.sleep(LATENCY * 10)
+        statuses = []
+        for settings, script_path in runs:
+            script = host_path(host, script_path)
+            if not script.is_file():
+                print(f"sudo: {script_path}: command not found", file=sys.stderr)
+                statuses.append(1)
+                continue
+            if script.name in CHECKER_SCRIPTS:
+                environment = dict(setting.split('=', 1) for setting in shlex.split(settings))
+                run_checker(host, script.name, environment)
+            statuses.append(0)
+        if not command.endswith('wait'):
+            return statuses[0]
+        for (_, script_path), status in zip(runs, statuses):
+            print(f"{posixpath.basename(script_path)} {status}")
+        return 0
+        
+    print(f"fake_ssh: unsupported command: {command}", file=sys.stderr)
+    return 127
+
+def scp(argv):
+    positional = split_arguments(argv)
+    if len(positional) != 2:
+        print("usage: scp [options] source target", file=sys.stderr)
+        return 1
+    source, target = positional
+    
+    if ':' in source:
+        destination, remote_path = source.split(':', 1)
+        host = connect(destination)
+        if glob.has_magic(remote_path):
+            # The remote shell expands globs; copy every match into the target directory
+            matches = sorted(glob.glob(str(host_path(host, remote_path))))
+            if not matches:
+                print(f"scp: {remote_path}: No such file or directory", file=sys.stderr)
+                return 1
+            for match in matches:
+                shutil.copyfile(match, Path(target) / Path(match).name)
+            return 0
+        source_path, target_path = host_path(host, remote_path), Path(target)
+    else:
+        destination, remote_path = target.split(':', 1)
+        source_path, target_path = Path(source), host_path(connect(destination), remote_path)
+        
+    if not source_path.is_file():
+        print(f"scp: {source}: No such file or directory", file=sys.stderr)
+        return 1
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source_path, target_path)
+    return 0
+
+def install(directory):
+    """Write ssh and scp wrappers calling this script into directory"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for program in ('ssh', 'scp'):
+        wrapper = directory / program
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" {program} "$@"\n')
+        wrapper.chmod(0o755)
+    print(f"Installed fake ssh and scp in {directory}; hosts are simulated under {FAKE_VM_ROOT}")
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--install':
+        install(sys.argv[2])
+        return 0
+    if len(sys.argv) < 2 or sys.argv[1] not in ('ssh', 'scp'):
+        print(__doc__.strip(), file=sys.stderr)
+        return 1
+    return ssh(sys.argv[2:]) if sys.argv[1] == 'ssh' else scp(sys.argv[2:])
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Synthetic Log Generator - labresults.log with the checker scripts' vocabulary
+Simulates students running usercheck.sh, check_nfs_share.sh and check_yum_repo.sh,
+retrying failed labs, with each run appended under a download_logs header
+Usage: python3 benchmarks/generate_log.py [--lines N] [--students N] [--retry-rate R] [--output path]
+"""
+
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Values the checker scripts substitute into their messages
+MOUNT_POINT = '/home/shares'
+DOMAIN = 'example.com'
+
+# Each check is (task, lines logged when it passes, lines logged when it fails);
+# one of the alternatives is picked per run, and an empty tuple logs nothing. Checks
+# are listed in the order the scripts run them, followed by the final verification.
+# Lab and task names are the ones the scripts' jsonl mode writes.
+CHECKER_SCRIPTS = {
+    'usercheck.sh': {
+        'lab': 'User Management',
+        'checks': [
+            ('User Creation', [('PASS: User sally exists',)], [('FAIL: User sally does not exist',)]),
+            ('Source Files', [('PASS: Found {count} source files',)],
+             [('FAIL: Home directory missing',), ('FAIL: No source files found',)]),
+            ('File Collection', [('PASS: Found {count} collected files',)],
+             [('FAIL: Collection directory missing',), ('FAIL: No files collected',)]),
+            ('Find Command', [('PASS: Find command executed successfully',)],
+             [('PARTIAL: Partial collection detected',), ('FAIL: Find command not executed',)]),
+            ('Command History', [('PASS: Command found in history',)], [()]),
+        ],
+        'verification': ('User Lab Complete', 'VERIFICATION PASSED: All checks successful',
+                         'VERIFICATION FAILED: Some checks failed'),
+    },
+    'check_nfs_share.sh': {
+        'lab': 'NFS Configuration',
+        'checks': [
+            ('FSTAB Configuration',
+             [('PASS: usershare found in fstab', f'PASS: usershare correctly configured for {MOUNT_POINT}'),
+              ('PASS: usershare found in fstab', 'INFO: usershare mount point differs')],
+             [('FAIL: /etc/fstab not found',), ('FAIL: usershare not in fstab',)]),
+            ('NFS Mount',
+             [(f'PASS: Mount detected at {MOUNT_POINT}', f'PASS: usershare mounted at {MOUNT_POINT}'),
+              (f'PASS: Mount detected at {MOUNT_POINT}', f'INFO: Non-usershare mount at {MOUNT_POINT}')],
+             [(f'FAIL: Mount point {MOUNT_POINT} does not exist',), (f'FAIL: Nothing mounted at {MOUNT_POINT}',)]),
+            ('User Home Directory',
+             [(f'PASS: User eric home in {MOUNT_POINT}',), (f'PASS: User eric home inside {MOUNT_POINT}',)],
+             [('FAIL: User eric does not exist',), (f'FAIL: User eric home not in {MOUNT_POINT}',)]),
+            ('Home Directory Exists', [('PASS: eric home directory exists',)],
+             [('FAIL: eric home directory does not exist',)]),
+        ],
+        'verification': ('NFS Lab Complete', 'NFS VERIFICATION PASSED: All checks successful',
+                         'NFS VERIFICATION FAILED: Some checks failed'),
+    },
+    'check_yum_repo.sh': {
+        'lab': 'Package Management',
+        'checks': [
+            ('Repository Directory', [('PASS: Repository directory exists',)],
+             [('FAIL: /etc/yum.repos.d directory missing',)]),
+            ('Repository Configuration', [(f'PASS: {DOMAIN} found in {{count}} repo files',)],
+             [(f'FAIL: {DOMAIN} not found in repo files',)]),
+            ('Repository URL', [(f'PASS: baseurl with {DOMAIN} found',), (f'PASS: mirrorlist with {DOMAIN} found',)],
+             [()]),
+            ('DNF Command Usage',
+             [('PASS: DNF command found in root history',), ('PASS: DNF activity found in /var/log/dnf.log',)], [()]),
+            ('Repository Active', [(f'PASS: {DOMAIN} repo active in DNF',)], [()]),
+            ('Manual Creation', [('PASS: Manual creation commands found',)], [()]),
+            ('Creation Method',
+             [('PASS: Both DNF and manual creation evidence found',), ('PASS: DNF creation method confirmed',),
+              ('PASS: Manual creation method confirmed',)],
+             [('INFO: Repository creation method unclear',)]),
+        ],
+        'verification': ('Repository Lab Complete', f'YUM REPO VERIFICATION PASSED: {DOMAIN} repository configured',
+                         f'YUM REPO VERIFICATION FAILED: {DOMAIN} repository missing'),
+    },
+}
+
+VM_OS_INFO = 'CentOS Stream 9'
+
+# Structured records hold integer seconds since this naive epoch, as `date +%s` on a UTC VM,
+# and that VM's `date +%z` offset
+EPOCH = datetime(1970, 1, 1)
+UTC_OFFSET = '+0000'
+
+def format_date(timestamp):
+    """Timestamp formatted like C-locale `date` output, e.g. Mon Jul  7 14:30:22 UTC 2025"""
+    return f"{timestamp:%a %b} {timestamp.day:2d} {timestamp:%H:%M:%S} UTC {timestamp:%Y}"
+
+class LogGenerator:
+    """Writes simulated check runs for a cohort of students until a line count is reached
+    
+    Every check in a student's first run passes with probability pass_rate; each
+    retry halves the chance of failing it again. A student with a failed lab runs
+    the checks again with probability retry_rate, otherwise they are done. When
+    every student in a cohort is done, a new cohort of the same size starts.
+    With structured=True results are written as the checker scripts' jsonl records.
+    """
+    
+    def __init__(self, students=100, pass_rate=0.6, retry_rate=0.7, start=None, seed=None, structured=False,
+                 student=''):
+        self.students = students
+        self.structured = structured
+        self.student = student  # Student named in structured records
+        self.pass_rate = pass_rate
+        self.retry_rate = retry_rate
+        self.timestamp = start or datetime(2025, 7, 21, 8, 0, 0)
+        self.random = random.Random(seed)
+        self.last_run_failed = False
+        self._minute = None  # (minute timestamp, formatted date parts) for the current minute
+        
+    def date(self):
+        """format_date(self.timestamp), reusing the formatted parts while the minute is unchanged"""
+        minute = self.timestamp.replace(second=0)
+        if minute != self._minute:
+            formatted = format_date(minute)
+            self._minute = minute
+            self._minute_parts = (formatted[:-11], formatted[-9:])
+        prefix, suffix = self._minute_parts
+        return f"{prefix}{self.timestamp.second:02d}{suffix}"
+        
+    def runs(self):
+        """Yield (student name, attempt number) for every check run, forever"""
+        cohort = 0
+        while True:
+            active = {f"student{cohort * self.students + number:06d}": 1 for number in range(self.students)}
+            while active:
+                for student, attempt in list(active.items()):
+                    yield student, attempt
+                    if self.last_run_failed and self.random.random() < self.retry_rate:
+                        active[student] = attempt + 1
+                    else:
+                        del active[student]
+            cohort += 1
+            
+    def session_lines(self, student, attempt):
+        """Lines appended to labresults.log for one student's check run"""
+        fail_chance = (1 - self.pass_rate) * 0.5 ** (attempt - 1)
+        self.timestamp += timedelta(minutes=self.random.randint(1, 30))
+        
+        lines = [f"# VM Lab Results for {student} - {self.date()}",
+                 f"# VM: 192.168.1.{self.random.randint(10, 250)} ({VM_OS_INFO})"]
+        self.student = student
+        self.last_run_failed = False
+        
+        for script in CHECKER_SCRIPTS.values():
+            script_lines, all_passed = self.script_lines(script, fail_chance)
+            lines.extend(script_lines)
+            self.last_run_failed = self.last_run_failed or not all_passed
+            
+        lines.append("")
+        return lines
+        
+    def script_lines(self, script, fail_chance):
+        """Lines one CHECKER_SCRIPTS entry logs in a run, and whether all of its checks passed"""
+        lines = []
+        all_passed = True
+        for task, pass_lines, fail_lines in script['checks']:
+            passed = self.random.random() >= fail_chance
+            all_passed = all_passed and passed
+            for message in self.random.choice(pass_lines if passed else fail_lines):
+                self.timestamp += timedelta(seconds=self.random.randint(0, 2))
+                if '{count}' in message:
+                    message = message.format(count=self.random.randint(1, 12))
+                lines.append(self.result_line(script['lab'], task, message))
+                
+        self.timestamp += timedelta(seconds=self.random.randint(0, 2))
+        task, passed_message, failed_message = script['verification']
+        lines.append(self.result_line(script['lab'], task, passed_message if all_passed else failed_message))
+        return lines, all_passed
+        
+    def result_line(self, lab, task, result):
+        """A "STATUS: message" result as logged at the current timestamp"""
+        if not self.structured:
+            return f"{self.date()}: {result}"
+        status, message = result.split(': ', 1)
+        return json.dumps({'ts': int((self.timestamp - EPOCH).total_seconds()), 'tz': UTC_OFFSET,
+                           'student': self.student, 'lab': lab, 'task': task, 'status': status, 'message': message})
+        
+    def write(self, f, lines):
+        """Write exactly `lines` log lines to the open file f"""
+        written = 0
+        for student, attempt in self.runs():
+            for line in self.session_lines(student, attempt):
+                f.write(line + "\n")
+                written += 1
+                if written >= lines:
+                    return written
+
+def generate_log(path, lines, students=100, pass_rate=0.6, retry_rate=0.7, seed=42, structured=False):
+    """Write a synthetic labresults.log of `lines` lines to path"""
+    with open(path, 'w') as f:
+        return LogGenerator(students, pass_rate, retry_rate, seed=seed, structured=structured).write(f, lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic labresults.log')
+    parser.add_argument('--lines', type=int, default=10000, help='Log lines to write (default: 10000)')
+    parser.add_argument('--students', type=int, default=100, help='Students per cohort (default: 100)')
+    parser.add_argument('--pass-rate', type=float, default=0.6,
+                       help='Chance each check passes on the first run (default: 0.6)')
+    parser.add_argument('--retry-rate', type=float, default=0.7,
+                       help='Chance a student with a failed lab runs the checks again (default: 0.7)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--jsonl', action='store_true',
+                       help='Write results as structured JSONL records (LAB_RESULTS_FORMAT=jsonl)')
+    parser.add_argument('--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+    
+    if args.lines < 1 or args.students < 1:
+        parser.error('--lines and --students must be at least 1')
+    if not 0 <= args.pass_rate <= 1 or not 0 <= args.retry_rate <= 1:
+        parser.error('--pass-rate and --retry-rate must be between 0 and 1')
+        
+    if args.output:
+        generate_log(args.output, args.lines, args.students, args.pass_rate, args.retry_rate, args.seed, args.jsonl)
+    else:
+        LogGenerator(args.students, args.pass_rate, args.retry_rate, seed=args.seed,
+                     structured=args.jsonl).write(sys.stdout, args.lines)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Mock Proxmox API - a local stand-in cluster for exercising lab_provision.py
+Serves the calls lab_provision.py makes (cluster resources and nextid, clone, start
+and task status) over keep-alive HTTP/1.1. Clone and start tasks finish after
+simulated durations, and a node runs only --task-slots tasks at once, queueing the rest
+Usage: python3 benchmarks/mock_proxmox.py [--port 8006], then set proxmoxHost to http://127.0.0.1:8006
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qsl, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TEMPLATE_VMID = 9000
+
+class MockCluster:
+    """VMs and tasks of a one-node cluster; tasks are finished lazily by comparing end times with the clock"""
+    
+    def __init__(self, node='pve', templates=(DEFAULT_TEMPLATE_VMID,), clone_seconds=2.0, start_seconds=0.5,
+                 task_slots=16, fail_rate=0.0):
+        self.node = node
+        self.clone_seconds = clone_seconds
+        self.start_seconds = start_seconds
+        self.fail_rate = fail_rate
+        self.vms = {vmid: {'name': f"lab-template-{vmid}", 'template': 1, 'status': 'stopped'}
+                    for vmid in templates}
+        self.tasks = {}  # UPID -> [end time, exit status, (on success, on failure) until it has ended]
+        self.slots = [0.0] * task_slots  # When each of the node's task slots is next free
+        self.lock = threading.Lock()
+        
+    def _task(self, task_type, vmid, seconds, on_success, on_failure=None):
+        """Queue a task on the earliest free slot; returns its UPID"""
+        now = time.time()
+        slot = min(range(len(self.slots)), key=self.slots.__getitem__)
+        end = max(now, self.slots[slot]) + seconds
+        self.slots[slot] = end
+        exitstatus = 'OK' if random.random() >= self.fail_rate else f"{task_type} failed: simulated error"
+        upid = f"UPID:{self.node}:{len(self.tasks):08X}:{int(now * 100) & 0xFFFFFFFF:08X}:{int(now):08X}:" \
+               f"{task_type}:{vmid}:root@pam!mock:"
+        self.tasks[upid] = [end, exitstatus, (on_success, on_failure)]
+        return upid
+        
+    def _finish_tasks(self):
+        now = time.time()
+        for task in self.tasks.values():
+            end, exitstatus, actions = task
+            if actions and end <= now:
+                action = actions[0] if exitstatus == 'OK' else actions[1]
+                if action:
+                    action()
+                task[2] = None
+                
+    def resources(self):
+        with self.lock:
+            self._finish_tasks()
+            return [{'id': f"qemu/{vmid}", 'type': 'qemu', 'vmid': vmid, 'node': self.node, **vm}
+                    for vmid, vm in sorted(self.vms.items())]
+                    
+    def next_id(self):
+        with self.lock:
+            vmid = 100
+            while vmid in self.vms:
+                vmid += 1
+            return str(vmid)
+            
+    def clone(self, vmid, params):
+        with self.lock:
+            newid = int(params.get('newid', 0))
+            if vmid not in self.vms:
+                raise LookupError(f"Configuration file 'nodes/{self.node}/qemu-server/{vmid}.conf' does not exist")
+            if newid in self.vms:
+                raise LookupError(f"unable to create VM {newid}: config file already exists")
+            vm = {'name': params.get('name', f"Copy-of-VM-{vmid}"), 'template': 0, 'status': 'stopped',
+                  'lock': 'clone'}
+            self.vms[newid] = vm
+            
+            def unlock():
+                del vm['lock']
+                
+            def remove():
+                # A failed clone is removed again, so a retry can reuse its VMID
+                del self.vms[newid]
+            return self._task('qmclone', newid, self.clone_seconds, unlock, remove)
+            
+    def start(self, vmid):
+        with self.lock:
+            self._finish_tasks()
+            vm = self.vms.get(vmid)
+            if vm is None:
+                raise LookupError(f"Configuration file 'nodes/{self.node}/qemu-server/{vmid}.conf' does not exist")
+            if vm.get('lock'):
+                raise LookupError(f"VM is locked ({vm['lock']})")
+            return self._task('qmstart', vmid, self.start_seconds, lambda: vm.update(status='running'))
+            
+    def task_status(self, upid):
+        with self.lock:
+            self._finish_tasks()
+            if upid not in self.tasks:
+                raise LookupError(f"no such task '{upid}'")
+            end, exitstatus, _ = self.tasks[upid]
+            if time.time() < end:
+                return {'upid': upid, 'node': self.node, 'status': 'running'}
+            return {'upid': upid, 'node': self.node, 'status': 'stopped', 'exitstatus': exitstatus}
+
+class _ProxmoxRequestHandler(BaseHTTPRequestHandler):
+    """The /api2/json routes lab_provision.py uses, with Proxmox's error conventions"""
+    
+    protocol_version = 'HTTP/1.1'  # Keep-alive, as a real Proxmox API server
+    
+    ROUTES = [
+        ('GET', r'/version', lambda cluster, match, params: {'version': '8.2.4', 'release': '8.2'}),
+        ('GET', r'/cluster/resources', lambda cluster, match, params: cluster.resources()),
+        ('GET', r'/cluster/nextid', lambda cluster, match, params: cluster.next_id()),
+        ('POST', r'/nodes/[^/]+/qemu/(\d+)/clone',
+         lambda cluster, match, params: cluster.clone(int(match[1]), params)),
+        ('POST', r'/nodes/[^/]+/qemu/(\d+)/status/start',
+         lambda cluster, match, params: cluster.start(int(match[1]))),
+        ('GET', r'/nodes/[^/]+/tasks/([^/]+)/status',
+         lambda cluster, match, params: cluster.task_status(match[1])),
+    ]
+    
+    def setup(self):
+        super().setup()
+        with self.server.cluster.lock:
+            self.server.connections += 1
+            
+    def do_GET(self):
+        self._handle('GET')
+        
+    def do_POST(self):
+        self._handle('POST')
+        
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if method == 'POST':
+            length = int(self.headers.get('Content-Length', 0))
+            params.update(parse_qsl(self.rfile.read(length).decode('utf-8')))
+        with self.server.cluster.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        
+        if not self.headers.get('Authorization', '').startswith('PVEAPIToken='):
+            self._reply(401, None, 'authentication failure')
+            return
+        path = unquote(url.path)
+        for route_method, pattern, handler in self.ROUTES:
+            match = re.fullmatch('/api2/json' + pattern, path)
+            if match and route_method == method:
+                try:
+                    self._reply(200, handler(self.server.cluster, match, params))
+                except LookupError as e:
+                    self._reply(500, None, str(e.args[0]))
+                return
+        self._reply(501, None, f"Method '{method} {url.path}' not implemented")
+        
+    def _reply(self, status, data, message=None):
+        # Proxmox reports errors in the status line and answers {"data": null}
+        body = json.dumps({'data': data}).encode('utf-8')
+        self.send_response(status, message)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        """Hundreds of polls per provisioning run, so requests are not logged"""
+
+def make_server(host='127.0.0.1', port=8006, latency=0.005, **cluster_options):
+    """A ThreadingHTTPServer for a new MockCluster; port 0 picks a free port (server.server_port)"""
+    server = ThreadingHTTPServer((host, port), _ProxmoxRequestHandler)
+    server.daemon_threads = True
+    server.cluster = MockCluster(**cluster_options)
+    server.latency = latency
+    server.connections = 0
+    server.requests = 0
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a mock Proxmox API for lab_provision.py')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8006, help='Port to listen on (default: 8006)')
+    parser.add_argument('--node', default='pve', help='Node name (default: pve)')
+    parser.add_argument('--template', type=int, action='append',
+                       help=f'VMID of a template to offer; repeatable (default: {DEFAULT_TEMPLATE_VMID})')
+    parser.add_argument('--clone-seconds', type=float, default=2.0, help='Duration of a clone task (default: 2)')
+    parser.add_argument('--start-seconds', type=float, default=0.5, help='Duration of a start task (default: 0.5)')
+    parser.add_argument('--task-slots', type=int, default=16,
+                       help='Tasks the node runs at once; later ones queue (default: 16)')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds added to every request (default: 0.005)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Chance a task ends in error (default: 0)')
+    args = parser.parse_args()
+    
+    server = make_server(args.host, args.port, latency=args.latency, node=args.node,
+                         templates=args.template or [DEFAULT_TEMPLATE_VMID], clone_seconds=args.clone_seconds,
+                         start_seconds=args.start_seconds, task_slots=args.task_slots, fail_rate=args.fail_rate)
+    print(f"Mock Proxmox API on http://{args.host}:{server.server_port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(f"\nServed {server.requests} requests over {server.connections} connections; "
+          f"{len(server.cluster.vms)} VMs")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,538 +1,2654 @@
-#!/usr/bin/env python3
-"""
-Lab Grading System - Pass/Fail with Improvement Tracking
-Reads labresults.log and generates pass/fail grades with attempt analysis
-Usage: python3 grade_labs.py [--log-file path] [--output-format text|json|html]
-"""
-
-import re
-import json
-import argparse
-from datetime import datetime
-from collections import defaultdict, Counter
-from pathlib import Path
-
-class LabGrader:
-    def __init__(self, log_file="labresults.log"):
-        self.log_file = Path(log_file)
-        self.results = []
-        self.lab_sessions = defaultdict(list)
-        self.task_attempts = defaultdict(list)  # Track attempts per task
-        self.final_status = {}  # Final pass/fail status per task
-        
-    def parse_log_file(self):
-        """Parse the labresults.log file and extract all test results"""
-        if not self.log_file.exists():
-            raise FileNotFoundError(f"Log file {self.log_file} not found")
-            
-        with open(self.log_file, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Parse log entry format: "timestamp: STATUS: message"
-                match = re.match(r'(.+?):\s+(PASS|FAIL|PARTIAL|INFO|VERIFICATION PASSED|VERIFICATION FAILED|NFS VERIFICATION PASSED|NFS VERIFICATION FAILED|YUM REPO VERIFICATION PASSED|YUM REPO VERIFICATION FAILED):\s+(.+)', line)
-                
-                if match:
-                    timestamp_str, status, message = match.groups()
-                    
-                    try:
-                        # Try to parse timestamp
-                        timestamp = datetime.strptime(timestamp_str.strip(), "%a %b %d %H:%M:%S %Z %Y")
-                    except ValueError:
-                        try:
-                            # Alternative timestamp format
-                            timestamp = datetime.strptime(timestamp_str.strip(), "%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            # Use current time if parsing fails
-                            timestamp = datetime.now()
-                    
-                    # Normalize status for overall verification results
-                    if "PASSED" in status:
-                        status = "PASS"
-                    elif "FAILED" in status:
-                        status = "FAIL"
-                        
-                    result = {
-                        'line_number': line_num,
-                        'timestamp': timestamp,
-                        'status': status,
-                        'message': message.strip(),
-                        'raw_line': line
-                    }
-                    
-                    self.results.append(result)
-                    
-                    # Group by lab type and track task attempts
-                    lab_type = self._identify_lab_type(message)
-                    task_name = self._extract_task_name(message)
-                    
-                    self.lab_sessions[lab_type].append(result)
-                    self.task_attempts[task_name].append({
-                        'timestamp': timestamp,
-                        'status': status,
-                        'lab_type': lab_type,
-                        'message': message
-                    })
-                    
-                    # Update final status (latest attempt wins)
-                    if status in ['PASS', 'FAIL']:
-                        self.final_status[task_name] = {
-                            'status': status,
-                            'timestamp': timestamp,
-                            'lab_type': lab_type,
-                            'attempts': len(self.task_attempts[task_name])
-                        }
-    
-    def _identify_lab_type(self, message):
-        """Identify lab type based on message content"""
-        message_lower = message.lower()
-        
-        if any(keyword in message_lower for keyword in ['user', 'sally', 'eric', 'file collection']):
-            return 'User Management'
-        elif any(keyword in message_lower for keyword in ['nfs', 'mount', 'shares', 'usershare']):
-            return 'NFS Configuration'
-        elif any(keyword in message_lower for keyword in ['yum', 'dnf', 'repository', 'repo', 'example.com']):
-            return 'Package Management'
-        elif any(keyword in message_lower for keyword in ['network', 'service', 'daemon']):
-            return 'Network Services'
-        elif any(keyword in message_lower for keyword in ['file', 'directory', 'permission']):
-            return 'File System'
-        else:
-            return 'General'
-    
-    def _extract_task_name(self, message):
-        """Extract specific task name from message for tracking attempts"""
-        message_lower = message.lower()
-        
-        # Common task patterns - extract the core task being tested
-        if 'user' in message_lower and 'exists' in message_lower:
-            return 'User Creation'
-        elif 'user' in message_lower and 'home' in message_lower:
-            return 'User Home Directory'
-        elif 'files' in message_lower and ('owned' in message_lower or 'collection' in message_lower):
-            return 'File Ownership'
-        elif 'mount' in message_lower and any(x in message_lower for x in ['nfs', 'shares']):
-            return 'NFS Mount'
-        elif 'fstab' in message_lower:
-            return 'FSTAB Configuration'
-        elif any(x in message_lower for x in ['repository', 'repo']) and 'example.com' in message_lower:
-            return 'Repository Configuration'
-        elif 'dnf' in message_lower and ('command' in message_lower or 'usage' in message_lower):
-            return 'DNF Command Usage'
-        elif 'verification passed' in message_lower:
-            if 'nfs' in message_lower:
-                return 'NFS Lab Complete'
-            elif 'repo' in message_lower or 'yum' in message_lower:
-                return 'Repository Lab Complete'
-            else:
-                return 'User Lab Complete'
-        elif 'verification failed' in message_lower:
-            if 'nfs' in message_lower:
-                return 'NFS Lab Complete'
-            elif 'repo' in message_lower or 'yum' in message_lower:
-                return 'Repository Lab Complete'
-            else:
-                return 'User Lab Complete'
-        else:
-            # Generic task name based on first few words
-            words = message.split()[:3]
-            return ' '.join(words).title()
-    
-    def calculate_lab_results(self):
-        """Calculate pass/fail results and improvement metrics"""
-        lab_results = {}
-        
-        for lab_type in self.lab_sessions.keys():
-            # Get all tasks for this lab type
-            lab_tasks = {task: info for task, info in self.final_status.items() 
-                        if info['lab_type'] == lab_type}
-            
-            if not lab_tasks:
-                continue
-                
-            passed_tasks = sum(1 for info in lab_tasks.values() if info['status'] == 'PASS')
-            total_tasks = len(lab_tasks)
-            total_attempts = sum(info['attempts'] for info in lab_tasks.values())
-            
-            # Calculate improvement metrics
-            improvement_data = self._calculate_improvement_metrics(lab_type, lab_tasks)
-            
-            lab_results[lab_type] = {
-                'passed_tasks': passed_tasks,
-                'total_tasks': total_tasks,
-                'pass_rate': (passed_tasks / total_tasks * 100) if total_tasks > 0 else 0,
-                'overall_status': 'PASS' if passed_tasks == total_tasks else 'FAIL',
-                'total_attempts': total_attempts,
-                'average_attempts': total_attempts / total_tasks if total_tasks > 0 else 0,
-                'tasks': lab_tasks,
-                'improvement': improvement_data
-            }
-        
-        return lab_results
-    
-    def _calculate_improvement_metrics(self, lab_type, lab_tasks):
-        """Calculate improvement metrics for a lab"""
-        improvement_data = {
-            'retry_success_count': 0,
-            'first_try_success_count': 0,
-            'persistent_failures': 0,
-            'max_attempts': 0,
-            'tasks_with_multiple_attempts': 0
-        }
-        
-        for task_name, task_info in lab_tasks.items():
-            attempts = task_info['attempts']
-            status = task_info['status']
-            
-            improvement_data['max_attempts'] = max(improvement_data['max_attempts'], attempts)
-            
-            if attempts > 1:
-                improvement_data['tasks_with_multiple_attempts'] += 1
-                if status == 'PASS':
-                    improvement_data['retry_success_count'] += 1
-                else:
-                    improvement_data['persistent_failures'] += 1
-            elif attempts == 1 and status == 'PASS':
-                improvement_data['first_try_success_count'] += 1
-        
-        return improvement_data
-    
-    def generate_text_report(self):
-        """Generate a comprehensive text-based grade report"""
-        if not self.results:
-            return "No lab results found in log file."
-            
-        lab_results = self.calculate_lab_results()
-        
-        report = []
-        report.append("=" * 80)
-        report.append("LAB GRADING REPORT - PASS/FAIL WITH IMPROVEMENT TRACKING")
-        report.append("=" * 80)
-        report.append(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append(f"Log File: {self.log_file}")
-        report.append(f"Total Log Entries: {len(self.results)}")
-        report.append("")
-        
-        # Overall Summary
-        total_labs = len(lab_results)
-        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
-        
-        report.append("OVERALL SUMMARY")
-        report.append("-" * 40)
-        report.append(f"Total Labs: {total_labs}")
-        report.append(f"Labs Passed: {passed_labs}")
-        report.append(f"Labs Failed: {total_labs - passed_labs}")
-        report.append(f"Overall Status: {'PASS' if passed_labs == total_labs else 'FAIL'}")
-        report.append("")
-        
-        # Individual Lab Results
-        report.append("LAB RESULTS")
-        report.append("-" * 40)
-        
-        for lab_type, result in sorted(lab_results.items()):
-            status_symbol = "✓" if result['overall_status'] == 'PASS' else "✗"
-            report.append(f"{status_symbol} {lab_type:25}: {result['overall_status']:4} "
-                         f"({result['passed_tasks']}/{result['total_tasks']} tasks, "
-                         f"{result['total_attempts']} total attempts)")
-        
-        report.append("")
-        
-        # Improvement Analysis
-        report.append("IMPROVEMENT ANALYSIS")
-        report.append("-" * 40)
-        
-        total_retry_successes = sum(r['improvement']['retry_success_count'] for r in lab_results.values())
-        total_first_try_successes = sum(r['improvement']['first_try_success_count'] for r in lab_results.values())
-        total_multiple_attempt_tasks = sum(r['improvement']['tasks_with_multiple_attempts'] for r in lab_results.values())
-        
-        report.append(f"First-try successes: {total_first_try_successes}")
-        report.append(f"Retry successes: {total_retry_successes}")
-        report.append(f"Tasks requiring multiple attempts: {total_multiple_attempt_tasks}")
-        
-        if total_retry_successes > 0:
-            report.append(f"💪 Improvement shown: {total_retry_successes} tasks succeeded after retry!")
-        
-        report.append("")
-        
-        # Detailed Lab Analysis
-        report.append("DETAILED LAB ANALYSIS")
-        report.append("-" * 80)
-        
-        for lab_type, result in sorted(lab_results.items()):
-            report.append(f"\n{lab_type.upper()}")
-            report.append("-" * len(lab_type))
-            report.append(f"Status: {result['overall_status']} ({result['passed_tasks']}/{result['total_tasks']} tasks)")
-            report.append(f"Total Attempts: {result['total_attempts']} (avg: {result['average_attempts']:.1f} per task)")
-            
-            # Improvement metrics for this lab
-            imp = result['improvement']
-            if imp['retry_success_count'] > 0:
-                report.append(f"✨ Improvement: {imp['retry_success_count']} tasks succeeded after retry")
-            if imp['first_try_success_count'] > 0:
-                report.append(f"⚡ First-try: {imp['first_try_success_count']} tasks passed immediately")
-            if imp['persistent_failures'] > 0:
-                report.append(f"⚠️  Persistent: {imp['persistent_failures']} tasks failed despite retries")
-            
-            report.append("")
-            report.append("Task Details:")
-            
-            for task_name, task_info in sorted(result['tasks'].items()):
-                status_symbol = "✓" if task_info['status'] == 'PASS' else "✗"
-                attempts_str = f"({task_info['attempts']} attempts)" if task_info['attempts'] > 1 else "(1 attempt)"
-                
-                improvement_indicator = ""
-                if task_info['attempts'] > 1 and task_info['status'] == 'PASS':
-                    improvement_indicator = " 📈"
-                elif task_info['attempts'] > 1 and task_info['status'] == 'FAIL':
-                    improvement_indicator = " 🔄"
-                
-                report.append(f"  {status_symbol} {task_name:30} {task_info['status']:4} {attempts_str}{improvement_indicator}")
-        
-        # Recommendations
-        report.append("")
-        report.append("RECOMMENDATIONS")
-        report.append("-" * 40)
-        
-        failed_labs = [name for name, result in lab_results.items() if result['overall_status'] == 'FAIL']
-        
-        if not failed_labs:
-            report.append("🎉 Excellent! All labs passed successfully!")
-            if total_retry_successes > 0:
-                report.append("👏 Great persistence shown - you improved through practice!")
-        else:
-            report.append(f"📚 Focus on these failed labs: {', '.join(failed_labs)}")
-            if total_retry_successes > 0:
-                report.append("👍 You're showing good improvement - keep practicing!")
-            
-            # Show tasks that need attention
-            persistent_failures = []
-            for lab_type, result in lab_results.items():
-                for task_name, task_info in result['tasks'].items():
-                    if task_info['status'] == 'FAIL' and task_info['attempts'] > 1:
-                        persistent_failures.append(f"{lab_type}: {task_name}")
-            
-            if persistent_failures:
-                report.append("")
-                report.append("Tasks needing extra attention (failed despite retries):")
-                for task in persistent_failures[:5]:  # Show top 5
-                    report.append(f"  • {task}")
-        
-        report.append("")
-        report.append("=" * 80)
-        
-        return "\n".join(report)
-    
-    def generate_json_report(self):
-        """Generate JSON format report for programmatic use"""
-        lab_results = self.calculate_lab_results()
-        
-        # Calculate overall metrics
-        total_labs = len(lab_results)
-        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
-        total_retry_successes = sum(r['improvement']['retry_success_count'] for r in lab_results.values())
-        total_first_try_successes = sum(r['improvement']['first_try_success_count'] for r in lab_results.values())
-        
-        report_data = {
-            'report_generated': datetime.now().isoformat(),
-            'log_file': str(self.log_file),
-            'overall_status': 'PASS' if passed_labs == total_labs else 'FAIL',
-            'summary': {
-                'total_labs': total_labs,
-                'labs_passed': passed_labs,
-                'labs_failed': total_labs - passed_labs,
-                'total_entries': len(self.results)
-            },
-            'improvement_metrics': {
-                'first_try_successes': total_first_try_successes,
-                'retry_successes': total_retry_successes,
-                'total_multiple_attempt_tasks': sum(r['improvement']['tasks_with_multiple_attempts'] for r in lab_results.values()),
-                'improvement_shown': total_retry_successes > 0
-            },
-            'lab_results': {}
-        }
-        
-        # Add detailed lab results
-        for lab_type, result in lab_results.items():
-            report_data['lab_results'][lab_type] = {
-                'overall_status': result['overall_status'],
-                'passed_tasks': result['passed_tasks'],
-                'total_tasks': result['total_tasks'],
-                'pass_rate': result['pass_rate'],
-                'total_attempts': result['total_attempts'],
-                'average_attempts': result['average_attempts'],
-                'improvement_metrics': result['improvement'],
-                'tasks': {
-                    task_name: {
-                        'status': task_info['status'],
-                        'attempts': task_info['attempts'],
-                        'timestamp': task_info['timestamp'].isoformat()
-                    }
-                    for task_name, task_info in result['tasks'].items()
-                }
-            }
-        
-        return json.dumps(report_data, indent=2)
-    
-    def generate_html_report(self):
-        """Generate HTML format report"""
-        lab_results = self.calculate_lab_results()
-        
-        # Calculate overall metrics
-        total_labs = len(lab_results)
-        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
-        total_retry_successes = sum(r['improvement']['retry_success_count'] for r in lab_results.values())
-        overall_status = 'PASS' if passed_labs == total_labs else 'FAIL'
-        
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Lab Grading Report - Pass/Fail with Improvement Tracking</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 40px; }}
-        .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
-        .summary-cards {{ display: flex; gap: 20px; margin: 20px 0; }}
-        .card {{ background: #ecf0f1; padding: 15px; border-radius: 5px; flex: 1; text-align: center; }}
-        .pass-card {{ background: #d5f4e6; }}
-        .fail-card {{ background: #fdeaea; }}
-        .improvement-card {{ background: #fff3cd; }}
-        .lab-section {{ margin: 20px 0; }}
-        .pass {{ color: #27ae60; font-weight: bold; }}
-        .fail {{ color: #e74c3c; font-weight: bold; }}
-        .task-table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
-        .task-table th, .task-table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-        .task-table th {{ background-color: #f2f2f2; }}
-        .improvement-icon {{ font-size: 1.2em; }}
-        .lab-header {{ background: #34495e; color: white; padding: 10px; margin: 15px 0 5px 0; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Lab Grading Report - Pass/Fail with Improvement Tracking</h1>
-        <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        <p>Log File: {self.log_file}</p>
-    </div>
-    
-    <div class="summary-cards">
-        <div class="card {'pass-card' if overall_status == 'PASS' else 'fail-card'}">
-            <h3>Overall Status</h3>
-            <h2 class="{'pass' if overall_status == 'PASS' else 'fail'}">{overall_status}</h2>
-            <p>{passed_labs}/{total_labs} Labs Passed</p>
-        </div>
-        <div class="card">
-            <h3>Total Attempts</h3>
-            <h2>{sum(r['total_attempts'] for r in lab_results.values())}</h2>
-            <p>Across all tasks</p>
-        </div>
-        <div class="card improvement-card">
-            <h3>Improvement Shown</h3>
-            <h2>{total_retry_successes}</h2>
-            <p>Tasks succeeded after retry</p>
-        </div>
-    </div>
-"""
-        
-        # Lab results table
-        html += """
-    <div class="lab-section">
-        <h2>Lab Results Summary</h2>
-        <table class="task-table">
-            <tr><th>Lab Type</th><th>Status</th><th>Tasks</th><th>Attempts</th><th>Improvement</th></tr>
-"""
-        
-        for lab_type, result in sorted(lab_results.items()):
-            status_class = 'pass' if result['overall_status'] == 'PASS' else 'fail'
-            improvement_icon = '📈' if result['improvement']['retry_success_count'] > 0 else ''
-            
-            html += f"""
-            <tr>
-                <td>{lab_type}</td>
-                <td class="{status_class}">{result['overall_status']}</td>
-                <td>{result['passed_tasks']}/{result['total_tasks']}</td>
-                <td>{result['total_attempts']} (avg: {result['average_attempts']:.1f})</td>
-                <td>{improvement_icon} {result['improvement']['retry_success_count']} retries succeeded</td>
-            </tr>"""
-        
-        html += """
-        </table>
-    </div>
-"""
-        
-        # Detailed lab breakdown
-        for lab_type, result in sorted(lab_results.items()):
-            html += f"""
-    <div class="lab-header">
-        <h3>{lab_type} - {'✓' if result['overall_status'] == 'PASS' else '✗'} {result['overall_status']}</h3>
-    </div>
-    <table class="task-table">
-        <tr><th>Task</th><th>Status</th><th>Attempts</th><th>Progress</th></tr>
-"""
-            
-            for task_name, task_info in sorted(result['tasks'].items()):
-                status_class = 'pass' if task_info['status'] == 'PASS' else 'fail'
-                
-                progress_icon = ""
-                if task_info['attempts'] > 1 and task_info['status'] == 'PASS':
-                    progress_icon = '<span class="improvement-icon">📈</span>'
-                elif task_info['attempts'] > 1 and task_info['status'] == 'FAIL':
-                    progress_icon = '<span class="improvement-icon">🔄</span>'
-                elif task_info['attempts'] == 1 and task_info['status'] == 'PASS':
-                    progress_icon = '<span class="improvement-icon">⚡</span>'
-                
-                html += f"""
-        <tr>
-            <td>{task_name}</td>
-            <td class="{status_class}">{task_info['status']}</td>
-            <td>{task_info['attempts']}</td>
-            <td>{progress_icon}</td>
-        </tr>"""
-            
-            html += "</table>"
-        
-        html += """
-</body>
-</html>"""
-        
-        return html
-
-def main():
-    parser = argparse.ArgumentParser(description='Grade lab results from log file')
-    parser.add_argument('--log-file', default='labresults.log', 
-                       help='Path to lab results log file (default: labresults.log)')
-    parser.add_argument('--output-format', choices=['text', 'json', 'html'], default='text',
-                       help='Output format (default: text)')
-    parser.add_argument('--output-file', help='Save report to file instead of stdout')
-    
-    args = parser.parse_args()
-    
-    try:
-        grader = LabGrader(args.log_file)
-        grader.parse_log_file()
-        
-        if args.output_format == 'json':
-            report = grader.generate_json_report()
-        elif args.output_format == 'html':
-            report = grader.generate_html_report()
-        else:
-            report = grader.generate_text_report()
-        
-        if args.output_file:
-            with open(args.output_file, 'w') as f:
-                f.write(report)
-            print(f"Report saved to {args.output_file}")
-        else:
-            print(report)
-            
-    except FileNotFoundError as e:
-        print(f"Error: {e}")
-        return 1
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return 1
-    
-    return 0
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+"""
+Lab Grading System - Pass/Fail with Improvement Tracking
+Reads labresults.log and generates pass/fail grades with attempt analysis
+Usage: python3 grade_labs.py [--log-file path] [--output-format text|json|html[,...]] [--output-dir dir]
+"""
+
+# Part of every report cache key: bump when a change alters grades or report output
+__version__ = '1.0.0'
+
+import os
+import re
+import bz2
+import sys
+import glob
+import gzip
+import json
+import lzma
+import heapq
+import hashlib
+import mmap
+import time
+import cProfile
+import argparse
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, time as clock_time, timedelta
+from collections import defaultdict, Counter
+from functools import lru_cache
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for the cohort analytics report
+    np = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; stats then omit peak memory
+    resource = None
+
+# Status keywords written by the checker scripts' log_result helpers
+STATUS_ALTERNATION = (r'(PASS|FAIL|PARTIAL|INFO|VERIFICATION PASSED|VERIFICATION FAILED|'
+                      r'NFS VERIFICATION PASSED|NFS VERIFICATION FAILED|'
+                      r'YUM REPO VERIFICATION PASSED|YUM REPO VERIFICATION FAILED)')
+
+# Full "timestamp: STATUS: message" entry, as matched by the legacy parser
+LOG_ENTRY_PATTERN = r'(.+?):\s+' + STATUS_ALTERNATION + r':\s+(.+)'
+
+# Precompiled equivalent of LOG_ENTRY_PATTERN for the fast parser: the timestamp
+# group jumps from colon to colon instead of growing one character at a time
+LOG_ENTRY_RE = re.compile(r'(.[^:]*(?::[^:]*)*?):\s+' + STATUS_ALTERNATION + r':\s+(.+)')
+
+TIMESTAMP_FORMATS = ("%a %b %d %H:%M:%S %Z %Y", "%Y-%m-%d %H:%M:%S")
+
+# Output of `date` in the C locale, e.g. "Mon Jul 21 14:30:22 UTC 2025"
+DATE_OUTPUT_RE = re.compile(r'(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) +'
+                            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) +'
+                            r'(\d{1,2}) (\d{1,2}):(\d\d):(\d\d) (?:UTC|GMT) (\d{4})$')
+
+# Header written by run_vm_labs.sh download_logs before each VM's results
+STUDENT_MARKER = '# VM Lab Results for '
+STUDENT_MARKER_RE = re.compile(r'# VM Lab Results for (.+) - ')
+
+# Shard name for results logged before the first student header
+UNASSIGNED_STUDENT = 'unassigned'
+
+OUTPUT_FORMATS = ['text', 'json', 'html']
+
+# Report file suffixes, matching the names run_vm_labs.sh has always produced
+REPORT_SUFFIXES = {'text': '_report.txt', 'json': '_grades.json', 'html': '_report.html'}
+
+# Classification rules used when config.json has no "labs" section. A rule matches
+# when every keyword group has at least one keyword in the lower-cased message.
+DEFAULT_LAB_RULES = {
+    'default_lab_type': 'General',
+    'lab_types': [
+        {'name': 'User Management', 'match': [['user', 'sally', 'eric', 'file collection']]},
+        {'name': 'NFS Configuration', 'match': [['nfs', 'mount', 'shares', 'usershare']]},
+        {'name': 'Package Management', 'match': [['yum', 'dnf', 'repository', 'repo', 'example.com']]},
+        {'name': 'Network Services', 'match': [['network', 'service', 'daemon']]},
+        {'name': 'File System', 'match': [['file', 'directory', 'permission']]}
+    ],
+    'tasks': [
+        {'name': 'User Creation', 'match': [['user'], ['exists']]},
+        {'name': 'User Home Directory', 'match': [['user'], ['home']]},
+        {'name': 'File Ownership', 'match': [['files'], ['owned', 'collection']]},
+        {'name': 'NFS Mount', 'match': [['mount'], ['nfs', 'shares']]},
+        {'name': 'FSTAB Configuration', 'match': [['fstab']]},
+        {'name': 'Repository Configuration', 'match': [['repository', 'repo'], ['example.com']]},
+        {'name': 'DNF Command Usage', 'match': [['dnf'], ['command', 'usage']]},
+        {'name': 'NFS Lab Complete', 'match': [['verification passed', 'verification failed'], ['nfs']]},
+        {'name': 'Repository Lab Complete', 'match': [['verification passed', 'verification failed'], ['repo', 'yum']]},
+        {'name': 'User Lab Complete', 'match': [['verification passed', 'verification failed']]}
+    ]
+}
+
+DEFAULT_CONFIG_FILE = Path(__file__).with_name('config.json')
+
+# Keys of the per-task attempt records in task_attempts and export_state()
+ATTEMPT_FIELDS = ('timestamp', 'status', 'lab_type', 'message')
+
+# Compact result stores keep timestamps as integer microseconds since this naive epoch
+EPOCH = datetime(1970, 1, 1)
+
+# Per-run line counters reported by LabGrader.stats
+STAT_COUNTERS = ('lines_read', 'blank_lines', 'unmatched_lines', 'timestamp_fallbacks', 'structured_lines')
+
+# Per-line parse steps timed in profile mode, in the order they run; json is the
+# structured path, which replaces regex, timestamp and classify
+PARSE_STEPS = ('json', 'regex', 'timestamp', 'classify', 'record')
+
+# Rotated log segments may be compressed; they are decompressed as they are read
+LOG_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+# Lines read from the start of a segment to find the first timestamp it sorts by
+SEGMENT_PROBE_LINES = 1000
+
+# Bytes at the end of each log segment hashed into the report cache fingerprint
+REPORT_CACHE_TAIL_BYTES = 64 * 1024
+
+DEFAULT_REPORT_CACHE_MB = 100
+
+# Generation time in a text/HTML and a JSON report; the cache stores it blank and fills it in when serving
+REPORT_GENERATED_PATTERNS = [
+    (re.compile(r'(Report Generated: |<p>Generated: )(?:\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)?'), '%Y-%m-%d %H:%M:%S'),
+    (re.compile(r'("report_generated": ")[^"]*(?=")'), None)
+]
+
+# Sparse timestamp index for --since/--until: one entry per block of this many log bytes
+TIME_INDEX_BLOCK_BYTES = 256 * 1024
+TIME_INDEX_VERSION = 1
+TIME_INDEX_SUFFIX = '.tsindex'
+
+MONTHS = {name: number for number, name in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], 1)}
+
+def _match_entry_legacy(line):
+    """Split a log line into (timestamp, status, message) using the original regex"""
+    match = re.match(LOG_ENTRY_PATTERN, line)
+    return match.groups() if match else None
+
+def _match_entry_fast(line):
+    """Split a log line into (timestamp, status, message) using the precompiled regex"""
+    match = LOG_ENTRY_RE.match(line)
+    return match.groups() if match else None
+
+def _normalize_status(status):
+    """Map the overall verification statuses ("NFS VERIFICATION PASSED", ...) to PASS/FAIL"""
+    if "PASSED" in status:
+        return "PASS"
+    if "FAILED" in status:
+        return "FAIL"
+    return status
+
+def _decode_timestamp(timestamp_str):
+    """Decode a log timestamp, returning None if no known format matches"""
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(timestamp_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+@lru_cache(maxsize=64)
+def _utc_offset(offset):
+    """timedelta for a `date +%z` offset such as +0200"""
+    return datetime.strptime(offset, '%z').utcoffset()
+
+def _record_timestamp(record):
+    """Naive local time of a JSONL record, the same wall-clock time a text line's `date` shows
+    
+    ts is seconds since the epoch; records carrying the VM's UTC offset ("tz", as
+    `date +%z`) are shifted by it, records without one are read in local time.
+    """
+    offset = record.get('tz')
+    if offset is None:
+        return datetime.fromtimestamp(record['ts'])
+    return EPOCH + timedelta(seconds=record['ts']) + _utc_offset(offset)
+
+@lru_cache(maxsize=4096)
+def _decode_timestamp_cached(timestamp_str):
+    """Memoized _decode_timestamp with a strptime-free path for plain `date` output
+    
+    Adjacent log lines usually share the same second, so most calls are cache hits.
+    Anything the fast path is unsure about falls through to strptime.
+    """
+    match = DATE_OUTPUT_RE.match(timestamp_str)
+    if match:
+        month, day, hour, minute, second, year = match.groups()
+        try:
+            return datetime(int(year), MONTHS[month], int(day),
+                            int(hour), int(minute), int(second))
+        except ValueError:
+            pass
+    return _decode_timestamp(timestamp_str)
+
+class LabClassifier:
+    """Map log messages to (lab type, task name) using a keyword rule table
+    
+    All rule keywords are compiled into one regex that reports every keyword
+    present in a message in a single scan, as a bitmask; each rule is a list of
+    keyword-group bitmasks checked against it. Checker scripts repeat the same
+    few dozen messages, so results are cached per message text.
+    """
+    
+    def __init__(self, rules=None, cache_size=4096):
+        self.rules = rules or DEFAULT_LAB_RULES
+        self.cache_size = cache_size
+        self.default_lab_type = self.rules.get('default_lab_type', 'General')
+        
+        keywords = sorted({keyword.lower() for rule in self.rules['lab_types'] + self.rules['tasks']
+                           for group in rule['match'] for keyword in group}, key=len, reverse=True)
+        self.keyword_bits = {keyword: 1 << bit for bit, keyword in enumerate(keywords)}
+        
+        self.lab_types = [(rule['name'], self._compile_groups(rule['match'])) for rule in self.rules['lab_types']]
+        self.tasks = [(rule['name'], self._compile_groups(rule['match'])) for rule in self.rules['tasks']]
+        
+        # Zero-width lookahead so overlapping keywords ("usershare", "shares") are all
+        # found; the longest keyword at each position wins, and keywords contained in
+        # it are implied
+        self.keyword_re = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in keywords) + '))')
+        self.implied_bits = {
+            keyword: sum(bit for other, bit in self.keyword_bits.items() if other in keyword)
+            for keyword in keywords
+        }
+        
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+    
+    @classmethod
+    def from_config(cls, config_file=DEFAULT_CONFIG_FILE):
+        """Load the "labs" section of config.json, falling back to DEFAULT_LAB_RULES"""
+        config_file = Path(config_file)
+        if not config_file.exists():
+            return cls()
+            
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        return cls(config.get('labs'))
+    
+    def _compile_groups(self, groups):
+        """Turn a rule's keyword groups into bitmasks"""
+        return [sum(self.keyword_bits[keyword.lower()] for keyword in set(group)) for group in groups]
+    
+    def _classify(self, message):
+        """Return (lab_type, task_name) for a message; use classify() for the cached version"""
+        present = 0
+        for keyword in self.keyword_re.findall(message.lower()):
+            present |= self.implied_bits[keyword]
+        
+        lab_type = self.default_lab_type
+        for name, groups in self.lab_types:
+            for group in groups:
+                if not present & group:
+                    break
+            else:
+                lab_type = name
+                break
+        
+        for name, groups in self.tasks:
+            for group in groups:
+                if not present & group:
+                    break
+            else:
+                return lab_type, name
+        
+        # Generic task name based on first few words
+        words = message.split()[:3]
+        return lab_type, ' '.join(words).title()
+    
+    def __getstate__(self):
+        # The per-instance cache cannot be pickled; process pool workers rebuild it
+        return {'rules': self.rules, 'cache_size': self.cache_size}
+    
+    def __setstate__(self, state):
+        self.__init__(state['rules'], state['cache_size'])
+
+def _cache_stats(cache_info, worker_lookups=(0, 0)):
+    """Hits, misses and hit rate from an lru_cache cache_info() plus worker (hits, misses)"""
+    hits = cache_info.hits + worker_lookups[0]
+    misses = cache_info.misses + worker_lookups[1]
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses else 0.0}
+
+def _peak_memory_mb():
+    """Peak RSS of this process or its largest worker in MiB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _build_stats(counters, phase_seconds, classifier, worker_cache_lookups=None):
+    """Assemble the stats dictionary from line counters and per-phase wall times
+    
+    Cache figures are process-wide: the timestamp cache is shared by every
+    grader, the classifier cache by every grader using that classifier. Lookups
+    made in --jobs workers are passed in as worker_cache_lookups.
+    """
+    worker_cache_lookups = worker_cache_lookups or {}
+    lines_read = counters['lines_read']
+    parse_seconds = phase_seconds.get('parse', 0.0)
+    
+    phases = {'parse': parse_seconds} if 'parse' in phase_seconds else {}
+    step_seconds = [phase_seconds[step] for step in PARSE_STEPS if step in phase_seconds]
+    if step_seconds and parse_seconds:
+        # Whatever the timed steps do not cover is file reading and loop overhead
+        # (not meaningful for --jobs, where steps add up CPU time across workers)
+        phases['read'] = max(parse_seconds - sum(step_seconds), 0.0)
+    phases.update((phase, seconds) for phase, seconds in phase_seconds.items() if phase not in phases)
+    
+    return {
+        'lines_read': lines_read,
+        'matched_lines': lines_read - counters['blank_lines'] - counters['unmatched_lines'],
+        'unmatched_lines': counters['unmatched_lines'],
+        'blank_lines': counters['blank_lines'],
+        'timestamp_fallbacks': counters['timestamp_fallbacks'],
+        'structured_lines': counters['structured_lines'],
+        'lines_per_second': lines_read / parse_seconds if parse_seconds else None,
+        'phase_seconds': phases,
+        'timestamp_cache': _cache_stats(_decode_timestamp_cached.cache_info(),
+                                        worker_cache_lookups.get('timestamp_cache', (0, 0))),
+        'classifier_cache': _cache_stats(classifier.classify.cache_info(),
+                                         worker_cache_lookups.get('classifier_cache', (0, 0))),
+        'peak_memory_mb': _peak_memory_mb()
+    }
+
+@contextmanager
+def _timed(phase_seconds, phase):
+    """Add the wall time of the with-block to phase_seconds[phase]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_seconds[phase] = phase_seconds.get(phase, 0.0) + time.perf_counter() - start
+
+def _format_stats(stats):
+    """Human-readable rendering of a stats dictionary for --stats"""
+    lines = ["Grading statistics:"]
+    lines.append(f"  Lines read:          {stats['lines_read']}")
+    lines.append(f"  Matched:             {stats['matched_lines']}")
+    lines.append(f"  Unmatched:           {stats['unmatched_lines']}")
+    lines.append(f"  Blank:               {stats['blank_lines']}")
+    lines.append(f"  Timestamp fallbacks: {stats['timestamp_fallbacks']}")
+    lines.append(f"  Structured (JSONL):  {stats['structured_lines']}")
+    if stats['lines_per_second'] is not None:
+        lines.append(f"  Throughput:          {stats['lines_per_second']:,.0f} lines/s")
+    for name in ('timestamp_cache', 'classifier_cache'):
+        cache = stats[name]
+        lines.append(f"  {name.replace('_', ' ').capitalize() + ':':21}{cache['hit_rate']:.1%} hit rate "
+                     f"({cache['hits']} hits, {cache['misses']} misses)")
+    if stats['peak_memory_mb'] is not None:
+        lines.append(f"  Peak memory:         {stats['peak_memory_mb']:.1f} MiB")
+    lines.append("  Phase wall time:")
+    for phase, seconds in stats['phase_seconds'].items():
+        lines.append(f"    {phase:19} {seconds:9.4f}s")
+    return "\n".join(lines)
+
+class ResultStore:
+    """Column-oriented storage for parsed log entries
+    
+    Each entry is a row across typed arrays: line number, integer epoch timestamp
+    and ids into one interned string table for status, lab type and message.
+    raw_lines is None when the raw log lines are not retained.
+    """
+    
+    STRING_COLUMNS = {'status': 'status_ids', 'lab_type': 'lab_type_ids', 'message': 'message_ids'}
+    
+    def __init__(self, keep_raw_lines=True):
+        self.line_numbers = array('Q')
+        self.epochs = array('q')
+        self.status_ids = array('I')
+        self.lab_type_ids = array('I')
+        self.message_ids = array('I')
+        self.raw_lines = [] if keep_raw_lines else None
+        self.strings = []
+        self.string_ids = {}
+        self._last_timestamp = None  # Adjacent lines usually share one decoded timestamp
+        self._last_epoch = 0
+    
+    def __len__(self):
+        return len(self.epochs)
+    
+    def _intern(self, value):
+        """Id of value in the string table, adding it on first use"""
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+    
+    def append(self, line_number, timestamp, status, lab_type, message, raw_line=None):
+        """Add a row and return its index"""
+        if timestamp is not self._last_timestamp:
+            self._last_timestamp = timestamp
+            self._last_epoch = (timestamp - EPOCH) // timedelta(microseconds=1)
+        
+        string_ids = self.string_ids
+        self.line_numbers.append(line_number)
+        self.epochs.append(self._last_epoch)
+        self.status_ids.append(string_ids[status] if status in string_ids else self._intern(status))
+        self.lab_type_ids.append(string_ids[lab_type] if lab_type in string_ids else self._intern(lab_type))
+        self.message_ids.append(string_ids[message] if message in string_ids else self._intern(message))
+        if self.raw_lines is not None:
+            self.raw_lines.append(raw_line)
+        return len(self.epochs) - 1
+    
+    def field(self, index, key):
+        """Value of one field of row index, decoded to what the result dicts hold"""
+        if key == 'timestamp':
+            return EPOCH + timedelta(microseconds=self.epochs[index])
+        if key in self.STRING_COLUMNS:
+            return self.strings[getattr(self, self.STRING_COLUMNS[key])[index]]
+        if key == 'line_number':
+            return self.line_numbers[index]
+        if key == 'raw_line':
+            return self.raw_lines[index] if self.raw_lines is not None else None
+        raise KeyError(key)
+
+class LabResult:
+    """Read-only view of one ResultStore row, indexed like a result dict"""
+    
+    __slots__ = ('store', 'index')
+    FIELDS = ('line_number', 'timestamp', 'status', 'lab_type', 'message', 'raw_line')
+    
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+    
+    def __getitem__(self, key):
+        return self.store.field(self.index, key)
+    
+    def get(self, key, default=None):
+        return self.store.field(self.index, key) if key in self.FIELDS else default
+    
+    def keys(self):
+        return self.FIELDS
+    
+    def __repr__(self):
+        return f"LabResult({dict(self)!r})"
+
+class ResultSelection:
+    """Ordered list of ResultStore rows, used in place of the per-line dict lists"""
+    
+    __slots__ = ('store', 'indices')
+    
+    def __init__(self, store):
+        self.store = store
+        self.indices = array('I')
+    
+    def append(self, index):
+        self.indices.append(index)
+    
+    def __len__(self):
+        return len(self.indices)
+    
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [LabResult(self.store, index) for index in self.indices[position]]
+        return LabResult(self.store, self.indices[position])
+    
+    def __iter__(self):
+        for index in self.indices:
+            yield LabResult(self.store, index)
+
+def find_log_segments(log_file):
+    """The files making up a log, oldest first
+    
+    log_file is a single file, a directory of rotated segments (labresults.log,
+    labresults.log.1, labresults.log.2.gz, ...) or a glob pattern. Segments are
+    ordered by their first timestamp, since rotation numbers count backwards.
+    """
+    path = Path(log_file)
+    if path.is_file():
+        return [path]
+    if path.is_dir():
+        segments = [segment for segment in path.iterdir() if '.log' in segment.name]
+    else:
+        segments = [Path(name) for name in glob.glob(str(log_file))]
+    segments = [segment for segment in segments
+                if segment.is_file() and not segment.name.endswith(('.checkpoint', TIME_INDEX_SUFFIX))]
+    if not segments:
+        raise FileNotFoundError(f"Log file {log_file} not found")
+    return sorted(segments, key=_segment_sort_key)
+
+def _segment_sort_key(segment):
+    """Sort by first timestamp, then modification time, which follows rotation order
+    
+    Segments without a timestamp go last.
+    """
+    timestamp = _first_timestamp(segment)
+    return (timestamp is None, timestamp or datetime.min, segment.stat().st_mtime, segment.name)
+
+def _first_timestamp(segment):
+    """Timestamp of the first result in a segment, from its first SEGMENT_PROBE_LINES lines"""
+    with _open_log_segment(segment) as f:
+        for _, line in zip(range(SEGMENT_PROBE_LINES), f):
+            timestamp = _line_timestamp(line)
+            if timestamp is not None:
+                return timestamp
+    return None
+
+def _line_timestamp(line):
+    """Timestamp of a result line in either log format, or None"""
+    line = line.strip()
+    if line[:1] == '{':
+        try:
+            return _record_timestamp(json.loads(line))
+        except (ValueError, TypeError, KeyError, OverflowError, OSError):
+            return None
+    entry = _match_entry_fast(line)
+    return None if entry is None else _decode_timestamp_cached(entry[0])
+
+def merge_log_segments(segments):
+    """Merge logs written side by side (one per checker) into one stream of lines in timestamp order
+    
+    segments are iterables of lines, each already in time order. This is a k-way
+    heap merge, so one line per segment is held at a time. Lines without a
+    timestamp stay after the result before them in their segment, and ties keep
+    segment order.
+    """
+    timestamped = [_timestamped_lines(index, lines) for index, lines in enumerate(segments)]
+    return (line for _, _, _, line in heapq.merge(*timestamped))
+
+def _timestamped_lines(index, lines):
+    """(timestamp, segment index, line number, line) for each line, for merge_log_segments"""
+    timestamp = datetime.min
+    for number, line in enumerate(lines):
+        timestamp = _line_timestamp(line) or timestamp
+        yield timestamp, index, number, line
+
+def _open_log_segment(segment):
+    """Open a log segment for reading text, decompressing by file extension"""
+    return LOG_OPENERS.get(segment.suffix, open)(segment, 'rt')
+
+def _read_log_segments(segments, merge=False):
+    """Yield the lines of each segment in turn, as one logical log
+    
+    With merge=True the segments were written at the same time and are merged
+    by timestamp instead.
+    """
+    if merge:
+        with ExitStack() as stack:
+            yield from merge_log_segments([stack.enter_context(_open_log_segment(segment))
+                                           for segment in segments])
+        return
+    for segment in segments:
+        with _open_log_segment(segment) as f:
+            yield from f
+
+def _is_single_plain_log(log_file):
+    """False for directories, globs and compressed files, which offsets and memory maps cannot address"""
+    path = Path(log_file)
+    return not (path.is_dir() or path.suffix in LOG_OPENERS or any(char in str(log_file) for char in '*?['))
+
+def _split_byte_ranges(mm, parts):
+    """Split a memory-mapped log into at most `parts` newline-aligned (start, end) ranges"""
+    size = len(mm)
+    ranges = []
+    start = 0
+    for part in range(1, parts):
+        newline = mm.find(b'\n', max(start, size * part // parts))
+        if newline == -1:
+            break
+        ranges.append((start, newline + 1))
+        start = newline + 1
+    if start < size:
+        ranges.append((start, size))
+    return ranges
+
+def _parse_byte_ranges(log_file, ranges, fast_parser=True, student=None, classifier=None, profile=False):
+    """Process pool worker: parse byte ranges of a log and return the grader state
+    
+    The state also carries the worker's line counters and step timings so the
+    parent's stats cover the whole log.
+    """
+    grader = LabGrader(log_file, fast_parser=fast_parser, student=student, classifier=classifier,
+                       streaming=True, profile=profile)
+    # Pool processes are reused, so only this task's timestamp cache lookups are reported
+    timestamp_cache = _decode_timestamp_cached.cache_info()
+    with open(log_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in ranges:
+                grader._parse_mapped_range(mm, start, end)
+    state = grader.export_state(include_attempts=False)
+    state['counters'] = {name: getattr(grader, name) for name in STAT_COUNTERS}
+    state['phase_seconds'] = dict(grader.phase_seconds)
+    timestamp_lookups = _decode_timestamp_cached.cache_info()
+    state['cache_lookups'] = {
+        'timestamp_cache': (timestamp_lookups.hits - timestamp_cache.hits,
+                            timestamp_lookups.misses - timestamp_cache.misses),
+        'classifier_cache': tuple(grader.classifier.classify.cache_info()[:2])
+    }
+    return state
+
+def _read_mapped_lines(mm, start, end, line_number=0):
+    """(line number, line) for each line in the newline-aligned byte range [start, end) of a memory map"""
+    mm.seek(start)
+    while mm.tell() < end:
+        line_number += 1
+        yield line_number, mm.readline().decode('utf-8', errors='replace')
+
+class TimeIndex:
+    """Sparse on-disk timestamp index of a log, for grading only the results in a time window
+    
+    Each block of about block_bytes records its byte offset, the line number
+    before it, the student whose section it starts in and the earliest and
+    latest result timestamps inside it. The bounds are per block, so results
+    appended out of time order (one VM after another) are still found. update()
+    only scans what was appended since the last update, starting again at the
+    last block since it may have been partial. A rotated or truncated log is
+    indexed again from the start.
+    """
+    
+    def __init__(self, log_file, index_file=None, block_bytes=TIME_INDEX_BLOCK_BYTES):
+        self.log_file = Path(log_file)
+        self.index_file = Path(index_file or self.log_file.with_name(self.log_file.name + TIME_INDEX_SUFFIX))
+        self.block_bytes = block_bytes
+        self.blocks = []  # [offset, line number before it, student, first timestamp, last timestamp]
+        self.size = 0  # Bytes of the log the blocks cover
+        self.scanned_bytes = 0  # Bytes read by the last update
+    
+    def update(self):
+        """Index the log up to its current end, scanning only new bytes; returns self"""
+        stat = self.log_file.stat()
+        self._load(stat)
+        self.scanned_bytes = 0
+        if self.blocks and self.size == stat.st_size:
+            return self
+            
+        offset, line_number, student = self.blocks.pop()[:3] if self.blocks else (0, 0, None)
+        start = offset
+        block = None
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            for raw_line in f:
+                if block is None or offset - block[0] >= self.block_bytes:
+                    block = [offset, line_number, student, None, None]
+                    self.blocks.append(block)
+                line = raw_line.decode('utf-8', errors='replace')
+                if line.startswith(STUDENT_MARKER):
+                    match = STUDENT_MARKER_RE.match(line)
+                    if match:
+                        student = match.group(1).strip()
+                else:
+                    timestamp = _line_timestamp(line)
+                    if timestamp is not None:
+                        block[3] = timestamp if block[3] is None else min(block[3], timestamp)
+                        block[4] = timestamp if block[4] is None else max(block[4], timestamp)
+                offset += len(raw_line)
+                line_number += 1
+                
+        self.size = offset
+        self.scanned_bytes = offset - start
+        try:
+            self._save(stat.st_ino)
+        except OSError:
+            pass  # The index only speeds up later queries, so a read-only log directory is not an error
+        return self
+    
+    def ranges(self, since=None, until=None):
+        """(start, end, line number before start, student) for the byte ranges holding every result in [since, until)
+        
+        Blocks whose timestamps overlap the window are kept, and adjacent ones are joined.
+        """
+        since = since or datetime.min
+        until = until or datetime.max
+        ranges = []
+        for position, (offset, line_number, student, first, last) in enumerate(self.blocks):
+            if first is None or last < since or first >= until:
+                continue
+            end = self.blocks[position + 1][0] if position + 1 < len(self.blocks) else self.size
+            if ranges and ranges[-1][1] == offset:
+                ranges[-1][1] = end
+            else:
+                ranges.append([offset, end, line_number, student])
+        return [tuple(byte_range) for byte_range in ranges]
+    
+    def _load(self, stat):
+        """Read the saved index, keeping it only if it still describes the start of this log"""
+        self.blocks, self.size = [], 0
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (index.get('version') != TIME_INDEX_VERSION or index.get('inode') != stat.st_ino
+                or index.get('block_bytes') != self.block_bytes or index.get('size', 0) > stat.st_size):
+            return
+        self.size = index['size']
+        self.blocks = [[offset, line_number, student,
+                        first and datetime.fromisoformat(first), last and datetime.fromisoformat(last)]
+                       for offset, line_number, student, first, last in index['blocks']]
+    
+    def _save(self, inode):
+        """Write the index atomically, as save_checkpoint does"""
+        index = {
+            'version': TIME_INDEX_VERSION,
+            'log_file': str(self.log_file),
+            'inode': inode,
+            'block_bytes': self.block_bytes,
+            'size': self.size,
+            'blocks': [[offset, line_number, student, first and first.isoformat(), last and last.isoformat()]
+                       for offset, line_number, student, first, last in self.blocks]
+        }
+        temp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(index, f)
+        os.replace(temp_file, self.index_file)
+
+class LabGrader:
+    def __init__(self, log_file="labresults.log", fast_parser=True, student=None, classifier=None,
+                 streaming=False, compact=False, keep_raw_lines=True, profile=False, merge_segments=False,
+                 since=None, until=None, time_index_file=None):
+        self.log_file = Path(log_file)
+        self.merge_segments = merge_segments  # Merge log segments by timestamp instead of concatenating
+        # Only results in [since, until) are graded; a single log is read through its TimeIndex
+        self.since = since
+        self.until = until
+        self.window = (since or datetime.min, until or datetime.max) if since or until else None
+        self.time_index_file = time_index_file
+        self.fast_parser = fast_parser
+        self.student = student  # Set when grading one student's shard of a shared log
+        self.classifier = classifier or LabClassifier()
+        self.streaming = streaming  # Fold lines into task_stats instead of keeping them
+        self.keep_raw_lines = keep_raw_lines
+        self.store = ResultStore(keep_raw_lines) if compact else None  # Backs the lists below when compact
+        self.results = self._new_result_list()
+        self.lab_sessions = defaultdict(self._new_result_list)
+        self.task_attempts = defaultdict(self._new_result_list)  # Track attempts per task
+        self.final_status = {}  # Final pass/fail status per task
+        self.total_entries = 0  # Parsed entries, including ones restored from a checkpoint
+        self.first_line_number = None  # Line of the first result in the time window
+        self.attempt_counts = Counter()  # Attempts per task, including restored ones
+        self.task_stats = {}  # Per-task counters (streaming mode, parallel workers and checkpoints)
+        self.offset = 0  # Byte offset of the next unparsed line (incremental mode)
+        self.line_number = 0  # Last line number consumed (incremental mode)
+        self.lines_read = 0  # Line counters for this run, see stats
+        self.blank_lines = 0
+        self.unmatched_lines = 0
+        self.timestamp_fallbacks = 0
+        self.structured_lines = 0
+        self.phase_seconds = {}  # Wall time per phase; per-step parse timings with profile
+        self.worker_cache_lookups = {}  # Cache (hits, misses) made in --jobs workers
+        self.profile = profile
+        if profile:
+            self._parse_line = self._parse_line_profiled
+        
+    def _new_result_list(self):
+        """Empty per-line list: a plain list, or a ResultSelection in compact mode"""
+        return [] if self.store is None else ResultSelection(self.store)
+    
+    def parse_log_file(self):
+        """Parse the labresults.log file and extract all test results
+        
+        The log may also be a directory or glob of rotated, optionally compressed
+        segments, which are streamed oldest first as one log, or with
+        merge_segments=True merged by timestamp. With a time window, a single log is
+        read only where its TimeIndex has results in the window.
+        """
+        segments = find_log_segments(self.log_file)
+        if self.window is not None and _is_single_plain_log(self.log_file):
+            self._parse_time_window()
+            return
+            
+        with _timed(self.phase_seconds, 'parse'):
+            for line_num, line in enumerate(_read_log_segments(segments, self.merge_segments), 1):
+                self._parse_line(line, line_num)
+    
+    def _parse_time_window(self):
+        """Parse the blocks of the log whose timestamps overlap the window, updating the index first"""
+        with _timed(self.phase_seconds, 'index'):
+            index = TimeIndex(self.log_file, self.time_index_file).update()
+        ranges = index.ranges(*self.window)
+        if not ranges:
+            return
+            
+        with _timed(self.phase_seconds, 'parse'), open(self.log_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end, line_number, _ in ranges:
+                    for line_num, line in _read_mapped_lines(mm, start, end, line_number):
+                        self._parse_line(line, line_num)
+    
+    def parse_log_parallel(self, jobs):
+        """Parse the log as `jobs` newline-aligned byte ranges in a process pool
+        
+        Workers return per-task attempt counts and final statuses, which are merged
+        in file order. results, lab_sessions and task_attempts stay empty, so only
+        the aggregate report data is available afterwards.
+        """
+        if not self.log_file.exists():
+            raise FileNotFoundError(f"Log file {self.log_file} not found")
+        if not _is_single_plain_log(self.log_file):
+            raise ValueError(f"parallel parsing needs a single uncompressed log, not {self.log_file}")
+        if self.window is not None:
+            raise ValueError("parallel parsing cannot be limited to a time window")
+        if self.log_file.stat().st_size == 0:
+            return
+            
+        with _timed(self.phase_seconds, 'parse'):
+            with open(self.log_file, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    ranges = _split_byte_ranges(mm, jobs)
+            
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(_parse_byte_ranges, str(self.log_file), [byte_range],
+                                           self.fast_parser, None, self.classifier, self.profile)
+                           for byte_range in ranges]
+                for future in futures:
+                    self.merge_state(future.result())
+    
+    def parse_log_incremental(self, checkpoint_file=None):
+        """Parse only the lines appended since the last checkpoint, then save a new one
+        
+        The checkpoint lives next to the log by default and holds the byte offset,
+        an inode/size fingerprint and the per-task aggregates (final status,
+        attempt counts and task stats), so its size does not grow with the log. If
+        the log was rotated or truncated since, it is parsed again from the start.
+        After resuming, results, lab_sessions and task_attempts only hold the
+        entries parsed in this run. A last line without a newline may still be
+        being written: it is graded, but after the checkpoint is saved, so the next
+        run reads it again.
+        """
+        if not self.log_file.exists():
+            raise FileNotFoundError(f"Log file {self.log_file} not found")
+        if not _is_single_plain_log(self.log_file):
+            raise ValueError(f"incremental parsing needs a single uncompressed log, not {self.log_file}")
+        if self.window is not None:
+            raise ValueError("incremental parsing cannot be limited to a time window")
+            
+        checkpoint_file = Path(checkpoint_file or self.default_checkpoint_file())
+        stat = self.log_file.stat()
+        
+        if checkpoint_file.exists():
+            checkpoint = self.load_checkpoint(checkpoint_file)
+            if checkpoint.get('inode') == stat.st_ino and checkpoint.get('offset', 0) <= stat.st_size:
+                self.load_state(checkpoint)
+        
+        with _timed(self.phase_seconds, 'parse'), open(self.log_file, 'rb') as f:
+            f.seek(self.offset)
+            for line in self._read_complete_lines(f):
+                self.line_number += 1
+                self._parse_line(line, self.line_number)
+            f.seek(self.offset)
+            partial_line = f.readline()
+        
+        self.save_checkpoint(checkpoint_file, stat.st_ino)
+        if partial_line:
+            self.line_number += 1
+            self._parse_line(partial_line.decode('utf-8', errors='replace'), self.line_number)
+    
+    def default_checkpoint_file(self):
+        """Checkpoint path used when none is given: <log file>.checkpoint"""
+        return self.log_file.with_name(self.log_file.name + '.checkpoint')
+    
+    def _read_complete_lines(self, f):
+        """Yield decoded lines from a binary file, advancing self.offset past each one
+        
+        A trailing line without a newline may still be being written, so it is
+        not yielded and the offset stays before it.
+        """
+        for raw_line in f:
+            if not raw_line.endswith(b'\n'):
+                break
+            self.offset += len(raw_line)
+            yield raw_line.decode('utf-8', errors='replace')
+    
+    def _parse_mapped_range(self, mm, start, end):
+        """Parse the newline-aligned byte range [start, end) of a memory-mapped log"""
+        mm.seek(start)
+        while mm.tell() < end:
+            self.line_number += 1
+            self._parse_line(mm.readline().decode('utf-8', errors='replace'), self.line_number)
+    
+    def export_state(self, include_attempts=True):
+        """Return the parser position and task state as a plain dictionary
+        
+        Without include_attempts only the per-task attempt counts are kept, which
+        is all the reports need and much cheaper to pass between processes.
+        """
+        state = {
+            'offset': self.offset,
+            'line_number': self.line_number,
+            'total_entries': self.total_entries,
+            'lab_types': list(self.lab_sessions.keys()),
+            'attempt_counts': dict(self.attempt_counts),
+            'final_status': {task_name: dict(info) for task_name, info in self.final_status.items()},
+            'task_stats': {task_name: dict(stats) for task_name, stats in self.task_stats.items()}
+        }
+        if include_attempts:
+            state['task_attempts'] = {task_name: [{key: attempt[key] for key in ATTEMPT_FIELDS}
+                                                  for attempt in attempts]
+                                      for task_name, attempts in self.task_attempts.items()}
+        return state
+    
+    def load_state(self, state):
+        """Restore parser position and task state from export_state() output"""
+        self.offset = state['offset']
+        self.line_number = state['line_number']
+        self.total_entries = state['total_entries']
+        if 'attempt_counts' in state:
+            self.attempt_counts = Counter(state['attempt_counts'])
+        else:
+            # Checkpoints written before attempt counts were tracked
+            self.attempt_counts = Counter({task_name: len(attempts)
+                                           for task_name, attempts in state['task_attempts'].items()})
+        
+        # Keep lab ordering stable; the per-line lists themselves are not restored
+        for lab_type in state['lab_types']:
+            self.lab_sessions.setdefault(lab_type, self._new_result_list())
+        
+        for task_name, attempts in state.get('task_attempts', {}).items():
+            if self.store is None:
+                self.task_attempts[task_name] = attempts
+                continue
+            for attempt in attempts:
+                # Restored attempts have no line of their own in this run
+                self.task_attempts[task_name].append(self.store.append(
+                    0, attempt['timestamp'], attempt['status'], attempt['lab_type'], attempt['message']))
+        
+        self.final_status.update(state['final_status'])
+        self.task_stats.update(state.get('task_stats', {}))
+        self._add_run_stats(state)
+    
+    def merge_state(self, state):
+        """Append the state of a grader that parsed the log section right after this one"""
+        for lab_type in state['lab_types']:
+            self.lab_sessions.setdefault(lab_type, self._new_result_list())
+        
+        # A later section's final status wins; its attempt count includes earlier sections
+        for task_name, info in state['final_status'].items():
+            self.final_status[task_name] = dict(info, attempts=self.attempt_counts[task_name] + info['attempts'])
+        
+        for task_name, stats in state.get('task_stats', {}).items():
+            current = self.task_stats.get(task_name)
+            if current is None:
+                self.task_stats[task_name] = dict(stats)
+            else:
+                current.update(attempts=current['attempts'] + stats['attempts'], lab_type=stats['lab_type'],
+                               last_status=stats['last_status'], last_timestamp=stats['last_timestamp'])
+        
+        self.attempt_counts.update(state['attempt_counts'])
+        self.total_entries += state['total_entries']
+        self.line_number += state['line_number']
+        self._add_run_stats(state)
+    
+    def _add_run_stats(self, state):
+        """Add a worker's line counters and step timings, if its state carries them"""
+        for name, value in state.get('counters', {}).items():
+            setattr(self, name, getattr(self, name) + value)
+        for phase, seconds in state.get('phase_seconds', {}).items():
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+        for cache, (hits, misses) in state.get('cache_lookups', {}).items():
+            worker_hits, worker_misses = self.worker_cache_lookups.get(cache, (0, 0))
+            self.worker_cache_lookups[cache] = (worker_hits + hits, worker_misses + misses)
+    
+    def save_checkpoint(self, checkpoint_file, inode):
+        """Write the parser position and per-task aggregates to checkpoint_file atomically
+        
+        The attempt history is folded into task stats rather than saved, as the
+        reports only need final statuses and counts.
+        """
+        checkpoint = self.export_state(include_attempts=False)
+        checkpoint['task_stats'] = self.get_task_stats()
+        checkpoint['log_file'] = str(self.log_file)
+        checkpoint['inode'] = inode
+        
+        for info in checkpoint['final_status'].values():
+            info['timestamp'] = info['timestamp'].isoformat()
+        for stats in checkpoint['task_stats'].values():
+            stats['first_timestamp'] = stats['first_timestamp'].isoformat()
+            stats['last_timestamp'] = stats['last_timestamp'].isoformat()
+        
+        temp_file = checkpoint_file.with_name(checkpoint_file.name + '.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_file, checkpoint_file)
+    
+    @staticmethod
+    def load_checkpoint(checkpoint_file):
+        """Read a checkpoint written by save_checkpoint, decoding its timestamps"""
+        with open(checkpoint_file, 'r') as f:
+            checkpoint = json.load(f)
+        
+        # Checkpoints written before task stats replaced the attempt history still carry it
+        for attempts in checkpoint.get('task_attempts', {}).values():
+            for attempt in attempts:
+                attempt['timestamp'] = datetime.fromisoformat(attempt['timestamp'])
+        for info in checkpoint['final_status'].values():
+            info['timestamp'] = datetime.fromisoformat(info['timestamp'])
+        for stats in checkpoint.get('task_stats', {}).values():
+            stats['first_timestamp'] = datetime.fromisoformat(stats['first_timestamp'])
+            stats['last_timestamp'] = datetime.fromisoformat(stats['last_timestamp'])
+        
+        return checkpoint
+    
+    def _parse_line(self, line, line_num):
+        """Parse one log line and record it if it is a test result"""
+        self.lines_read += 1
+        line = line.strip()
+        if line[:1] == '{':
+            record = self._decode_record(line)
+            if record is not None:
+                self._record_result(line_num, *record[:3], line, record[3])
+            return
+        entry = self.parse_entry(line)
+        if entry is not None:
+            self._record_result(line_num, *entry, line)
+    
+    def _parse_line_profiled(self, line, line_num):
+        """_parse_line that also adds each step's wall time to phase_seconds (profile mode)"""
+        clock = time.perf_counter
+        phase_seconds = self.phase_seconds
+        start = clock()
+        
+        self.lines_read += 1
+        line = line.strip()
+        if line[:1] == '{':
+            record = self._decode_record(line)
+            decoded = clock()
+            phase_seconds['json'] = phase_seconds.get('json', 0.0) + decoded - start
+            if record is not None:
+                self._record_result(line_num, *record[:3], line, record[3])
+                phase_seconds['record'] = phase_seconds.get('record', 0.0) + clock() - decoded
+            return
+            
+        entry = self._match_entry(line)
+        matched = clock()
+        phase_seconds['regex'] = phase_seconds.get('regex', 0.0) + matched - start
+        if entry is None:
+            return
+        
+        timestamp, status, message = self._decode_entry(*entry)
+        decoded = clock()
+        classification = self.classifier.classify(message)
+        classified = clock()
+        self._record_result(line_num, timestamp, status, message, line, classification)
+        recorded = clock()
+        
+        phase_seconds['timestamp'] = phase_seconds.get('timestamp', 0.0) + decoded - matched
+        phase_seconds['classify'] = phase_seconds.get('classify', 0.0) + classified - decoded
+        phase_seconds['record'] = phase_seconds.get('record', 0.0) + recorded - classified
+    
+    def parse_entry(self, line):
+        """Split a stripped log line into (timestamp, status, message), or None if it is not a result"""
+        entry = self._match_entry(line)
+        return None if entry is None else self._decode_entry(*entry)
+    
+    def parse_classified(self, line):
+        """(timestamp, status, message, (lab type, task name)) for a stripped line in either format
+        
+        Structured records name their lab and task; text lines are classified
+        from the message. Returns None if the line is not a result.
+        """
+        if line[:1] == '{':
+            return self._decode_record(line)
+        entry = self.parse_entry(line)
+        return None if entry is None else (*entry, self.classifier.classify(entry[2]))
+    
+    def _decode_record(self, line):
+        """Structured path: (timestamp, status, message, (lab type, task name)) from a JSONL record
+        
+        Records are written by the checker scripts with LAB_RESULTS_FORMAT=jsonl and
+        carry an epoch timestamp plus explicit lab and task names, so no regex,
+        strptime or keyword classification is needed. The timestamp is read as the
+        VM's local time, as text lines are. Returns None if the line is not a valid
+        record, including one whose lab, task, status or message is not a string.
+        """
+        try:
+            record = json.loads(line)
+            timestamp = _record_timestamp(record)
+            classification = (record['lab'], record['task'])
+            message = record.get('message', '')
+            if not all(isinstance(field, str) for field in (*classification, record['status'], message)):
+                raise TypeError("lab, task, status and message must be strings")
+            status = _normalize_status(record['status'])
+        except (ValueError, TypeError, KeyError, OverflowError, OSError):
+            self.unmatched_lines += 1
+            return None
+        
+        self.structured_lines += 1
+        return timestamp, status, message, classification
+    
+    def _match_entry(self, line):
+        """Regex step of parse_entry: (timestamp string, status, message) or None"""
+        if not line:
+            self.blank_lines += 1
+            return None
+            
+        # Parse log entry format: "timestamp: STATUS: message"
+        if self.fast_parser:
+            entry = _match_entry_fast(line)
+        else:
+            entry = _match_entry_legacy(line)
+        
+        if entry is None:
+            self.unmatched_lines += 1
+        return entry
+    
+    def _decode_entry(self, timestamp_str, status, message):
+        """Timestamp and status step of parse_entry"""
+        if self.fast_parser:
+            timestamp = _decode_timestamp_cached(timestamp_str.strip())
+        else:
+            timestamp = _decode_timestamp(timestamp_str.strip())
+        if timestamp is None:
+            self.timestamp_fallbacks += 1
+            # Use current time if parsing fails, except in a time window, which leaves the line out
+            # as the TimeIndex does, instead of placing it by when the grader happens to run
+            if self.window is None:
+                timestamp = datetime.now()
+        
+        # Normalize status for overall verification results
+        return timestamp, _normalize_status(status), message
+    
+    def _record_result(self, line_num, timestamp, status, message, line, classification=None):
+        """Store a parsed result and update task attempts and final status"""
+        if self.window is not None:
+            if timestamp is None or not self.window[0] <= timestamp < self.window[1]:
+                return
+            if not self.total_entries:
+                self.first_line_number = line_num  # Orders students in time-window reports
+        self.total_entries += 1
+        
+        # Group by lab type and track task attempts
+        lab_type, task_name = classification or self.classifier.classify(message)
+        self.attempt_counts[task_name] += 1
+        
+        if self.streaming:
+            self._fold_result(task_name, lab_type, timestamp, status)
+        elif self.store is not None:
+            index = self.store.append(line_num, timestamp, status, lab_type, message.strip(),
+                                      line if self.keep_raw_lines else None)
+            self.results.append(index)
+            self.lab_sessions[lab_type].append(index)
+            self.task_attempts[task_name].append(index)
+        else:
+            result = {
+                'line_number': line_num,
+                'timestamp': timestamp,
+                'status': status,
+                'message': message.strip(),
+                'raw_line': line if self.keep_raw_lines else None
+            }
+            
+            self.results.append(result)
+            self.lab_sessions[lab_type].append(result)
+            self.task_attempts[task_name].append({
+                'timestamp': timestamp,
+                'status': status,
+                'lab_type': lab_type,
+                'message': message
+            })
+        
+        # Update final status (latest attempt wins)
+        if status in ['PASS', 'FAIL']:
+            self.final_status[task_name] = {
+                'status': status,
+                'timestamp': timestamp,
+                'lab_type': lab_type,
+                'attempts': self.attempt_counts[task_name]
+            }
+    
+    def _fold_result(self, task_name, lab_type, timestamp, status):
+        """Streaming mode: update per-task counters without keeping the line"""
+        if lab_type not in self.lab_sessions:
+            # Only the key is kept, to preserve lab ordering in the reports
+            self.lab_sessions[lab_type] = self._new_result_list()
+        
+        stats = self.task_stats.get(task_name)
+        if stats is None:
+            self.task_stats[task_name] = {
+                'attempts': 1,
+                'lab_type': lab_type,
+                'first_try_pass': status == 'PASS',
+                'first_timestamp': timestamp,
+                'last_status': status,
+                'last_timestamp': timestamp
+            }
+        else:
+            stats['attempts'] += 1
+            stats['lab_type'] = lab_type
+            stats['last_status'] = status
+            stats['last_timestamp'] = timestamp
+    
+    def get_task_stats(self):
+        """Per-task counters: attempts, first-try flag, first/last timestamp and last status
+        
+        Taken from the streaming or checkpointed counters, extended by the attempts
+        kept in task_attempts, which follow them in the log.
+        """
+        task_stats = {task_name: dict(stats) for task_name, stats in self.task_stats.items()}
+        
+        for task_name, attempts in self.task_attempts.items():
+            if not attempts:
+                continue
+            stats = task_stats.get(task_name)
+            if stats is None:
+                task_stats[task_name] = {
+                    'attempts': len(attempts),
+                    'lab_type': attempts[-1]['lab_type'],
+                    'first_try_pass': attempts[0]['status'] == 'PASS',
+                    'first_timestamp': attempts[0]['timestamp'],
+                    'last_status': attempts[-1]['status'],
+                    'last_timestamp': attempts[-1]['timestamp']
+                }
+            else:
+                stats.update(attempts=stats['attempts'] + len(attempts), lab_type=attempts[-1]['lab_type'],
+                             last_status=attempts[-1]['status'], last_timestamp=attempts[-1]['timestamp'])
+        
+        return task_stats
+    
+    def _identify_lab_type(self, message):
+        """Identify lab type based on message content"""
+        return self.classifier.classify(message)[0]
+    
+    def _extract_task_name(self, message):
+        """Extract specific task name from message for tracking attempts"""
+        return self.classifier.classify(message)[1]
+    
+    def calculate_lab_results(self):
+        """Calculate pass/fail results and improvement metrics"""
+        lab_results = {}
+        
+        for lab_type in self.lab_sessions.keys():
+            # Get all tasks for this lab type
+            lab_tasks = {task: info for task, info in self.final_status.items() 
+                        if info['lab_type'] == lab_type}
+            
+            if not lab_tasks:
+                continue
+                
+            passed_tasks = sum(1 for info in lab_tasks.values() if info['status'] == 'PASS')
+            total_tasks = len(lab_tasks)
+            total_attempts = sum(info['attempts'] for info in lab_tasks.values())
+            
+            # Calculate improvement metrics
+            improvement_data = self._calculate_improvement_metrics(lab_type, lab_tasks)
+            
+            lab_results[lab_type] = {
+                'passed_tasks': passed_tasks,
+                'total_tasks': total_tasks,
+                'pass_rate': (passed_tasks / total_tasks * 100) if total_tasks > 0 else 0,
+                'overall_status': 'PASS' if passed_tasks == total_tasks else 'FAIL',
+                'total_attempts': total_attempts,
+                'average_attempts': total_attempts / total_tasks if total_tasks > 0 else 0,
+                'tasks': lab_tasks,
+                'improvement': improvement_data
+            }
+        
+        return lab_results
+    
+    def _calculate_improvement_metrics(self, lab_type, lab_tasks):
+        """Calculate improvement metrics for a lab"""
+        improvement_data = {
+            'retry_success_count': 0,
+            'first_try_success_count': 0,
+            'persistent_failures': 0,
+            'max_attempts': 0,
+            'tasks_with_multiple_attempts': 0
+        }
+        
+        for task_name, task_info in lab_tasks.items():
+            attempts = task_info['attempts']
+            status = task_info['status']
+            
+            improvement_data['max_attempts'] = max(improvement_data['max_attempts'], attempts)
+            
+            if attempts > 1:
+                improvement_data['tasks_with_multiple_attempts'] += 1
+                if status == 'PASS':
+                    improvement_data['retry_success_count'] += 1
+                else:
+                    improvement_data['persistent_failures'] += 1
+            elif attempts == 1 and status == 'PASS':
+                improvement_data['first_try_success_count'] += 1
+        
+        return improvement_data
+    
+    def generate_reports(self, output_formats, lab_results=None):
+        """Generate several report formats from a single calculate_lab_results() pass"""
+        if lab_results is None:
+            with _timed(self.phase_seconds, 'calculate'):
+                lab_results = self.calculate_lab_results()
+        
+        generators = {
+            'text': self.generate_text_report,
+            'json': self.generate_json_report,
+            'html': self.generate_html_report
+        }
+        with _timed(self.phase_seconds, 'render'):
+            return {output_format: generators[output_format](lab_results) for output_format in output_formats}
+    
+    @property
+    def stats(self):
+        """Line counters, per-phase wall times, cache hit rates and peak memory for this run
+        
+        phase_seconds holds parse, calculate and render; with profile=True the parse
+        is also split into read (file I/O and loop overhead), regex, timestamp,
+        classify and record.
+        """
+        return _build_stats({name: getattr(self, name) for name in STAT_COUNTERS},
+                            self.phase_seconds, self.classifier, self.worker_cache_lookups)
+    
+    def write_reports(self, output_dir, output_formats, prefix=None):
+        """Write each requested format to output_dir; returns the written paths"""
+        return self.save_reports(output_dir, self.generate_reports(output_formats), prefix)
+    
+    @staticmethod
+    def save_reports(output_dir, reports, prefix=None):
+        """Write reports ({format: report}) to output_dir under their usual names; returns the paths"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        written = []
+        for output_format, report in reports.items():
+            suffix = REPORT_SUFFIXES[output_format]
+            report_file = output_dir / (prefix + suffix if prefix else suffix.lstrip('_'))
+            with open(report_file, 'w') as f:
+                f.write(report)
+            written.append(report_file)
+        
+        return written
+    
+    def generate_text_report(self, lab_results=None):
+        """Generate a comprehensive text-based grade report"""
+        if not self.total_entries:
+            return "No lab results found in log file."
+            
+        if lab_results is None:
+            lab_results = self.calculate_lab_results()
+        
+        report = []
+        report.append("=" * 80)
+        report.append("LAB GRADING REPORT - PASS/FAIL WITH IMPROVEMENT TRACKING")
+        report.append("=" * 80)
+        report.append(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Log File: {self.log_file}")
+        if self.student:
+            report.append(f"Student: {self.student}")
+        if self.window is not None:
+            report.append(f"Time Window: {self._time_window_label()}")
+        report.append(f"Total Log Entries: {self.total_entries}")
+        report.append("")
+        
+        # Overall Summary
+        total_labs = len(lab_results)
+        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
+        
+        report.append("OVERALL SUMMARY")
+        report.append("-" * 40)
+        report.append(f"Total Labs: {total_labs}")
+        report.append(f"Labs Passed: {passed_labs}")
+        report.append(f"Labs Failed: {total_labs - passed_labs}")
+        report.append(f"Overall Status: {'PASS' if passed_labs == total_labs else 'FAIL'}")
+        report.append("")
+        
+        # Individual Lab Results
+        report.append("LAB RESULTS")
+        report.append("-" * 40)
+        
+        for lab_type, result in sorted(lab_results.items()):
+            status_symbol = "✓" if result['overall_status'] == 'PASS' else "✗"
+            report.append(f"{status_symbol} {lab_type:25}: {result['overall_status']:4} "
+                         f"({result['passed_tasks']}/{result['total_tasks']} tasks, "
+                         f"{result['total_attempts']} total attempts)")
+        
+        report.append("")
+        
+        # Improvement Analysis
+        report.append("IMPROVEMENT ANALYSIS")
+        report.append("-" * 40)
+        
+        total_retry_successes = sum(r['improvement']['retry_success_count'] for r in lab_results.values())
+        total_first_try_successes = sum(r['improvement']['first_try_success_count'] for r in lab_results.values())
+        total_multiple_attempt_tasks = sum(r['improvement']['tasks_with_multiple_attempts'] for r in lab_results.values())
+        
+        report.append(f"First-try successes: {total_first_try_successes}")
+        report.append(f"Retry successes: {total_retry_successes}")
+        report.append(f"Tasks requiring multiple attempts: {total_multiple_attempt_tasks}")
+        
+        if total_retry_successes > 0:
+            report.append(f"💪 Improvement shown: {total_retry_successes} tasks succeeded after retry!")
+        
+        report.append("")
+        
+        # Detailed Lab Analysis
+        report.append("DETAILED LAB ANALYSIS")
+        report.append("-" * 80)
+        
+        for lab_type, result in sorted(lab_results.items()):
+            report.append(f"\n{lab_type.upper()}")
+            report.append("-" * len(lab_type))
+            report.append(f"Status: {result['overall_status']} ({result['passed_tasks']}/{result['total_tasks']} tasks)")
+            report.append(f"Total Attempts: {result['total_attempts']} (avg: {result['average_attempts']:.1f} per task)")
+            
+            # Improvement metrics for this lab
+            imp = result['improvement']
+            if imp['retry_success_count'] > 0:
+                report.append(f"✨ Improvement: {imp['retry_success_count']} tasks succeeded after retry")
+            if imp['first_try_success_count'] > 0:
+                report.append(f"⚡ First-try: {imp['first_try_success_count']} tasks passed immediately")
+            if imp['persistent_failures'] > 0:
+                report.append(f"⚠️  Persistent: {imp['persistent_failures']} tasks failed despite retries")
+            
+            report.append("")
+            report.append("Task Details:")
+            
+            for task_name, task_info in sorted(result['tasks'].items()):
+                status_symbol = "✓" if task_info['status'] == 'PASS' else "✗"
+                attempts_str = f"({task_info['attempts']} attempts)" if task_info['attempts'] > 1 else "(1 attempt)"
+                
+                improvement_indicator = ""
+                if task_info['attempts'] > 1 and task_info['status'] == 'PASS':
+                    improvement_indicator = " 📈"
+                elif task_info['attempts'] > 1 and task_info['status'] == 'FAIL':
+                    improvement_indicator = " 🔄"
+                
+                report.append(f"  {status_symbol} {task_name:30} {task_info['status']:4} {attempts_str}{improvement_indicator}")
+        
+        # Recommendations
+        report.append("")
+        report.append("RECOMMENDATIONS")
+        report.append("-" * 40)
+        
+        failed_labs = [name for name, result in lab_results.items() if result['overall_status'] == 'FAIL']
+        
+        if not failed_labs:
+            report.append("🎉 Excellent! All labs passed successfully!")
+            if total_retry_successes > 0:
+                report.append("👏 Great persistence shown - you improved through practice!")
+        else:
+            report.append(f"📚 Focus on these failed labs: {', '.join(failed_labs)}")
+            if total_retry_successes > 0:
+                report.append("👍 You're showing good improvement - keep practicing!")
+            
+            # Show tasks that need attention
+            persistent_failures = []
+            for lab_type, result in lab_results.items():
+                for task_name, task_info in result['tasks'].items():
+                    if task_info['status'] == 'FAIL' and task_info['attempts'] > 1:
+                        persistent_failures.append(f"{lab_type}: {task_name}")
+            
+            if persistent_failures:
+                report.append("")
+                report.append("Tasks needing extra attention (failed despite retries):")
+                for task in persistent_failures[:5]:  # Show top 5
+                    report.append(f"  • {task}")
+        
+        report.append("")
+        report.append("=" * 80)
+        
+        return "\n".join(report)
+    
+    def _time_window_label(self):
+        """The time window as shown in reports, e.g. 2025-07-21 09:00:00 to end of log"""
+        since = f"{self.since:%Y-%m-%d %H:%M:%S}" if self.since else "start of log"
+        until = f"{self.until:%Y-%m-%d %H:%M:%S}" if self.until else "end of log"
+        return f"{since} to {until}"
+    
+    def generate_json_report(self, lab_results=None):
+        """Generate JSON format report for programmatic use"""
+        if lab_results is None:
+            lab_results = self.calculate_lab_results()
+        
+        # Calculate overall metrics
+        total_labs = len(lab_results)
+        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
+        total_retry_successes = sum(r['improvement']['retry_success_count'] for r in lab_results.values())
+        total_first_try_successes = sum(r['improvement']['first_try_success_count'] for r in lab_results.values())
+        
+        report_data = {
+            'report_generated': datetime.now().isoformat(),
+            'log_file': str(self.log_file),
+            'overall_status': 'PASS' if passed_labs == total_labs else 'FAIL',
+            'summary': {
+                'total_labs': total_labs,
+                'labs_passed': passed_labs,
+                'labs_failed': total_labs - passed_labs,
+                'total_entries': self.total_entries
+            },
+            'improvement_metrics': {
+                'first_try_successes': total_first_try_successes,
+                'retry_successes': total_retry_successes,
+                'total_multiple_attempt_tasks': sum(r['improvement']['tasks_with_multiple_attempts'] for r in lab_results.values()),
+                'improvement_shown': total_retry_successes > 0
+            },
+            'lab_results': {}
+        }
+        
+        if self.student:
+            report_data['student'] = self.student
+        if self.window is not None:
+            report_data['time_window'] = {'since': self.since and self.since.isoformat(),
+                                          'until': self.until and self.until.isoformat()}
+        
+        # Add detailed lab results
+        for lab_type, result in lab_results.items():
+            report_data['lab_results'][lab_type] = {
+                'overall_status': result['overall_status'],
+                'passed_tasks': result['passed_tasks'],
+                'total_tasks': result['total_tasks'],
+                'pass_rate': result['pass_rate'],
+                'total_attempts': result['total_attempts'],
+                'average_attempts': result['average_attempts'],
+                'improvement_metrics': result['improvement'],
+                'tasks': {
+                    task_name: {
+                        'status': task_info['status'],
+                        'attempts': task_info['attempts'],
+                        'timestamp': task_info['timestamp'].isoformat()
+                    }
+                    for task_name, task_info in result['tasks'].items()
+                }
+            }
+        
+        return json.dumps(report_data, indent=2)
+    
+    def generate_html_report(self, lab_results=None):
+        """Generate HTML format report"""
+        if lab_results is None:
+            lab_results = self.calculate_lab_results()
+        
+        # Calculate overall metrics
+        total_labs = len(lab_results)
+        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
+        total_retry_successes = sum(r['improvement']['retry_success_count'] for r in lab_results.values())
+        overall_status = 'PASS' if passed_labs == total_labs else 'FAIL'
+        student_html = f"\n        <p>Student: {escape(self.student)}</p>" if self.student else ""
+        if self.window is not None:
+            student_html += f"\n        <p>Time Window: {self._time_window_label()}</p>"
+        
+        html = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Lab Grading Report - Pass/Fail with Improvement Tracking</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 40px; }}
+        .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
+        .summary-cards {{ display: flex; gap: 20px; margin: 20px 0; }}
+        .card {{ background: #ecf0f1; padding: 15px; border-radius: 5px; flex: 1; text-align: center; }}
+        .pass-card {{ background: #d5f4e6; }}
+        .fail-card {{ background: #fdeaea; }}
+        .improvement-card {{ background: #fff3cd; }}
+        .lab-section {{ margin: 20px 0; }}
+        .pass {{ color: #27ae60; font-weight: bold; }}
+        .fail {{ color: #e74c3c; font-weight: bold; }}
+        .task-table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
+        .task-table th, .task-table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        .task-table th {{ background-color: #f2f2f2; }}
+        .improvement-icon {{ font-size: 1.2em; }}
+        .lab-header {{ background: #34495e; color: white; padding: 10px; margin: 15px 0 5px 0; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Lab Grading Report - Pass/Fail with Improvement Tracking</h1>
+        <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Log File: {self.log_file}</p>{student_html}
+    </div>
+    
+    <div class="summary-cards">
+        <div class="card {'pass-card' if overall_status == 'PASS' else 'fail-card'}">
+            <h3>Overall Status</h3>
+            <h2 class="{'pass' if overall_status == 'PASS' else 'fail'}">{overall_status}</h2>
+            <p>{passed_labs}/{total_labs} Labs Passed</p>
+        </div>
+        <div class="card">
+            <h3>Total Attempts</h3>
+            <h2>{sum(r['total_attempts'] for r in lab_results.values())}</h2>
+            <p>Across all tasks</p>
+        </div>
+        <div class="card improvement-card">
+            <h3>Improvement Shown</h3>
+            <h2>{total_retry_successes}</h2>
+            <p>Tasks succeeded after retry</p>
+        </div>
+    </div>
+"""
+        
+        # Lab results table
+        html += """
+    <div class="lab-section">
+        <h2>Lab Results Summary</h2>
+        <table class="task-table">
+            <tr><th>Lab Type</th><th>Status</th><th>Tasks</th><th>Attempts</th><th>Improvement</th></tr>
+"""
+        
+        for lab_type, result in sorted(lab_results.items()):
+            status_class = 'pass' if result['overall_status'] == 'PASS' else 'fail'
+            improvement_icon = '📈' if result['improvement']['retry_success_count'] > 0 else ''
+            
+            html += f"""
+            <tr>
+                <td>{lab_type}</td>
+                <td class="{status_class}">{result['overall_status']}</td>
+                <td>{result['passed_tasks']}/{result['total_tasks']}</td>
+                <td>{result['total_attempts']} (avg: {result['average_attempts']:.1f})</td>
+                <td>{improvement_icon} {result['improvement']['retry_success_count']} retries succeeded</td>
+            </tr>"""
+        
+        html += """
+        </table>
+    </div>
+"""
+        
+        # Detailed lab breakdown
+        for lab_type, result in sorted(lab_results.items()):
+            html += f"""
+    <div class="lab-header">
+        <h3>{lab_type} - {'✓' if result['overall_status'] == 'PASS' else '✗'} {result['overall_status']}</h3>
+    </div>
+    <table class="task-table">
+        <tr><th>Task</th><th>Status</th><th>Attempts</th><th>Progress</th></tr>
+"""
+            
+            for task_name, task_info in sorted(result['tasks'].items()):
+                status_class = 'pass' if task_info['status'] == 'PASS' else 'fail'
+                
+                progress_icon = ""
+                if task_info['attempts'] > 1 and task_info['status'] == 'PASS':
+                    progress_icon = '<span class="improvement-icon">📈</span>'
+                elif task_info['attempts'] > 1 and task_info['status'] == 'FAIL':
+                    progress_icon = '<span class="improvement-icon">🔄</span>'
+                elif task_info['attempts'] == 1 and task_info['status'] == 'PASS':
+                    progress_icon = '<span class="improvement-icon">⚡</span>'
+                
+                html += f"""
+        <tr>
+            <td>{task_name}</td>
+            <td class="{status_class}">{task_info['status']}</td>
+            <td>{task_info['attempts']}</td>
+            <td>{progress_icon}</td>
+        </tr>"""
+            
+            html += "</table>"
+        
+        html += """
+</body>
+</html>"""
+        
+        return html
+
+class CohortGrader:
+    """Grade every student in an aggregated labresults.log separately
+    
+    run_vm_labs.sh appends each VM's log after a "# VM Lab Results for <student>"
+    header. The log is split on those headers in a single streaming pass and each
+    shard is graded by its own LabGrader.
+    """
+    
+    INDEX_FILES = {'text': 'index.txt', 'json': 'index.json', 'html': 'index.html'}
+    COHORT_REPORT_FILES = {'text': 'cohort_report.txt', 'json': 'cohort_report.json',
+                           'html': 'cohort_report.html'}
+    
+    def __init__(self, log_file="labresults.log", fast_parser=True, classifier=None, streaming=False,
+                 compact=False, keep_raw_lines=True, profile=False, merge_segments=False,
+                 since=None, until=None, time_index_file=None):
+        self.log_file = Path(log_file)
+        self.merge_segments = merge_segments
+        self.since = since
+        self.until = until
+        self.time_index_file = time_index_file
+        self.fast_parser = fast_parser
+        self.classifier = classifier or LabClassifier()
+        self.streaming = streaming
+        self.compact = compact
+        self.keep_raw_lines = keep_raw_lines
+        self.profile = profile
+        self.graders = {}  # Student name -> LabGrader, in order of first appearance
+        self.phase_seconds = {}  # Cohort-level parse and render wall time, see stats
+    
+    def parse_log_file(self, jobs=1):
+        """Split the log into per-student shards and parse each one
+        
+        With jobs > 1 the shards are located by scanning a memory map for student
+        headers and parsed concurrently in a process pool. With since or until, a
+        single log is read only where its TimeIndex has results in the window.
+        """
+        if jobs > 1 and not _is_single_plain_log(self.log_file):
+            raise ValueError(f"parallel parsing needs a single uncompressed log, not {self.log_file}")
+        if jobs > 1 and (self.since or self.until):
+            raise ValueError("parallel parsing cannot be limited to a time window")
+        segments = find_log_segments(self.log_file)
+        
+        if (self.since or self.until) and _is_single_plain_log(self.log_file):
+            self._parse_time_window()
+        else:
+            with _timed(self.phase_seconds, 'parse'):
+                if jobs > 1:
+                    self._parse_log_parallel(jobs)
+                else:
+                    self._parse_log_serial(segments)
+        
+        if self.since or self.until:
+            # Students are listed by their first result in the window, however much of the log was
+            # read, and those with no results in it are left out
+            graders = sorted((item for item in self.graders.items() if item[1].total_entries),
+                             key=lambda item: item[1].first_line_number)
+            self.graders = dict(graders)
+        
+        # Drop the unassigned shard if nothing was logged before the first header
+        unassigned = self.graders.get(UNASSIGNED_STUDENT)
+        if unassigned is not None and not unassigned.total_entries:
+            del self.graders[UNASSIGNED_STUDENT]
+    
+    def _parse_log_serial(self, segments):
+        """Split and parse the log segments in a single streaming pass"""
+        self._parse_lines(enumerate(_read_log_segments(segments, self.merge_segments), 1))
+    
+    def _parse_time_window(self):
+        """Parse the blocks of the log whose timestamps overlap the window, each from the student it starts in"""
+        with _timed(self.phase_seconds, 'index'):
+            index = TimeIndex(self.log_file, self.time_index_file).update()
+        ranges = index.ranges(self.since, self.until)
+        if not ranges:
+            return
+            
+        with _timed(self.phase_seconds, 'parse'), open(self.log_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end, line_number, student in ranges:
+                    self._parse_lines(_read_mapped_lines(mm, start, end, line_number), student)
+    
+    def _parse_lines(self, numbered_lines, student=None):
+        """Parse (line number, line) pairs, switching student at each header; student is the one before the first"""
+        grader = None if student is None else self.grader_for(student)
+        for line_num, line in numbered_lines:
+            if line.startswith(STUDENT_MARKER):
+                match = STUDENT_MARKER_RE.match(line)
+                if match:
+                    grader = self.grader_for(match.group(1).strip())
+                    continue
+            if grader is None:
+                grader = self.grader_for(UNASSIGNED_STUDENT)
+            grader._parse_line(line, line_num)
+    
+    def _parse_log_parallel(self, jobs):
+        """Parse each student's byte ranges in a process pool"""
+        if self.log_file.stat().st_size == 0:
+            return
+            
+        with open(self.log_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sections = self._find_student_sections(mm)
+        
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                student: executor.submit(_parse_byte_ranges, str(self.log_file), ranges,
+                                         self.fast_parser, student, self.classifier, self.profile)
+                for student, ranges in sections.items()
+            }
+            for student, future in futures.items():
+                self.grader_for(student).load_state(future.result())
+    
+    def _find_student_sections(self, mm):
+        """Map each student to the (start, end) byte ranges following their headers"""
+        marker = STUDENT_MARKER.encode()
+        sections = {}
+        student, start = UNASSIGNED_STUDENT, 0
+        
+        pos = mm.find(marker)
+        while pos != -1:
+            line_end = mm.find(b'\n', pos)
+            line_end = len(mm) if line_end == -1 else line_end + 1
+            
+            if pos == 0 or mm[pos - 1:pos] == b'\n':
+                match = STUDENT_MARKER_RE.match(mm[pos:line_end].decode('utf-8', errors='replace'))
+                if match:
+                    sections.setdefault(student, []).append((start, pos))
+                    student, start = match.group(1).strip(), line_end
+            
+            pos = mm.find(marker, line_end)
+        
+        sections.setdefault(student, []).append((start, len(mm)))
+        return sections
+    
+    def grader_for(self, student):
+        """Return the LabGrader for a student, creating it on first use"""
+        grader = self.graders.get(student)
+        if grader is None:
+            grader = LabGrader(self.log_file, fast_parser=self.fast_parser, student=student,
+                               classifier=self.classifier, streaming=self.streaming,
+                               compact=self.compact, keep_raw_lines=self.keep_raw_lines,
+                               profile=self.profile, since=self.since, until=self.until)
+            self.graders[student] = grader
+        return grader
+    
+    def student_summary(self, grader, lab_results=None):
+        """Overall pass/fail summary for one student's shard"""
+        if lab_results is None:
+            lab_results = grader.calculate_lab_results()
+        total_labs = len(lab_results)
+        passed_labs = sum(1 for result in lab_results.values() if result['overall_status'] == 'PASS')
+        
+        return {
+            'overall_status': 'PASS' if passed_labs == total_labs else 'FAIL',
+            'total_labs': total_labs,
+            'labs_passed': passed_labs,
+            'total_entries': grader.total_entries
+        }
+    
+    def write_reports(self, output_dir, output_formats=('text',)):
+        """Write every student's report in each format plus one index per format
+        
+        Lab results are calculated once per student and shared by all formats.
+        Returns the index paths.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        used_names = set()
+        base_names = {}
+        summaries = {}
+        
+        for student, grader in self.graders.items():
+            base_names[student] = self._report_base_name(student, used_names)
+            with _timed(grader.phase_seconds, 'calculate'):
+                lab_results = grader.calculate_lab_results()
+            summaries[student] = self.student_summary(grader, lab_results)
+            
+            for output_format, report in grader.generate_reports(output_formats, lab_results).items():
+                with open(output_dir / (base_names[student] + REPORT_SUFFIXES[output_format]), 'w') as f:
+                    f.write(report)
+        
+        index_files = []
+        for output_format in output_formats:
+            report_files = {student: base_name + REPORT_SUFFIXES[output_format]
+                            for student, base_name in base_names.items()}
+            index_file = output_dir / self.INDEX_FILES[output_format]
+            with _timed(self.phase_seconds, 'render'), open(index_file, 'w') as f:
+                f.write(self.generate_index(report_files, output_format, summaries))
+            index_files.append(index_file)
+        
+        return index_files
+    
+    def write_cohort_report(self, output_dir, output_formats=('text',)):
+        """Write the cohort analytics report in each format; returns the report paths"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        cohort_analytics = CohortAnalytics(self.graders, self.log_file)
+        analytics = cohort_analytics.calculate()
+        
+        report_files = []
+        for output_format in output_formats:
+            report_file = output_dir / self.COHORT_REPORT_FILES[output_format]
+            with open(report_file, 'w') as f:
+                f.write(cohort_analytics.generate_report(output_format, analytics))
+            report_files.append(report_file)
+        
+        return report_files
+    
+    @property
+    def stats(self):
+        """LabGrader.stats summed over every student's grader
+        
+        parse is the wall time of the whole split-and-parse pass; per-student
+        calculate and render times and profile steps are added up.
+        """
+        counters = {name: sum(getattr(grader, name) for grader in self.graders.values())
+                    for name in STAT_COUNTERS}
+        phase_seconds = {}
+        for grader in self.graders.values():
+            for phase, seconds in grader.phase_seconds.items():
+                phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+        for phase, seconds in self.phase_seconds.items():
+            phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+        worker_cache_lookups = {}
+        for grader in self.graders.values():
+            for cache, (hits, misses) in grader.worker_cache_lookups.items():
+                total_hits, total_misses = worker_cache_lookups.get(cache, (0, 0))
+                worker_cache_lookups[cache] = (total_hits + hits, total_misses + misses)
+        return _build_stats(counters, phase_seconds, self.classifier, worker_cache_lookups)
+    
+    def _report_base_name(self, student, used_names):
+        """Filesystem-safe, unique report file name prefix for a student"""
+        base_name = re.sub(r'[^A-Za-z0-9._-]+', '_', student).strip('_').lower() or 'student'
+        name = base_name
+        counter = 2
+        while name in used_names:
+            name = f"{base_name}_{counter}"
+            counter += 1
+        used_names.add(name)
+        return name
+    
+    def generate_index(self, report_files, output_format='text', summaries=None):
+        """Generate the index listing every student's status and report file"""
+        if summaries is None:
+            summaries = {student: self.student_summary(grader) for student, grader in self.graders.items()}
+        passed_students = sum(1 for summary in summaries.values() if summary['overall_status'] == 'PASS')
+        
+        if output_format == 'json':
+            index_data = {
+                'report_generated': datetime.now().isoformat(),
+                'log_file': str(self.log_file),
+                'total_students': len(summaries),
+                'students_passed': passed_students,
+                'students': {
+                    student: dict(summary, report_file=report_files.get(student))
+                    for student, summary in summaries.items()
+                }
+            }
+            return json.dumps(index_data, indent=2)
+        
+        if output_format == 'html':
+            rows = []
+            for student, summary in summaries.items():
+                status_class = 'pass' if summary['overall_status'] == 'PASS' else 'fail'
+                report_file = escape(report_files.get(student, ''))
+                rows.append(f"""
+            <tr>
+                <td><a href="{report_file}">{escape(student)}</a></td>
+                <td class="{status_class}">{summary['overall_status']}</td>
+                <td>{summary['labs_passed']}/{summary['total_labs']}</td>
+                <td>{summary['total_entries']}</td>
+            </tr>""")
+            
+            return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Lab Grading Index - Per-Student Reports</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 40px; }}
+        .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
+        .pass {{ color: #27ae60; font-weight: bold; }}
+        .fail {{ color: #e74c3c; font-weight: bold; }}
+        .task-table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
+        .task-table th, .task-table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        .task-table th {{ background-color: #f2f2f2; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Lab Grading Index - Per-Student Reports</h1>
+        <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Log File: {self.log_file}</p>
+        <p>{passed_students}/{len(summaries)} Students Passed</p>
+    </div>
+    
+    <table class="task-table">
+        <tr><th>Student</th><th>Status</th><th>Labs Passed</th><th>Log Entries</th></tr>{''.join(rows)}
+    </table>
+</body>
+</html>"""
+        
+        report = []
+        report.append("=" * 80)
+        report.append("LAB GRADING INDEX - PER-STUDENT REPORTS")
+        report.append("=" * 80)
+        report.append(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Log File: {self.log_file}")
+        report.append(f"Students: {len(summaries)} ({passed_students} passed)")
+        report.append("")
+        
+        for student, summary in summaries.items():
+            status_symbol = "✓" if summary['overall_status'] == 'PASS' else "✗"
+            report.append(f"{status_symbol} {student:30} {summary['overall_status']:4} "
+                          f"({summary['labs_passed']}/{summary['total_labs']} labs, "
+                          f"{summary['total_entries']} entries)  {report_files.get(student, '')}")
+        
+        report.append("")
+        report.append("=" * 80)
+        
+        return "\n".join(report)
+
+class CohortAnalytics:
+    """Cohort-wide task statistics computed with NumPy over every student's outcomes
+    
+    Each (student, task) final status becomes one element of flat outcome arrays;
+    per-task pass rates, attempt histograms and time-to-pass percentiles are then
+    grouped with bincount and a single sort instead of per-student loops.
+    """
+    
+    # Attempt histogram buckets: 1, 2, ... and a last one for that many or more
+    ATTEMPT_BINS = 10
+    
+    def __init__(self, graders, log_file=None):
+        if np is None:
+            raise ImportError("cohort analytics require NumPy (pip install numpy)")
+        self.log_file = log_file
+        self.student_count = len(graders)
+        
+        task_ids = {}
+        self.lab_types = []
+        task_index, passed, attempts, seconds_to_pass = [], [], [], []
+        for grader in graders.values():
+            task_stats = grader.get_task_stats()
+            for task_name, info in grader.final_status.items():
+                task_id = task_ids.get(task_name)
+                if task_id is None:
+                    task_id = task_ids[task_name] = len(task_ids)
+                    self.lab_types.append(info['lab_type'])
+                first_timestamp = task_stats.get(task_name, {}).get('first_timestamp', info['timestamp'])
+                task_index.append(task_id)
+                passed.append(info['status'] == 'PASS')
+                attempts.append(info['attempts'])
+                seconds_to_pass.append((info['timestamp'] - first_timestamp).total_seconds())
+        
+        self.tasks = list(task_ids)
+        self.task_index = np.array(task_index, dtype=np.intp)
+        self.passed = np.array(passed, dtype=bool)
+        self.attempts = np.array(attempts, dtype=np.int64)
+        self.seconds_to_pass = np.array(seconds_to_pass, dtype=np.float64)
+    
+    def calculate(self):
+        """Per-task and overall aggregates, with tasks ranked hardest first"""
+        task_count = len(self.tasks)
+        bins = self.ATTEMPT_BINS
+        
+        outcomes = np.bincount(self.task_index, minlength=task_count)
+        passes = np.bincount(self.task_index[self.passed], minlength=task_count)
+        pass_rate = 100.0 * passes / np.maximum(outcomes, 1)
+        mean_attempts = np.bincount(self.task_index, weights=self.attempts, minlength=task_count) / np.maximum(outcomes, 1)
+        
+        attempt_bin = np.clip(self.attempts, 1, bins) - 1
+        histogram = np.bincount(self.task_index * bins + attempt_bin,
+                                minlength=task_count * bins).reshape(task_count, bins)
+        
+        # Time to pass: sort passing outcomes by (task, seconds) once, then read
+        # each task's percentiles out of its contiguous slice
+        passed_tasks = self.task_index[self.passed]
+        passed_seconds = self.seconds_to_pass[self.passed]
+        sorted_seconds = passed_seconds[np.lexsort((passed_seconds, passed_tasks))]
+        starts = np.cumsum(passes) - passes
+        mean_seconds = np.bincount(passed_tasks, weights=passed_seconds, minlength=task_count) / np.maximum(passes, 1)
+        
+        # Lowest pass rate first; more attempts per student breaks ties
+        ranking = np.lexsort((-mean_attempts, pass_rate))
+        
+        bin_labels = [str(count) for count in range(1, bins)] + [f"{bins}+"]
+        task_rows = []
+        for rank, task_id in enumerate(ranking.tolist(), 1):
+            task_rows.append({
+                'rank': rank,
+                'task': self.tasks[task_id],
+                'lab_type': self.lab_types[task_id],
+                'students': int(outcomes[task_id]),
+                'passed': int(passes[task_id]),
+                'pass_rate': float(pass_rate[task_id]),
+                'average_attempts': float(mean_attempts[task_id]),
+                'attempt_histogram': dict(zip(bin_labels, histogram[task_id].tolist())),
+                'time_to_pass': self._time_to_pass(passes[task_id], mean_seconds[task_id],
+                                                   sorted_seconds[starts[task_id]:starts[task_id] + passes[task_id]])
+            })
+        
+        return {
+            'students': self.student_count,
+            'outcomes': int(self.task_index.size),
+            'pass_rate': float(100.0 * self.passed.mean()) if self.passed.size else 0.0,
+            'attempt_histogram': dict(zip(bin_labels, histogram.sum(axis=0).tolist())),
+            'time_to_pass': self._time_to_pass(passed_seconds.size, passed_seconds.mean() if passed_seconds.size else 0.0,
+                                               np.sort(passed_seconds)),
+            'tasks': task_rows
+        }
+    
+    @staticmethod
+    def _time_to_pass(count, mean_seconds, sorted_seconds):
+        """Mean, median and 90th percentile seconds from first attempt to passing"""
+        if not count:
+            return {'passed': 0, 'mean_seconds': None, 'median_seconds': None, 'p90_seconds': None}
+        median, p90 = np.percentile(sorted_seconds, [50, 90])
+        return {'passed': int(count), 'mean_seconds': float(mean_seconds),
+                'median_seconds': float(median), 'p90_seconds': float(p90)}
+    
+    def generate_report(self, output_format='text', analytics=None):
+        """Render calculate() output as a text, JSON or HTML cohort report"""
+        if analytics is None:
+            analytics = self.calculate()
+        
+        if output_format == 'json':
+            report_data = dict(report_generated=datetime.now().isoformat(), log_file=str(self.log_file), **analytics)
+            report_data['hardest_tasks'] = [row['task'] for row in analytics['tasks']]
+            return json.dumps(report_data, indent=2)
+        
+        if output_format == 'html':
+            return self._generate_html_report(analytics)
+        
+        report = []
+        report.append("=" * 80)
+        report.append("LAB COHORT REPORT - TASK PASS RATES AND ATTEMPTS")
+        report.append("=" * 80)
+        report.append(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Log File: {self.log_file}")
+        report.append(f"Students: {analytics['students']}")
+        report.append(f"Task Outcomes: {analytics['outcomes']} ({analytics['pass_rate']:.1f}% passed)")
+        report.append("")
+        
+        report.append("ATTEMPT HISTOGRAM (ALL TASKS)")
+        report.append("-" * 40)
+        for bucket, count in analytics['attempt_histogram'].items():
+            report.append(f"{bucket:>4} attempts: {count}")
+        report.append("")
+        
+        report.append("TASKS, HARDEST FIRST")
+        report.append("-" * 40)
+        for row in analytics['tasks']:
+            time_to_pass = row['time_to_pass']
+            median = f"{time_to_pass['median_seconds']:.0f}s" if time_to_pass['passed'] else "-"
+            report.append(f"{row['rank']:3}. {row['task']:30} {row['passed']}/{row['students']} passed "
+                          f"({row['pass_rate']:.1f}%), avg {row['average_attempts']:.1f} attempts, "
+                          f"median time to pass {median}")
+        
+        report.append("")
+        report.append("=" * 80)
+        
+        return "\n".join(report)
+    
+    def _generate_html_report(self, analytics):
+        """HTML cohort report in the style of the per-student reports"""
+        bucket_headers = ''.join(f"<th>{escape(bucket)}</th>" for bucket in analytics['attempt_histogram'])
+        rows = []
+        for row in analytics['tasks']:
+            time_to_pass = row['time_to_pass']
+            median = f"{time_to_pass['median_seconds']:.0f}s" if time_to_pass['passed'] else "-"
+            p90 = f"{time_to_pass['p90_seconds']:.0f}s" if time_to_pass['passed'] else "-"
+            counts = ''.join(f"<td>{count}</td>" for count in row['attempt_histogram'].values())
+            rows.append(f"""
+            <tr>
+                <td>{row['rank']}</td>
+                <td>{escape(row['task'])}</td>
+                <td>{escape(row['lab_type'])}</td>
+                <td>{row['passed']}/{row['students']} ({row['pass_rate']:.1f}%)</td>
+                <td>{row['average_attempts']:.1f}</td>
+                <td>{median}</td>
+                <td>{p90}</td>{counts}
+            </tr>""")
+        
+        return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Lab Cohort Report - Task Pass Rates and Attempts</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 40px; }}
+        .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
+        .task-table {{ width: 100%; border-collapse: collapse; margin: 10px 0; }}
+        .task-table th, .task-table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        .task-table th {{ background-color: #f2f2f2; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Lab Cohort Report - Task Pass Rates and Attempts</h1>
+        <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Log File: {self.log_file}</p>
+        <p>{analytics['students']} Students, {analytics['outcomes']} Task Outcomes ({analytics['pass_rate']:.1f}% Passed)</p>
+    </div>
+    
+    <h2>Tasks, Hardest First</h2>
+    <table class="task-table">
+        <tr><th>Rank</th><th>Task</th><th>Lab</th><th>Passed</th><th>Avg Attempts</th><th>Median Time to Pass</th><th>P90 Time to Pass</th>{bucket_headers}</tr>{''.join(rows)}
+    </table>
+</body>
+</html>"""
+
+class LogWatcher:
+    """Follow a growing labresults.log and keep each student's grades current
+    
+    Every poll parses only the complete lines appended since the previous one and
+    recalculates the students they belong to; a rotated or truncated log is graded
+    again from the start. serve() publishes the result as JSON over HTTP.
+    """
+    
+    def __init__(self, log_file="labresults.log", fast_parser=True, classifier=None):
+        self.log_file = Path(log_file)
+        self.fast_parser = fast_parser
+        self.classifier = classifier or LabClassifier()
+        self.lock = threading.Lock()  # Guards the published status, read by the HTTP threads
+        self._reset(None)
+    
+    def _reset(self, inode):
+        """Start grading the log from its first line"""
+        # Streaming graders keep per-task counters only, so a session-long daemon stays small
+        self.cohort = CohortGrader(self.log_file, fast_parser=self.fast_parser, classifier=self.classifier,
+                                   streaming=True, keep_raw_lines=False)
+        self.grader = None  # Grader of the student section being read
+        self.inode = inode
+        self.offset = 0
+        self.line_number = 0
+        self.summaries = {}  # Student name -> status, in order of first appearance
+        self.version = 0
+        self.updated = None
+        self._status_body = None
+    
+    def poll(self):
+        """Parse the lines appended since the last poll; returns how many were read"""
+        try:
+            stat = self.log_file.stat()
+        except FileNotFoundError:
+            return 0
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            with self.lock:
+                self._reset(stat.st_ino)
+        if stat.st_size == self.offset:
+            return 0
+        
+        changed = set()
+        lines_read = 0
+        with open(self.log_file, 'rb') as f:
+            f.seek(self.offset)
+            for raw_line in f:
+                # A line without a newline is still being written; it is read next poll
+                if not raw_line.endswith(b'\n'):
+                    break
+                self.offset += len(raw_line)
+                self.line_number += 1
+                lines_read += 1
+                line = raw_line.decode('utf-8', errors='replace')
+                
+                if line.startswith(STUDENT_MARKER):
+                    match = STUDENT_MARKER_RE.match(line)
+                    if match:
+                        self.grader = self.cohort.grader_for(match.group(1).strip())
+                        continue
+                if self.grader is None:
+                    self.grader = self.cohort.grader_for(UNASSIGNED_STUDENT)
+                self.grader._parse_line(line, self.line_number)
+                changed.add(self.grader.student)
+        
+        summaries = {student: self.student_status(self.cohort.graders[student]) for student in changed
+                     if self.cohort.graders[student].total_entries}
+        with self.lock:
+            self.summaries.update(summaries)
+            # A student is listed once they have results, but ordered by their first header
+            self.summaries = {student: self.summaries[student] for student in self.cohort.graders
+                              if student in self.summaries}
+            self.version += 1
+            self.updated = datetime.now()
+            self._status_body = None
+        return lines_read
+    
+    def student_status(self, grader):
+        """One student's overall summary plus the status of each lab"""
+        lab_results = grader.calculate_lab_results()
+        status = {'student': grader.student, **self.cohort.student_summary(grader, lab_results)}
+        status['labs'] = {
+            lab_type: {
+                'overall_status': result['overall_status'],
+                'passed_tasks': result['passed_tasks'],
+                'total_tasks': result['total_tasks'],
+                'total_attempts': result['total_attempts']
+            }
+            for lab_type, result in sorted(lab_results.items())
+        }
+        return status
+    
+    def status(self):
+        """Current status of every student, as served at /status"""
+        with self.lock:
+            return {
+                'log_file': str(self.log_file),
+                'updated': self.updated.isoformat() if self.updated else None,
+                'lines_read': self.line_number,
+                'students': list(self.summaries.values())
+            }
+    
+    def status_body(self):
+        """(version, UTF-8 JSON of status()); encoded once per update, not per request"""
+        with self.lock:
+            body, version = self._status_body, self.version
+        if body is None:
+            body = json.dumps(self.status(), indent=2).encode('utf-8')
+            with self.lock:
+                if self.version == version:
+                    self._status_body = body
+        return version, body
+    
+    def serve(self, host='127.0.0.1', port=8765, interval=2.0):
+        """Poll the log every `interval` seconds and serve the status until interrupted"""
+        server = ThreadingHTTPServer((host, port), _StatusRequestHandler)
+        server.watcher = self
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        print(f"Watching {self.log_file}; status at http://{host}:{server.server_port}/status (Ctrl+C to stop)")
+        try:
+            while True:
+                self.poll()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+class _StatusRequestHandler(BaseHTTPRequestHandler):
+    """GET /status for LogWatcher.serve, readable by the web interface on another origin"""
+    
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/status'):
+            self.send_error(404)
+            return
+        
+        version, body = self.server.watcher.status_body()
+        etag = f'"{self.server.watcher.inode}-{version}"'
+        not_modified = self.headers.get('If-None-Match') == etag
+        self.send_response(304 if not_modified else 200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('ETag', etag)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Polled every few seconds by each open dashboard, so requests are not logged"""
+
+class ReportCache:
+    """Rendered reports stored under a content-addressed key, so an unchanged log is not graded again
+    
+    The key hashes the log's fingerprint (size, modification time and a hash of
+    the last REPORT_CACHE_TAIL_BYTES of each segment), the grader version, the
+    report format and the options that change report contents. Once the cache
+    directory grows past max_bytes the least recently used entries are evicted.
+    """
+    
+    def __init__(self, cache_dir, max_bytes=DEFAULT_REPORT_CACHE_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, log_file, output_format, options=None):
+        """Cache key for one report format of log_file graded with options"""
+        fingerprint = {
+            'version': __version__,
+            'log_file': str(log_file),
+            'segments': [self._fingerprint(segment) for segment in find_log_segments(log_file)],
+            'output_format': output_format,
+            'options': options or {}
+        }
+        return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _fingerprint(segment):
+        """(name, size, mtime, tail hash) of one log segment"""
+        stat = segment.stat()
+        with open(segment, 'rb') as f:
+            f.seek(max(stat.st_size - REPORT_CACHE_TAIL_BYTES, 0))
+            tail_hash = hashlib.sha256(f.read()).hexdigest()
+        return [str(segment), stat.st_size, stat.st_mtime_ns, tail_hash]
+    
+    def get(self, key):
+        """The cached report for key, or None; a hit marks the entry as recently used"""
+        entry = self.cache_dir / key
+        try:
+            with open(entry, 'r') as f:
+                report = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(entry)
+        self.hits += 1
+        return self._stamp(report, datetime.now())
+    
+    @staticmethod
+    def _stamp(report, generated=None):
+        """report with its generation time set to generated, or blanked if None"""
+        for pattern, time_format in REPORT_GENERATED_PATTERNS:
+            value = ''
+            if generated is not None:
+                value = generated.strftime(time_format) if time_format else generated.isoformat()
+            report = pattern.sub(lambda match: match[1] + value, report, count=1)
+        return report
+    
+    def put(self, key, report):
+        """Store a report, then evict old entries if the cache is over its size cap"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.cache_dir / key
+        # Write then rename, so a concurrent reader never sees a partial report
+        temp_file = entry.with_name(f"{key}.{os.getpid()}.tmp")
+        with open(temp_file, 'w') as f:
+            f.write(self._stamp(report))
+        os.replace(temp_file, entry)
+        self.evict()
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # Evicted by another run meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total_bytes -= size
+
+def _parse_output_formats(value):
+    """argparse type for --output-format: one format or a comma-separated list"""
+    output_formats = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in output_formats if name not in OUTPUT_FORMATS]
+    if unknown or not output_formats:
+        raise argparse.ArgumentTypeError(
+            f"invalid format {', '.join(unknown) or repr(value)} (choose from {', '.join(OUTPUT_FORMATS)})")
+    return list(dict.fromkeys(output_formats))
+
+def _parse_time_bound(value):
+    """argparse type for --since/--until: a date and time, a date, or a time today, in the log's own time"""
+    try:
+        bound = datetime.fromisoformat(value.strip())
+    except ValueError:
+        try:
+            bound = datetime.combine(date.today(), clock_time.fromisoformat(value.strip()))
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"invalid time {value!r} (use e.g. 09:00, 2025-07-21 or 2025-07-21 09:00)") from None
+    if bound.tzinfo is not None:
+        raise argparse.ArgumentTypeError(f"give {value!r} without a UTC offset, in the log's own time")
+    return bound
+
+def _grade(args):
+    """Parse and write reports as selected on the command line; returns the LabGrader or CohortGrader"""
+    classifier = LabClassifier.from_config(args.config)
+    
+    if args.per_student:
+        cohort = CohortGrader(args.log_file, fast_parser=not args.legacy_parser, classifier=classifier,
+                              streaming=args.streaming, compact=args.compact,
+                              keep_raw_lines=args.keep_raw_lines, profile=args.profile,
+                              merge_segments=args.merge_segments, since=args.since, until=args.until,
+                              time_index_file=args.time_index_file)
+        cohort.parse_log_file(jobs=args.jobs)
+        index_files = cohort.write_reports(args.output_dir, args.output_format)
+        print(f"Graded {len(cohort.graders)} students; index saved to "
+              f"{', '.join(str(index_file) for index_file in index_files)}")
+        if args.cohort_report:
+            for report_file in cohort.write_cohort_report(args.output_dir, args.output_format):
+                print(f"Cohort report saved to {report_file}")
+        return cohort
+    
+    grader = LabGrader(args.log_file, fast_parser=not args.legacy_parser, classifier=classifier,
+                       streaming=args.streaming, compact=args.compact,
+                       keep_raw_lines=args.keep_raw_lines, profile=args.profile,
+                       merge_segments=args.merge_segments, since=args.since, until=args.until,
+                       time_index_file=args.time_index_file)
+    
+    cache = cache_keys = None
+    if args.report_cache:
+        cache = ReportCache(args.report_cache, args.report_cache_size * 1024 * 1024)
+        # Options that change what the reports contain, besides the log itself
+        options = {'rules': classifier.rules, 'streaming': args.streaming, 'incremental': args.incremental,
+                   'parallel': args.jobs > 1, 'merge_segments': args.merge_segments,
+                   'since': args.since and args.since.isoformat(), 'until': args.until and args.until.isoformat()}
+        cache_keys = {output_format: cache.key(args.log_file, output_format, options)
+                      for output_format in args.output_format}
+        reports = {output_format: cache.get(key) for output_format, key in cache_keys.items()}
+        if None not in reports.values():
+            _output_reports(args, reports, cached=True)
+            return grader
+    
+    if args.incremental:
+        grader.parse_log_incremental(args.checkpoint_file)
+    elif args.jobs > 1:
+        grader.parse_log_parallel(args.jobs)
+    else:
+        grader.parse_log_file()
+    
+    reports = grader.generate_reports(args.output_format)
+    if cache is not None:
+        for output_format, report in reports.items():
+            cache.put(cache_keys[output_format], report)
+    _output_reports(args, reports)
+    return grader
+
+def _output_reports(args, reports, cached=False):
+    """Save or print generated reports as selected on the command line"""
+    note = " (from report cache)" if cached else ""
+    if args.output_dir:
+        for report_file in LabGrader.save_reports(args.output_dir, reports, args.report_prefix):
+            print(f"Report saved to {report_file}{note}")
+        return
+    
+    report = reports[args.output_format[0]]
+    
+    if args.output_file:
+        with open(args.output_file, 'w') as f:
+            f.write(report)
+        print(f"Report saved to {args.output_file}{note}")
+    else:
+        print(report)
+
+def main():
+    parser = argparse.ArgumentParser(description='Grade lab results from log file')
+    parser.add_argument('--log-file', default='labresults.log', 
+                       help='Path to lab results log file, or a directory or quoted glob of rotated '
+                            'segments (.gz, .bz2 and .xz are read compressed) (default: labresults.log)')
+    parser.add_argument('--output-format', type=_parse_output_formats, default='text',
+                       help='Output format, or a comma-separated list such as text,json,html '
+                            'written to --output-dir from a single parse (default: text)')
+    parser.add_argument('--output-file', help='Save report to file instead of stdout')
+    parser.add_argument('--legacy-parser', action='store_true',
+                       help='Use the original regex/strptime log parser (slower, for parity checks)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only parse lines appended since the last run, resuming from a checkpoint')
+    parser.add_argument('--checkpoint-file',
+                       help='Checkpoint path for --incremental (default: <log-file>.checkpoint)')
+    parser.add_argument('--per-student', action='store_true',
+                       help='Grade each "# VM Lab Results for" section separately and write an index')
+    parser.add_argument('--cohort-report', action='store_true',
+                       help='With --per-student, also write cohort-wide task statistics '
+                            '(pass rates, attempt histograms, time to pass; requires NumPy)')
+    parser.add_argument('--output-dir',
+                       help='Write reports into this directory (required with --per-student '
+                            'or several output formats)')
+    parser.add_argument('--report-prefix',
+                       help='File name prefix for reports in --output-dir, e.g. '
+                            'john_doe_20250721 gives john_doe_20250721_report.txt')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_FILE),
+                       help='config.json holding the "labs" classification rules (default: next to this script)')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Fold each line into per-task counters instead of keeping it; '
+                            'memory grows with distinct tasks, not log lines')
+    parser.add_argument('--compact', action='store_true',
+                       help='Keep the per-line history in typed-array columns instead of dicts')
+    parser.add_argument('--no-raw-lines', dest='keep_raw_lines', action='store_false',
+                       help='Do not retain the raw text of each parsed log line')
+    parser.add_argument('--stats', action='store_true',
+                       help='Print line counts, per-phase wall time, throughput, cache hit rates '
+                            'and peak memory to stderr')
+    parser.add_argument('--profile', action='store_true',
+                       help='Like --stats, also splitting parse time into read, regex, timestamp, '
+                            'classify and record (adds some overhead)')
+    parser.add_argument('--profile-file',
+                       help='Run under cProfile and save the profile here (view with python3 -m pstats)')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Worker processes for parsing: per-student shards, or byte ranges '
+                            'of a single log (default: 1)')
+    parser.add_argument('--merge-segments', action='store_true',
+                       help='Merge the segments named by --log-file by timestamp, for per-checker logs '
+                            'written in parallel (default: concatenate rotated segments oldest first)')
+    parser.add_argument('--write-merged', metavar='FILE',
+                       help='Append the --log-file segments merged by timestamp to FILE ("-" for stdout) '
+                            'instead of grading')
+    parser.add_argument('--since', type=_parse_time_bound,
+                       help='Only grade results at or after this time: 09:00 (today), 2025-07-21 or '
+                            '"2025-07-21 09:00". A single log is read through a sparse timestamp index')
+    parser.add_argument('--until', type=_parse_time_bound,
+                       help='Only grade results before this time (same forms as --since)')
+    parser.add_argument('--time-index-file',
+                       help='Timestamp index for --since/--until, built or extended as needed '
+                            '(default: <log-file>.tsindex)')
+    parser.add_argument('--report-cache',
+                       help='Directory caching reports by log fingerprint, grader version and format; '
+                            'an unchanged log is not graded again')
+    parser.add_argument('--report-cache-size', type=int, default=DEFAULT_REPORT_CACHE_MB,
+                       help=f'Report cache size cap in MB, least recently used reports are evicted first '
+                            f'(default: {DEFAULT_REPORT_CACHE_MB})')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running: follow the log as it grows and serve every student\'s '
+                            'current status as JSON over HTTP')
+    parser.add_argument('--watch-host', default='127.0.0.1',
+                       help='Address for the --watch status endpoint (default: 127.0.0.1)')
+    parser.add_argument('--watch-port', type=int, default=8765,
+                       help='Port for the --watch status endpoint (default: 8765)')
+    parser.add_argument('--watch-interval', type=float, default=2.0,
+                       help='Seconds between checks of the log in --watch mode (default: 2)')
+    
+    args = parser.parse_args()
+    
+    if args.per_student and not args.output_dir:
+        parser.error('--per-student requires --output-dir')
+    if len(args.output_format) > 1 and not args.output_dir:
+        parser.error('several output formats require --output-dir')
+    if args.output_file and args.output_dir:
+        parser.error('--output-file cannot be combined with --output-dir')
+    if args.cohort_report and not args.per_student:
+        parser.error('--cohort-report requires --per-student')
+    if args.cohort_report and np is None:
+        parser.error('--cohort-report requires NumPy (pip install numpy)')
+    if args.per_student and args.incremental:
+        parser.error('--per-student cannot be combined with --incremental')
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.jobs > 1 and args.incremental:
+        parser.error('--jobs cannot be combined with --incremental')
+    if args.watch and (args.per_student or args.incremental or args.jobs > 1 or args.output_file or args.output_dir):
+        parser.error('--watch cannot be combined with --per-student, --incremental, --jobs or report output')
+    if args.report_cache and args.per_student:
+        parser.error('--report-cache cannot be combined with --per-student')
+    if args.report_cache_size < 1:
+        parser.error('--report-cache-size must be at least 1')
+    if args.watch_interval <= 0:
+        parser.error('--watch-interval must be positive')
+    if args.since and args.until and args.since >= args.until:
+        parser.error('--since must be earlier than --until')
+    if (args.since or args.until) and (args.jobs > 1 or args.incremental or args.watch or args.write_merged):
+        parser.error('--since and --until cannot be combined with --jobs, --incremental, --watch or --write-merged')
+    if (args.jobs > 1 or args.incremental or args.watch) and not _is_single_plain_log(args.log_file):
+        parser.error('--jobs, --incremental and --watch need a single uncompressed --log-file')
+        
+    if args.write_merged:
+        try:
+            segments = find_log_segments(args.log_file)
+            with ExitStack() as stack:
+                merged = sys.stdout if args.write_merged == '-' else stack.enter_context(open(args.write_merged, 'a'))
+                for line in _read_log_segments(segments, merge=True):
+                    merged.write(line if line.endswith('\n') else line + '\n')
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
+        return 0
+        
+    if args.watch:
+        try:
+            watcher = LogWatcher(args.log_file, fast_parser=not args.legacy_parser,
+                                 classifier=LabClassifier.from_config(args.config))
+            watcher.serve(args.watch_host, args.watch_port, args.watch_interval)
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
+        return 0
+    
+    try:
+        profiler = cProfile.Profile() if args.profile_file else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            grader = _grade(args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(args.profile_file)
+        
+        if args.stats or args.profile:
+            # stderr, so --stats does not end up inside a report printed to stdout
+            print(_format_stats(grader.stats), file=sys.stderr)
+        if args.profile_file:
+            print(f"cProfile data saved to {args.profile_file}", file=sys.stderr)
+            
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
     exit(main())
\ No newline at end of file
@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Lab Fleet Orchestrator - run the lab scripts on every VM in a batch concurrently
+Reads vm_config.sh configurations and batch files, drives each VM over ssh/scp with
+asyncio subprocesses and grades each student as soon as their results are downloaded
+Usage: python3 lab_fleet.py BATCH_FILE [--concurrency N] [--output-dir completedLabs/fleet]
+"""
+
+import io
+import os
+import re
+import shlex
+import random
+import asyncio
+import shutil
+import tarfile
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from grade_labs import (LabGrader, LabClassifier, CohortGrader, DEFAULT_CONFIG_FILE, _parse_output_formats,
+                        merge_log_segments)
+from lab_progress import ProgressTable
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / 'scripts'
+DEFAULT_CONFIG_DIR = SCRIPTS_DIR / 'vm_configs'
+CREATELABS_DIR = SCRIPTS_DIR / 'createlabs'
+CHECKLABS_DIR = SCRIPTS_DIR / 'checklabs'
+BUNDLE_RUNNER = SCRIPTS_DIR / 'bundle_runner.sh'
+
+# Where the checker scripts may have written labresults.log, tried in order as in run_vm_labs.sh
+REMOTE_LOG_LOCATIONS = ['/tmp/labresults.log', '../../labresults.log', '/root/labresults.log',
+                        '/var/log/labresults.log']
+
+SSH_OPTIONS = ['-o', 'StrictHostKeyChecking=no', '-o', 'ConnectTimeout=10']
+
+# ssh exits with 255 when the connection itself failed rather than the remote command
+SSH_CONNECTION_ERROR = 255
+
+# Per-checker logs with parallel_checks, as run_vm_labs.sh --parallel-checks
+REMOTE_SEGMENT_DIR = '/tmp/labresults.d'
+
+# Bundle mode: extract the archive streamed on stdin and run it; bundle_runner.sh removes it afterwards
+BUNDLE_REMOTE_COMMAND = 'bundle=$(mktemp -d) && tar xzf - -C "$bundle" && bash "$bundle/bundle_runner.sh"'
+
+# Prefix of the records bundle_runner.sh writes to stdout
+BUNDLE_RECORD = '@@LAB '
+
+OS_INFO_COMMAND = ("cat /etc/os-release 2>/dev/null | grep PRETTY_NAME | cut -d= -f2 | tr -d '\"' "
+                   "|| echo 'Unknown OS'")
+
+# run_vm_labs.sh options accepted on batch lines -> (VMTarget attribute, takes a value)
+BATCH_OPTIONS = {
+    '--vm-ip': ('vm_ip', True),
+    '--vm-user': ('vm_user', True),
+    '--vm-password': ('vm_password', True),
+    '--ssh-key': ('ssh_key', True),
+    '--vm-port': ('vm_port', True),
+    '--student-name': ('student_name', True),
+    '--timeout': ('timeout', True),
+    '--skip-create': ('run_create', False),
+    '--skip-check': ('run_check', False),
+    '--skip-grade': ('run_grade', False),
+    '--verbose': (None, False),
+}
+
+def read_vm_config(config_dir, name):
+    """Settings from a vm_config.sh configuration file as a dict, e.g. {'VM_IP': '192.168.1.100'}"""
+    config_file = Path(config_dir) / f"{name}.conf"
+    if not config_file.exists():
+        raise FileNotFoundError(f"Configuration not found: {name} ({config_file})")
+        
+    settings = {}
+    with open(config_file, 'r') as f:
+        for line in f:
+            match = re.match(r'\s*([A-Z_]+)=(.*)', line)
+            if match:
+                values = shlex.split(match.group(2))
+                settings[match.group(1)] = values[0] if values else ''
+    return settings
+
+class VMTarget:
+    """One VM from a batch file: a saved configuration plus the options on its batch line"""
+    
+    def __init__(self, name, vm_ip='', vm_user='root', vm_port='22', ssh_key='', vm_password='',
+                 student_name='student', timeout='300', run_create=True, run_check=True, run_grade=True):
+        self.name = name
+        self.vm_ip = vm_ip
+        self.vm_user = vm_user
+        self.vm_port = vm_port
+        self.ssh_key = ssh_key
+        self.vm_password = vm_password
+        self.student_name = student_name
+        self.timeout = timeout
+        self.run_create = run_create
+        self.run_check = run_check
+        self.run_grade = run_grade
+        
+    @classmethod
+    def from_config(cls, config_dir, name):
+        """Target for a configuration saved by vm_config.sh create"""
+        settings = read_vm_config(config_dir, name)
+        return cls(name,
+                   vm_ip=settings.get('VM_IP', ''),
+                   vm_user=settings.get('VM_USER') or 'root',
+                   vm_port=settings.get('VM_PORT') or '22',
+                   ssh_key=settings.get('SSH_KEY', ''),
+                   vm_password=settings.get('VM_PASSWORD', ''),
+                   student_name=settings.get('STUDENT_NAME') or 'student',
+                   timeout=settings.get('TIMEOUT') or '300')
+                   
+    @property
+    def label(self):
+        return f"{self.student_name} ({self.vm_user}@{self.vm_ip})"
+        
+    @property
+    def destination(self):
+        return f"{self.vm_user}@{self.vm_ip}"
+        
+    def _auth(self):
+        """Command prefix and extra environment for the configured authentication"""
+        if self.ssh_key:
+            return [], ['-i', self.ssh_key], None
+        # sshpass -e reads the password from the environment instead of the process list
+        return ['sshpass', '-e'], [], dict(os.environ, SSHPASS=self.vm_password)
+        
+    def ssh_command(self, remote_command):
+        """(argv, env) running remote_command on the VM"""
+        prefix, key, env = self._auth()
+        return prefix + ['ssh', *SSH_OPTIONS, *key, '-p', self.vm_port, self.destination, remote_command], env
+        
+    def scp_command(self, source, destination):
+        """(argv, env) copying source to destination; remote paths are prefixed with host:"""
+        prefix, key, env = self._auth()
+        return prefix + ['scp', *SSH_OPTIONS, *key, '-P', self.vm_port, source, destination], env
+
+def read_batch_file(batch_file, config_dir=DEFAULT_CONFIG_DIR):
+    """VMTargets for the "run <config> [options]" lines of a vm_config.sh batch file"""
+    targets = []
+    with open(batch_file, 'r') as f:
+        for line_num, line in enumerate(f, 1):
+            words = shlex.split(line, comments=True)
+            if not words:
+                continue
+            if words[0] != 'run' or len(words) < 2:
+                raise ValueError(f"{batch_file}:{line_num}: expected \"run <config_name> [options]\"")
+                
+            target = VMTarget.from_config(config_dir, words[1])
+            options = iter(words[2:])
+            for option in options:
+                if option not in BATCH_OPTIONS:
+                    raise ValueError(f"{batch_file}:{line_num}: unknown option {option}")
+                attribute, takes_value = BATCH_OPTIONS[option]
+                if takes_value:
+                    value = next(options, None)
+                    if value is None:
+                        raise ValueError(f"{batch_file}:{line_num}: {option} requires a value")
+                    setattr(target, attribute, value)
+                elif attribute:
+                    setattr(target, attribute, False)
+                    
+            if not target.vm_ip:
+                raise ValueError(f"{batch_file}:{line_num}: no VM_IP in configuration {target.name}")
+            if not target.ssh_key and not target.vm_password:
+                raise ValueError(f"{batch_file}:{line_num}: {target.name} needs an SSH key or password")
+            targets.append(target)
+    return targets
+
+def build_bundle():
+    """gzipped tar of createlabs/, checklabs/ and bundle_runner.sh, streamed to each VM in bundle mode"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for path in (CREATELABS_DIR, CHECKLABS_DIR, BUNDLE_RUNNER):
+            archive.add(path, arcname=path.name)
+    return buffer.getvalue()
+
+class FleetOrchestrator:
+    """Run the create and check scripts on many VMs at once and grade each student
+    
+    At most `concurrency` VMs are driven at a time. A VM whose ssh or scp connection
+    fails, or which takes longer than host_timeout, is retried up to `retries` times
+    with exponential backoff; phases that already completed are not repeated. Each
+    download is appended to that student's own log, which is graded straight away,
+    and write_reports writes every student's reports plus an index.
+    
+    By default every script is copied with scp and run with its own ssh command, as
+    run_vm_labs.sh does. With bundle=True all scripts are streamed to the VM as one
+    archive and run by bundle_runner.sh, which also returns the results log, so a
+    VM costs a single SSH session. With jsonl=True the checker scripts log structured
+    records (LAB_RESULTS_FORMAT=jsonl), which the grader reads without its regexes.
+    With parallel_checks=True the checker scripts run at the same time, each logging to
+    its own segment (LAB_RESULTS_LOG), and the segments are merged by timestamp.
+    """
+    
+    def __init__(self, targets, output_dir, concurrency=10, retries=2, backoff=5.0, host_timeout=1800,
+                 classifier=None, progress=None, bundle=False, jsonl=False, parallel_checks=False):
+        self.targets = targets
+        self.output_dir = Path(output_dir)
+        self.log_dir = self.output_dir / 'logs'
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.host_timeout = host_timeout
+        self.bundle = bundle
+        self.bundle_archive = None
+        self.jsonl = jsonl
+        self.parallel_checks = parallel_checks
+        self.progress = progress or ProgressTable(targets)
+        self.cohort = CohortGrader(self.log_dir, classifier=classifier)
+        self.results = {}  # id(target) -> 'done' or the reason it failed
+        
+        # One log per student, named like their reports
+        used_names = set()
+        self.student_logs = {}
+        for target in targets:
+            if target.student_name not in self.student_logs:
+                base_name = self.cohort._report_base_name(target.student_name, used_names)
+                self.student_logs[target.student_name] = self.log_dir / f"{base_name}.log"
+                
+    def run(self):
+        """Drive every target to completion; returns the number that failed"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if self.bundle:
+            self.bundle_archive = build_bundle()
+        asyncio.run(self._run_all())
+        return sum(1 for result in self.results.values() if result != 'done')
+        
+    async def _run_all(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        outcomes = await asyncio.gather(*(self._run_target(target, semaphore) for target in self.targets),
+                                        return_exceptions=True)
+        # Anything _run_target did not handle fails only its own VM, never the rest of the fleet
+        for target, outcome in zip(self.targets, outcomes):
+            if isinstance(outcome, Exception):
+                self._fail(target, f"{type(outcome).__name__}: {outcome}")
+                
+    def _fail(self, target, reason):
+        self.results[id(target)] = reason
+        self.progress.update(target, 'failed', reason)
+        
+    async def _run_target(self, target, semaphore):
+        completed = {}  # Phase -> result, kept across retries
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    await asyncio.wait_for(self._run_phases(target, completed), self.host_timeout)
+                self.results[id(target)] = 'done'
+                break
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                reason = str(e) or f"timed out after {self.host_timeout}s"
+                self.results[id(target)] = reason
+                if attempt == self.retries:
+                    self._fail(target, reason)
+                    break
+                # Jitter so VMs that failed together do not all retry at the same moment
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                self.progress.update(target, 'retrying', f"{reason}; attempt {attempt + 2} in {delay:.0f}s")
+                await asyncio.sleep(delay)
+            except OSError as e:
+                # A local problem a retry would not fix, such as ssh or sshpass missing or an unwritable log
+                self._fail(target, str(e))
+                break
+                
+        if target.run_grade and self.student_logs[target.student_name].exists():
+            self.progress.update(target, 'grading')
+            loop = asyncio.get_running_loop()
+            try:
+                grader = await loop.run_in_executor(None, self._grade_student, target.student_name)
+                self.cohort.graders[target.student_name] = grader
+            except (OSError, ValueError) as e:
+                if self.results[id(target)] == 'done':
+                    self._fail(target, f"grading failed: {e}")
+                
+        if self.results[id(target)] == 'done':
+            self.progress.update(target, 'done', completed.get('summary', ''))
+            
+    def _grade_student(self, student):
+        grader = LabGrader(self.student_logs[student], student=student, classifier=self.cohort.classifier)
+        grader.parse_log_file()
+        return grader
+        
+    async def _run_phases(self, target, completed):
+        if self.bundle:
+            await self._run_bundle(target, completed)
+        else:
+            await self._run_separately(target, completed)
+            
+        summary = []
+        for phase in ('create', 'check'):
+            if phase in completed:
+                summary.append(f"{phase} {completed[phase]}")
+        if 'download' in completed:
+            summary.append(completed['download'])
+        completed['summary'] = ', '.join(summary)
+        
+    async def _run_separately(self, target, completed):
+        """Connect, then copy and run each script and download the log with separate ssh/scp commands"""
+        self.progress.update(target, 'connecting')
+        status, output = await self._ssh(target, 'echo "Connection successful"')
+        if status != 0:
+            raise ConnectionError(output.strip().splitlines()[-1] if output.strip() else 'connection failed')
+        if 'os_info' not in completed:
+            _, output = await self._ssh(target, OS_INFO_COMMAND)
+            completed['os_info'] = output.strip() or 'Unknown OS'
+            
+        summary = []
+        if target.run_create and 'create' not in completed:
+            completed['create'] = await self._run_scripts(target, 'create', CREATELABS_DIR)
+        if target.run_check and 'check' not in completed and self.parallel_checks:
+            completed['check'] = await self._run_checks_parallel(target)
+        elif target.run_check and 'check' not in completed:
+            completed['check'] = await self._run_scripts(target, 'check', CHECKLABS_DIR)
+        if target.run_check and 'download' not in completed and self.parallel_checks:
+            self.progress.update(target, 'download', REMOTE_SEGMENT_DIR)
+            completed['download'] = await self._download_segments(target, completed['os_info'])
+        elif target.run_check and 'download' not in completed:
+            self.progress.update(target, 'download')
+            completed['download'] = await self._download_log(target, completed['os_info'])
+            
+    async def _run_bundle(self, target, completed):
+        """Stream the bundle over one ssh session that runs every phase not yet completed"""
+        options = ['--timeout', target.timeout]
+        if not target.run_create or 'create' in completed:
+            options.append('--skip-create')
+        if not target.run_check or 'download' in completed:
+            options.append('--skip-check')
+        if self.jsonl:
+            options.extend(['--jsonl', '--student', target.student_name])
+        if self.parallel_checks:
+            options.append('--parallel-checks')
+        command, env = target.ssh_command(' '.join([BUNDLE_REMOTE_COMMAND, *map(shlex.quote, options)]))
+        
+        self.progress.update(target, 'connecting', 'bundle')
+        process = await asyncio.create_subprocess_exec(*command, env=env, stdin=asyncio.subprocess.PIPE,
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.PIPE)
+        # stderr carries the scripts' own output; only its last line is kept, for errors
+        stderr_tail = [b'']
+        
+        async def send_bundle():
+            try:
+                process.stdin.write(self.bundle_archive)
+                await process.stdin.drain()
+                process.stdin.close()
+            except ConnectionError:
+                pass  # ssh exited early; its status tells why
+                
+        async def read_stderr():
+            async for line in process.stderr:
+                if line.strip():
+                    stderr_tail[0] = line
+                    
+        tasks = [asyncio.ensure_future(send_bundle()), asyncio.ensure_future(read_stderr())]
+        scripts = {'create': [0, 0], 'check': [0, 0]}  # Phase -> [succeeded, total]
+        remote_log = None
+        log_lines = None  # Results log lines while they are being received
+        segments = []  # With parallel_checks, one log per checker, merged once all have arrived
+        finished = False
+        try:
+            async for raw_line in process.stdout:
+                line = raw_line.decode('utf-8', errors='replace').rstrip('\n')
+                if log_lines is not None:
+                    if line == BUNDLE_RECORD + 'end' and self.parallel_checks:
+                        segments.append(log_lines)
+                        log_lines = None
+                    elif line == BUNDLE_RECORD + 'end':
+                        self._append_results(target, completed.get('os_info', 'Unknown OS'), log_lines)
+                        completed['check'] = '{}/{}'.format(*scripts['check'])
+                        completed['download'] = f"log from {remote_log}"
+                        log_lines = None
+                    else:
+                        log_lines.append(line)
+                    continue
+                if not line.startswith(BUNDLE_RECORD):
+                    continue
+                    
+                record, _, value = line[len(BUNDLE_RECORD):].partition(' ')
+                if record == 'os':
+                    completed['os_info'] = value or 'Unknown OS'
+                elif record == 'script':
+                    phase, script_name, status = value.split(' ', 2)
+                    scripts[phase][0] += status == '0'
+                    scripts[phase][1] += 1
+                    if phase == 'check' and 'create' not in completed and target.run_create:
+                        completed['create'] = '{}/{}'.format(*scripts['create'])
+                    self.progress.update(target, phase, f"{script_name} exit status {status}")
+                elif record == 'log':
+                    remote_log = value
+                    log_lines = []
+                    self.progress.update(target, 'download', remote_log)
+                elif record == 'done':
+                    finished = True
+            await process.wait()
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # Host timeout: do not leave the ssh session behind
+            process.kill()
+            await process.wait()
+            for task in tasks:
+                task.cancel()
+            raise
+            
+        if segments and finished:
+            self._append_results(target, completed.get('os_info', 'Unknown OS'), merge_log_segments(segments))
+            completed['check'] = '{}/{}'.format(*scripts['check'])
+            completed['download'] = f"{len(segments)} logs merged"
+        if not finished:
+            detail = stderr_tail[0].decode('utf-8', errors='replace').strip()
+            raise ConnectionError(detail or f"bundle session ended early (exit status {process.returncode})")
+            
+        if target.run_create and 'create' not in completed:
+            completed['create'] = '{}/{}'.format(*scripts['create'])
+        if target.run_check and 'download' not in completed:
+            completed['check'] = '{}/{}'.format(*scripts['check'])
+            completed['download'] = 'no labresults.log on VM'
+            
+    async def _run_scripts(self, target, phase, scripts_dir):
+        """Copy and run each script in scripts_dir; returns "succeeded/total" like run_vm_labs.sh"""
+        scripts = sorted(scripts_dir.glob('*.sh'))
+        succeeded = 0
+        script_env = ''
+        if self.jsonl:
+            script_env = f"env LAB_RESULTS_FORMAT=jsonl LAB_STUDENT={shlex.quote(target.student_name)} "
+        for number, script in enumerate(scripts, 1):
+            self.progress.update(target, phase, f"{script.name} ({number}/{len(scripts)})")
+            await self._scp(target, str(script), f"{target.destination}:/tmp/{script.name}")
+            status, _ = await self._ssh(target, f"chmod +x /tmp/{script.name} && cd /tmp && "
+                                                f"timeout {target.timeout} sudo {script_env}/tmp/{script.name}")
+            if status == SSH_CONNECTION_ERROR:
+                raise ConnectionError(f"lost connection running {script.name}")
+            succeeded += status == 0
+        return f"{succeeded}/{len(scripts)}"
+        
+    async def _run_checks_parallel(self, target):
+        """Copy every checker, then start them all in one ssh command, each logging to its own segment"""
+        scripts = sorted(CHECKLABS_DIR.glob('*.sh'))
+        script_env = ''
+        if self.jsonl:
+            script_env = f"LAB_RESULTS_FORMAT=jsonl LAB_STUDENT={shlex.quote(target.student_name)} "
+        # Start from an empty directory, or the previous run's segments would be downloaded again
+        remote_command = f"rm -rf {REMOTE_SEGMENT_DIR} && mkdir -p {REMOTE_SEGMENT_DIR} && cd /tmp"
+        for number, script in enumerate(scripts, 1):
+            self.progress.update(target, 'check', f"copying {script.name} ({number}/{len(scripts)})")
+            await self._scp(target, str(script), f"{target.destination}:/tmp/{script.name}")
+            remote_command += (f" && {{ (chmod +x /tmp/{script.name} && timeout {target.timeout} sudo env "
+                               f"{script_env}LAB_RESULTS_LOG={REMOTE_SEGMENT_DIR}/{script.name}.log "
+                               f"/tmp/{script.name} >/dev/null 2>&1; echo \"{script.name} $?\") & }}")
+        if not scripts:
+            return "0/0"
+            
+        self.progress.update(target, 'check', f"{len(scripts)} checkers in parallel")
+        status, output = await self._ssh(target, remote_command + "; wait")
+        if status == SSH_CONNECTION_ERROR:
+            raise ConnectionError('lost connection running the checkers')
+        # Each checker echoes "<script name> <exit status>" when it finishes
+        statuses = dict(line.rsplit(' ', 1) for line in output.splitlines() if line.count(' ') == 1)
+        succeeded = sum(1 for script in scripts if statuses.get(script.name) == '0')
+        return f"{succeeded}/{len(scripts)}"
+        
+    async def _download_segments(self, target, os_info):
+        """Download the per-checker logs from REMOTE_SEGMENT_DIR and append them merged by timestamp"""
+        download_dir = Path(tempfile.mkdtemp(dir=self.log_dir, prefix=f".{id(target)}."))
+        try:
+            try:
+                await self._scp(target, f"{target.destination}:{REMOTE_SEGMENT_DIR}/*.log", str(download_dir))
+            except ConnectionError as e:
+                # Only a missing log means there are no results; a dropped connection is retried
+                if 'No such file or directory' not in str(e):
+                    raise
+                return f"no logs in {REMOTE_SEGMENT_DIR} on VM"
+            segments = [path.read_text(errors='replace').splitlines() for path in sorted(download_dir.iterdir())]
+        finally:
+            shutil.rmtree(download_dir, ignore_errors=True)
+            
+        self._append_results(target, os_info, merge_log_segments(segments))
+        return f"{len(segments)} logs merged"
+        
+    async def _download_log(self, target, os_info):
+        """Append the VM's labresults.log to the student's log under a results header"""
+        for remote_log in REMOTE_LOG_LOCATIONS:
+            status, _ = await self._ssh(target, f"test -f {remote_log}")
+            if status == SSH_CONNECTION_ERROR:
+                raise ConnectionError('lost connection looking for labresults.log')
+            if status != 0:
+                continue
+                
+            download = self.log_dir / f".{id(target)}.download"
+            try:
+                await self._scp(target, f"{target.destination}:{remote_log}", str(download))
+                results = download.read_text(errors='replace')
+            finally:
+                download.unlink(missing_ok=True)
+                
+            self._append_results(target, os_info, results.splitlines())
+            return f"log from {remote_log}"
+            
+        return 'no labresults.log on VM'
+        
+    def _append_results(self, target, os_info, lines):
+        """Append a VM's results log to the student's log under the header run_vm_labs.sh writes"""
+        with open(self.student_logs[target.student_name], 'a') as f:
+            # A single write per download
+            f.write(f"# VM Lab Results for {target.student_name} - "
+                    f"{datetime.now().astimezone().strftime('%a %b %e %H:%M:%S %Z %Y')}\n"
+                    f"# VM: {target.vm_ip} ({os_info})\n" + "".join(line + "\n" for line in lines) + "\n")
+        
+    async def _ssh(self, target, remote_command):
+        return await self._run(*target.ssh_command(remote_command))
+        
+    async def _scp(self, target, source, destination):
+        status, output = await self._run(*target.scp_command(source, destination))
+        if status != 0:
+            detail = output.strip().splitlines()[-1] if output.strip() else f"exit status {status}"
+            raise ConnectionError(f"scp failed: {detail}")
+            
+    async def _run(self, command, env):
+        """Run a local command; returns (exit status, combined output)"""
+        process = await asyncio.create_subprocess_exec(*command, env=env, stdin=asyncio.subprocess.DEVNULL,
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.STDOUT)
+        try:
+            output, _ = await process.communicate()
+        except asyncio.CancelledError:
+            # Host timeout: do not leave ssh sessions behind
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, output.decode('utf-8', errors='replace')
+        
+    def write_reports(self, output_formats=('text',)):
+        """Write each graded student's reports and the index to output_dir; returns the index paths"""
+        # Index students in batch file order rather than the order they finished in
+        self.cohort.graders = {student: self.cohort.graders[student] for student in self.student_logs
+                               if student in self.cohort.graders}
+        return self.cohort.write_reports(self.output_dir, output_formats)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the lab scripts on every VM in a batch file concurrently')
+    parser.add_argument('batch_file', help='vm_config.sh batch file of "run <config_name> [options]" lines')
+    parser.add_argument('--config-dir', default=str(DEFAULT_CONFIG_DIR),
+                       help='Directory of saved VM configurations (default: scripts/vm_configs)')
+    parser.add_argument('--concurrency', type=int, default=10, help='VMs driven at the same time (default: 10)')
+    parser.add_argument('--retries', type=int, default=2,
+                       help='Retries per VM after a connection failure or timeout (default: 2)')
+    parser.add_argument('--backoff', type=float, default=5.0,
+                       help='Seconds before the first retry, doubling after each one (default: 5)')
+    parser.add_argument('--host-timeout', type=float, default=1800,
+                       help='Seconds allowed for one attempt at a VM (default: 1800)')
+    parser.add_argument('--output-dir', default='completedLabs/fleet',
+                       help='Student logs, reports and index (default: completedLabs/fleet)')
+    parser.add_argument('--output-format', type=_parse_output_formats, default='text,json,html',
+                       help='Comma-separated report formats (default: text,json,html)')
+    parser.add_argument('--bundle', action='store_true',
+                       help='Stream all scripts to each VM as one archive and run them, and return the '
+                            'results log, over a single SSH session')
+    parser.add_argument('--jsonl', action='store_true',
+                       help='Have the checker scripts log structured JSONL records, parsed without regexes')
+    parser.add_argument('--parallel-checks', action='store_true',
+                       help='Run the checker scripts at the same time, each with its own log, and merge '
+                            'the logs by timestamp')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_FILE),
+                       help='config.json holding the "labs" classification rules (default: next to grade_labs.py)')
+    args = parser.parse_args()
+    
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.retries < 0 or args.backoff < 0 or args.host_timeout <= 0:
+        parser.error('--retries and --backoff cannot be negative and --host-timeout must be positive')
+        
+    try:
+        targets = read_batch_file(args.batch_file, args.config_dir)
+        orchestrator = FleetOrchestrator(targets, args.output_dir, concurrency=args.concurrency,
+                                         retries=args.retries, backoff=args.backoff,
+                                         host_timeout=args.host_timeout, bundle=args.bundle, jsonl=args.jsonl,
+                                         parallel_checks=args.parallel_checks,
+                                         classifier=LabClassifier.from_config(args.config))
+        failed = orchestrator.run()
+        
+        print(f"\nFleet complete: {len(targets) - failed}/{len(targets)} VMs succeeded")
+        if orchestrator.cohort.graders:
+            index_files = orchestrator.write_reports(args.output_format)
+            print(f"Graded {len(orchestrator.cohort.graders)} students; index saved to "
+                  f"{', '.join(str(index_file) for index_file in index_files)}")
+                  
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+        
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Lab Progress - per-VM status table shared by lab_fleet.py and lab_provision.py
+Kept on its own so the provisioner does not import the ssh and grading code
+"""
+
+import sys
+import time
+
+class ProgressTable:
+    """Status of every VM, redrawn in place on a terminal and logged line by line otherwise"""
+    
+    def __init__(self, targets, stream=None):
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self.rows = {id(target): [target.label, 'queued', ''] for target in targets}
+        self.started = time.monotonic()
+        self.drawn_lines = 0
+        self.label_width = max((len(row[0]) for row in self.rows.values()), default=0)
+        
+    def update(self, target, status, detail=''):
+        row = self.rows[id(target)]
+        row[1:] = [status, detail]
+        if self.interactive:
+            self.draw()
+        else:
+            elapsed = time.monotonic() - self.started
+            print(f"[{elapsed:7.1f}s] {row[0]}: {status}{' - ' + detail if detail else ''}",
+                  file=self.stream, flush=True)
+                  
+    def counts(self):
+        counts = {}
+        for _, status, _ in self.rows.values():
+            key = status if status in ('queued', 'done', 'failed') else 'running'
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+        
+    def draw(self):
+        counts = self.counts()
+        lines = [f"{'VM':{self.label_width}}  {'STATUS':12}  DETAIL"]
+        lines.extend(f"{label:{self.label_width}}  {status:12}  {detail}" for label, status, detail in self.rows.values())
+        lines.append(f"{time.monotonic() - self.started:.0f}s: {counts.get('done', 0)} done, "
+                     f"{counts.get('failed', 0)} failed, {counts.get('running', 0)} running, "
+                     f"{counts.get('queued', 0)} queued")
+                     
+        # Move back to the top of the previous table and overwrite it
+        output = f"\033[{self.drawn_lines}F" if self.drawn_lines else ""
+        output += "".join(f"{line}\033[K\n" for line in lines)
+        self.stream.write(output)
+        self.stream.flush()
+        self.drawn_lines = len(lines)
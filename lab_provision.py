@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Lab Provisioner - clone and start a whole class's lab VMs through the Proxmox API
+Reads the Proxmox connection and defaults from config.json, clones the lab template
+once per VM from a bounded pool of worker threads sharing keep-alive HTTP connections,
+and follows each clone and start task by polling its status with backoff
+Usage: python3 lab_provision.py --count N [--template VMID] [--workers 8] [--prefix rhcsa9-]
+"""
+
+import ssl
+import json
+import time
+import queue
+import select
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit, urlencode, quote
+from concurrent.futures import ThreadPoolExecutor
+
+from grade_labs import DEFAULT_CONFIG_FILE
+from lab_progress import ProgressTable
+
+DEFAULT_WORKERS = 8
+DEFAULT_PROXMOX_PORT = 8006
+DEFAULT_TASK_TIMEOUT = 600  # Seconds allowed for one clone or start task
+
+# Task polling starts every TASK_POLL_INTERVAL seconds and backs off to TASK_POLL_MAX_INTERVAL
+TASK_POLL_INTERVAL = 0.5
+TASK_POLL_BACKOFF = 1.5
+TASK_POLL_MAX_INTERVAL = 5.0
+
+class ProxmoxClient:
+    """Proxmox VE API client whose worker threads share a pool of keep-alive connections
+    
+    Each request borrows a connection and returns it afterwards, so a run opens at
+    most pool_size connections (and TLS handshakes) however many calls it makes. A
+    pooled connection the server has since closed is reopened and the call retried,
+    unless it was a POST that had already been sent.
+    """
+    
+    def __init__(self, host, token_id, token_secret, pool_size=DEFAULT_WORKERS, verify_tls=True, timeout=30):
+        url = urlsplit(host if '://' in host else f"https://{host}")
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port or DEFAULT_PROXMOX_PORT
+        self.timeout = timeout
+        self.context = ssl._create_unverified_context() if self.scheme == 'https' and not verify_tls else None
+        self.headers = {'Authorization': f"PVEAPIToken={token_id}={token_secret}", 'Accept': 'application/json'}
+        self.pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self.pool.put(None)  # Connected on first use
+        self.connections_opened = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        
+    @classmethod
+    def from_config(cls, config, **options):
+        """Client for the proxmoxHost, tokenId and tokenSecret of a config.json dict"""
+        missing = [key for key in ('proxmoxHost', 'tokenId', 'tokenSecret') if not config.get(key)]
+        if missing:
+            raise ValueError(f"config.json has no {', '.join(missing)}")
+        return cls(config['proxmoxHost'], config['tokenId'], config['tokenSecret'], **options)
+        
+    def _connect(self):
+        with self._lock:
+            self.connections_opened += 1
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self.context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        
+    @staticmethod
+    def _dropped(connection):
+        """Whether the server has closed an idle pooled connection (it is readable before any request)"""
+        return connection.sock is None or bool(select.select([connection.sock], [], [], 0)[0])
+        
+    def request(self, method, path, params=None):
+        """The "data" of the API's response to method /api2/json<path>; raises RuntimeError on an API error"""
+        url = '/api2/json' + path
+        headers = dict(self.headers)
+        body = urlencode(params or {})
+        if method == 'GET':
+            url += f"?{body}" if body else ''
+            body = None
+        else:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            
+        connection = self.pool.get()
+        if connection is not None and self._dropped(connection):
+            connection.close()
+            connection = None
+        try:
+            while True:
+                reused = connection is not None
+                connection = connection or self._connect()
+                sent = False
+                try:
+                    connection.request(method, url, body=body, headers=headers)
+                    sent = True
+                    response = connection.getresponse()
+                    payload = response.read()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # Closed while idle in the pool; a fresh connection gets one more try. A POST
+                    # (clone, start) the server may already have acted on is never sent twice.
+                    connection.close()
+                    connection = None
+                    if not reused or (sent and method != 'GET'):
+                        raise
+            if response.will_close:
+                connection.close()
+                connection = None
+        except (OSError, http.client.HTTPException):
+            if connection is not None:
+                connection.close()
+                connection = None
+            raise
+        finally:
+            self.pool.put(connection)
+            with self._lock:
+                self.requests += 1
+                
+        if response.status >= 400:
+            # Proxmox puts the error message in the reason phrase
+            raise RuntimeError(f"{method} {path}: {response.status} {response.reason}")
+        return json.loads(payload or b'{}').get('data')
+        
+    def close(self):
+        """Close the idle pooled connections"""
+        for _ in range(self.pool.qsize()):
+            connection = self.pool.get()
+            if connection is not None:
+                connection.close()
+            self.pool.put(None)
+            
+    def wait_for_task(self, node, upid, timeout=DEFAULT_TASK_TIMEOUT):
+        """Poll a task until it stops, backing off between polls; raises unless it ended OK"""
+        deadline = time.monotonic() + timeout
+        interval = TASK_POLL_INTERVAL
+        while True:
+            status = self.request('GET', f"/nodes/{node}/tasks/{quote(upid, safe='')}/status")
+            if status.get('status') == 'stopped':
+                if status.get('exitstatus') != 'OK':
+                    raise RuntimeError(f"task failed: {status.get('exitstatus')}")
+                return
+            if time.monotonic() + interval > deadline:
+                raise TimeoutError(f"task still running after {timeout}s")
+            time.sleep(interval)
+            interval = min(interval * TASK_POLL_BACKOFF, TASK_POLL_MAX_INTERVAL)
+
+class LabVM:
+    """One VM of the class: its name, VMID and whether it already exists on the cluster"""
+    
+    def __init__(self, name, vmid, exists=False, running=False):
+        self.name = name
+        self.vmid = vmid
+        self.exists = exists
+        self.running = running
+        
+    @property
+    def label(self):
+        return f"{self.name} ({self.vmid})"
+
+class ClassProvisioner:
+    """Clone the lab template once per student VM and start the clones, `workers` VMs at a time
+    
+    plan() names the VMs and assigns free VMIDs up front, so parallel clones never
+    race for the same ID. VMs that already exist by name are only started, which
+    makes a rerun after a partial failure pick up where it stopped.
+    """
+    
+    def __init__(self, client, node, template, storage='', workers=DEFAULT_WORKERS, linked=False, start=True,
+                 task_timeout=DEFAULT_TASK_TIMEOUT):
+        self.client = client
+        self.node = node
+        self.template = template
+        self.storage = storage
+        self.workers = workers
+        self.linked = linked
+        self.start = start
+        self.task_timeout = task_timeout
+        self.progress = None
+        self.results = {}  # VMID -> 'done' or the reason it failed
+        self._progress_lock = threading.Lock()
+        
+    def plan(self, names, start_vmid=None):
+        """A LabVM for each name, reusing existing VMs and numbering new ones from start_vmid"""
+        resources = self.client.request('GET', '/cluster/resources', {'type': 'vm'}) or []
+        existing = {resource.get('name'): resource for resource in resources}
+        used_ids = {int(resource['vmid']) for resource in resources}
+        vmid = int(start_vmid or self.client.request('GET', '/cluster/nextid'))
+        
+        vms = []
+        for name in names:
+            if name in existing:
+                resource = existing[name]
+                vms.append(LabVM(name, int(resource['vmid']), exists=True,
+                                 running=resource.get('status') == 'running'))
+                continue
+            while vmid in used_ids:
+                vmid += 1
+            used_ids.add(vmid)
+            vms.append(LabVM(name, vmid))
+        return vms
+        
+    def run(self, vms, progress=None):
+        """Provision every VM with the worker pool; returns the number that failed"""
+        self.progress = progress or ProgressTable(vms)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(self._provision, vms))
+        return sum(1 for result in self.results.values() if result != 'done')
+        
+    def _update(self, vm, status, detail=''):
+        # ProgressTable redraws the whole table, one worker at a time
+        with self._progress_lock:
+            self.progress.update(vm, status, detail)
+            
+    def _provision(self, vm):
+        try:
+            if not vm.exists:
+                self._update(vm, 'cloning', f"from template {self.template}")
+                params = {'newid': vm.vmid, 'name': vm.name, 'full': 0 if self.linked else 1}
+                if self.storage and not self.linked:
+                    params['storage'] = self.storage
+                upid = self.client.request('POST', f"/nodes/{self.node}/qemu/{self.template}/clone", params)
+                self.client.wait_for_task(self.node, upid, self.task_timeout)
+            if self.start and not vm.running:
+                self._update(vm, 'starting')
+                upid = self.client.request('POST', f"/nodes/{self.node}/qemu/{vm.vmid}/status/start")
+                self.client.wait_for_task(self.node, upid, self.task_timeout)
+            self.results[vm.vmid] = 'done'
+            self._update(vm, 'done', 'running' if self.start else 'stopped')
+        except (OSError, RuntimeError, http.client.HTTPException) as e:
+            self.results[vm.vmid] = str(e) or type(e).__name__
+            self._update(vm, 'failed', self.results[vm.vmid])
+
+def vm_names(prefix, count):
+    """prefix01, prefix02, ... numbered wide enough for count"""
+    width = max(2, len(str(count)))
+    return [f"{prefix}{number:0{width}d}" for number in range(1, count + 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Clone and start lab VMs for a class through the Proxmox API')
+    parser.add_argument('--count', type=int, required=True, help='Number of lab VMs to provision')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_FILE),
+                       help='config.json with the Proxmox connection and defaults (default: next to grade_labs.py)')
+    parser.add_argument('--template', type=int,
+                       help='VMID of the lab template to clone (default: labTemplateVmid from config.json)')
+    parser.add_argument('--node', help='Proxmox node (default: defaultNode from config.json)')
+    parser.add_argument('--storage', help='Storage for full clones (default: defaultStorage from config.json)')
+    parser.add_argument('--prefix', help='VM name prefix, numbered 01, 02, ... (default: defaultPrefix)')
+    parser.add_argument('--start-vmid', type=int, help='First VMID to try for new VMs (default: cluster nextid)')
+    parser.add_argument('--workers', type=int,
+                       help=f'VMs cloned at the same time (default: provisionWorkers or {DEFAULT_WORKERS})')
+    parser.add_argument('--linked', action='store_true', help='Linked instead of full clones')
+    parser.add_argument('--no-start', action='store_true', help='Leave the clones stopped')
+    parser.add_argument('--task-timeout', type=float, default=DEFAULT_TASK_TIMEOUT,
+                       help=f'Seconds allowed for each clone or start task (default: {DEFAULT_TASK_TIMEOUT})')
+    parser.add_argument('--insecure', action='store_true',
+                       help="Do not verify the server's TLS certificate (self-signed Proxmox installs)")
+    args = parser.parse_args()
+    
+    if args.count < 1:
+        parser.error('--count must be at least 1')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+        
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        template = args.template or config.get('labTemplateVmid')
+        if not template:
+            parser.error('no --template given and no labTemplateVmid in config.json')
+        workers = args.workers or config.get('provisionWorkers') or DEFAULT_WORKERS
+        
+        client = ProxmoxClient.from_config(config, pool_size=workers, verify_tls=not args.insecure)
+        provisioner = ClassProvisioner(client, args.node or config.get('defaultNode', 'pve'), template,
+                                       storage=args.storage or config.get('defaultStorage', ''),
+                                       workers=workers, linked=args.linked, start=not args.no_start,
+                                       task_timeout=args.task_timeout)
+        started = time.monotonic()
+        vms = provisioner.plan(vm_names(args.prefix or config.get('defaultPrefix', 'lab-'), args.count),
+                               args.start_vmid)
+        failed = provisioner.run(vms)
+        
+        print(f"\nProvisioned {len(vms) - failed}/{len(vms)} VMs in {time.monotonic() - started:.1f}s "
+              f"({client.requests} API calls over {client.connections_opened} connections)")
+        
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    except (OSError, RuntimeError, http.client.HTTPException) as e:
+        print(f"Error: cannot reach the Proxmox API: {e}")
+        return 1
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+        
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    exit(main())
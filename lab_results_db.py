@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Lab Results Database - persistent SQLite store for graded lab attempts
+Ingests labresults.log files incrementally and answers cohort queries with SQL
+Usage: python3 lab_results_db.py [--db path] ingest|failing|students|report ...
+"""
+
+import sqlite3
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from grade_labs import (LabGrader, LabClassifier, DEFAULT_CONFIG_FILE, STUDENT_MARKER, STUDENT_MARKER_RE,
+                        UNASSIGNED_STUDENT, _parse_output_formats)
+
+DEFAULT_DB_FILE = 'labresults.db'
+
+# Rows are inserted per batch so large logs do not sit in memory
+INGEST_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    line_number INTEGER NOT NULL DEFAULT 0,
+    student TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+
+-- One row per result line; id follows ingest order, which is file order
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    line_number INTEGER NOT NULL,
+    student TEXT NOT NULL,
+    lab_type TEXT NOT NULL,
+    task TEXT NOT NULL,
+    status TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    message TEXT NOT NULL,
+    UNIQUE (source_id, line_number)
+);
+CREATE INDEX IF NOT EXISTS attempts_student ON attempts (student, task);
+CREATE INDEX IF NOT EXISTS attempts_task ON attempts (task, status);
+CREATE INDEX IF NOT EXISTS attempts_lab_type ON attempts (lab_type);
+CREATE INDEX IF NOT EXISTS attempts_timestamp ON attempts (timestamp);
+
+-- Final status per student and task, as LabGrader.final_status would hold it
+CREATE TABLE IF NOT EXISTS task_results (
+    student TEXT NOT NULL,
+    task TEXT NOT NULL,
+    lab_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (student, task)
+);
+CREATE INDEX IF NOT EXISTS task_results_task ON task_results (task, status, attempts);
+"""
+
+# Latest PASS/FAIL per student and task; attempts counts every entry up to it.
+# position orders tasks by their first PASS/FAIL, matching final_status ordering.
+REFRESH_TASK_RESULTS = """
+INSERT INTO task_results (student, task, lab_type, status, attempts, timestamp, position)
+WITH counted AS (
+    SELECT id, student, task, lab_type, status, timestamp,
+           COUNT(*) OVER (PARTITION BY student, task ORDER BY id) AS attempts
+    FROM attempts
+    WHERE student IN (SELECT student FROM temp.changed_students)
+), final AS (
+    SELECT *,
+           ROW_NUMBER() OVER (PARTITION BY student, task ORDER BY id DESC) AS recency,
+           MIN(id) OVER (PARTITION BY student, task) AS position
+    FROM counted
+    WHERE status IN ('PASS', 'FAIL')
+)
+SELECT student, task, lab_type, status, attempts, timestamp, position FROM final WHERE recency = 1
+"""
+
+class LabResultsDB:
+    """SQLite store of parsed lab attempts, one database for many logs and students
+    
+    Each source log is ingested from the byte offset reached last time, inside a
+    single transaction, so re-running an ingest never duplicates rows. A rotated
+    or truncated log replaces its earlier rows.
+    """
+    
+    def __init__(self, db_file=DEFAULT_DB_FILE, classifier=None):
+        self.db_file = Path(db_file)
+        self.classifier = classifier or LabClassifier()
+        self.connection = sqlite3.connect(self.db_file)
+        self.connection.executescript(SCHEMA)
+        # Students whose task_results are recomputed at the end of an ingest
+        self.connection.execute('CREATE TEMP TABLE changed_students (student TEXT PRIMARY KEY)')
+        
+    def close(self):
+        self.connection.close()
+        
+    def ingest(self, log_file, student=None):
+        """Add the lines appended to log_file since its last ingest; returns the new row count
+        
+        Lines before the first "# VM Lab Results for" header are credited to
+        student, or to the unassigned shard when none is given.
+        """
+        log_file = Path(log_file)
+        if not log_file.exists():
+            raise FileNotFoundError(f"Log file {log_file} not found")
+            
+        path = str(log_file.resolve())
+        stat = log_file.stat()
+        parser = LabGrader(log_file, classifier=self.classifier)
+        
+        with self.connection:
+            source = self.connection.execute(
+                'SELECT id, inode, offset, line_number, student FROM sources WHERE path = ?', (path,)).fetchone()
+            if source is None:
+                source_id = self.connection.execute(
+                    'INSERT INTO sources (path, inode, student, ingested_at) VALUES (?, ?, ?, ?)',
+                    (path, stat.st_ino, student or UNASSIGNED_STUDENT, datetime.now().isoformat())).lastrowid
+                offset, line_number, current_student = 0, 0, student or UNASSIGNED_STUDENT
+            else:
+                source_id, inode, offset, line_number, current_student = source
+                if inode != stat.st_ino or offset > stat.st_size:
+                    # Rotated or truncated since the last ingest: start over
+                    self._mark_changed(self.connection.execute(
+                        'SELECT DISTINCT student FROM attempts WHERE source_id = ?', (source_id,)))
+                    self.connection.execute('DELETE FROM attempts WHERE source_id = ?', (source_id,))
+                    offset, line_number, current_student = 0, 0, student or UNASSIGNED_STUDENT
+                    
+            changed_students = set()
+            rows = []
+            inserted = 0
+            with open(log_file, 'rb') as f:
+                f.seek(offset)
+                for raw_line in f:
+                    if not raw_line.endswith(b'\n'):
+                        # Still being written; picked up by the next ingest
+                        break
+                    offset += len(raw_line)
+                    line_number += 1
+                    line = raw_line.decode('utf-8', errors='replace')
+                    
+                    if line.startswith(STUDENT_MARKER):
+                        match = STUDENT_MARKER_RE.match(line)
+                        if match:
+                            current_student = match.group(1).strip()
+                            continue
+                            
+                    entry = parser.parse_classified(line.strip())
+                    if entry is None:
+                        continue
+                    timestamp, status, message, (lab_type, task_name) = entry
+                    rows.append((source_id, line_number, current_student, lab_type, task_name, status,
+                                 timestamp.isoformat(), message.strip()))
+                    changed_students.add(current_student)
+                    
+                    if len(rows) >= INGEST_BATCH_SIZE:
+                        inserted += self._insert_attempts(rows)
+                        rows = []
+            inserted += self._insert_attempts(rows)
+            
+            self.connection.execute(
+                'UPDATE sources SET inode = ?, offset = ?, line_number = ?, student = ?, ingested_at = ? '
+                'WHERE id = ?',
+                (stat.st_ino, offset, line_number, current_student, datetime.now().isoformat(), source_id))
+                
+            self._mark_changed((student_name,) for student_name in changed_students)
+            self._refresh_task_results()
+            
+        return inserted
+        
+    def _insert_attempts(self, rows):
+        """Insert attempt rows, skipping lines already stored for their source"""
+        cursor = self.connection.executemany(
+            'INSERT OR IGNORE INTO attempts (source_id, line_number, student, lab_type, task, status, '
+            'timestamp, message) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return cursor.rowcount
+        
+    def _mark_changed(self, students):
+        """Queue students whose task_results must be recomputed"""
+        self.connection.executemany('INSERT OR IGNORE INTO temp.changed_students VALUES (?)', students)
+        
+    def _refresh_task_results(self):
+        """Recompute task_results for the queued students"""
+        self.connection.execute(
+            'DELETE FROM task_results WHERE student IN (SELECT student FROM temp.changed_students)')
+        self.connection.execute(REFRESH_TASK_RESULTS)
+        self.connection.execute('DELETE FROM temp.changed_students')
+        
+    def students(self):
+        """Student names in the order they were first ingested"""
+        rows = self.connection.execute('SELECT student FROM attempts GROUP BY student ORDER BY MIN(id)')
+        return [student for student, in rows]
+        
+    def failing_students(self, task_name, min_attempts=1):
+        """Students whose latest result for task_name is FAIL after at least min_attempts attempts
+        
+        Returns (student, attempts, timestamp) tuples, most attempts first.
+        """
+        return self.connection.execute(
+            'SELECT student, attempts, timestamp FROM task_results '
+            'WHERE task = ? AND status = ? AND attempts >= ? ORDER BY attempts DESC, student',
+            (task_name, 'FAIL', min_attempts)).fetchall()
+            
+    def grader_for(self, student):
+        """LabGrader holding a student's task state as queried from the database
+        
+        Only the aggregate state is loaded, which is all the report generators need.
+        """
+        connection = self.connection
+        total_entries, = connection.execute('SELECT COUNT(*) FROM attempts WHERE student = ?',
+                                            (student,)).fetchone()
+        if not total_entries:
+            raise KeyError(f"No results for student {student!r} in {self.db_file}")
+            
+        lab_types = [lab_type for lab_type, in connection.execute(
+            'SELECT lab_type FROM attempts WHERE student = ? GROUP BY lab_type ORDER BY MIN(id)', (student,))]
+        attempt_counts = dict(connection.execute(
+            'SELECT task, COUNT(*) FROM attempts WHERE student = ? GROUP BY task', (student,)))
+        final_status = {
+            task_name: {'status': status, 'timestamp': datetime.fromisoformat(timestamp),
+                        'lab_type': lab_type, 'attempts': attempts}
+            for task_name, status, timestamp, lab_type, attempts in connection.execute(
+                'SELECT task, status, timestamp, lab_type, attempts FROM task_results '
+                'WHERE student = ? ORDER BY position', (student,))
+        }
+        
+        grader = LabGrader(self.db_file, student=student, classifier=self.classifier)
+        grader.load_state({
+            'offset': 0,
+            'line_number': 0,
+            'total_entries': total_entries,
+            'lab_types': lab_types,
+            'attempt_counts': attempt_counts,
+            'final_status': final_status
+        })
+        return grader
+
+def main():
+    parser = argparse.ArgumentParser(description='Store lab results in SQLite and query them')
+    parser.add_argument('--db', default=DEFAULT_DB_FILE, help=f'SQLite database file (default: {DEFAULT_DB_FILE})')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_FILE),
+                       help='config.json holding the "labs" classification rules (default: next to grade_labs.py)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    ingest_parser = commands.add_parser('ingest', help='Add new lines from one or more logs')
+    ingest_parser.add_argument('log_files', nargs='+', help='labresults.log files to ingest')
+    ingest_parser.add_argument('--student',
+                              help='Student for lines before the first "# VM Lab Results for" header')
+                              
+    failing_parser = commands.add_parser('failing', help='Students still failing a task')
+    failing_parser.add_argument('--task', required=True, help='Task name, e.g. "NFS Mount"')
+    failing_parser.add_argument('--min-attempts', type=int, default=1,
+                               help='Only students with at least this many attempts (default: 1)')
+                               
+    commands.add_parser('students', help='List ingested students')
+    
+    report_parser = commands.add_parser('report', help="Generate a student's report from the database")
+    report_parser.add_argument('--student', required=True, help='Student name')
+    report_parser.add_argument('--output-format', type=_parse_output_formats, default='text',
+                              help='Output format, or a comma-separated list written to --output-dir '
+                                   '(default: text)')
+    report_parser.add_argument('--output-dir', help='Write reports into this directory')
+    report_parser.add_argument('--report-prefix', help='File name prefix for reports in --output-dir')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'report' and len(args.output_format) > 1 and not args.output_dir:
+        parser.error('several output formats require --output-dir')
+        
+    try:
+        database = LabResultsDB(args.db, classifier=LabClassifier.from_config(args.config))
+        try:
+            if args.command == 'ingest':
+                for log_file in args.log_files:
+                    inserted = database.ingest(log_file, student=args.student)
+                    print(f"Ingested {inserted} new results from {log_file}")
+            elif args.command == 'failing':
+                for student, attempts, timestamp in database.failing_students(args.task, args.min_attempts):
+                    print(f"{student}\t{attempts} attempts\tlast {timestamp}")
+            elif args.command == 'students':
+                for student in database.students():
+                    print(student)
+            else:
+                grader = database.grader_for(args.student)
+                if args.output_dir:
+                    for report_file in grader.write_reports(args.output_dir, args.output_format,
+                                                             args.report_prefix):
+                        print(f"Report saved to {report_file}")
+                else:
+                    print(grader.generate_reports(args.output_format)[args.output_format[0]])
+        finally:
+            database.close()
+            
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        return 1
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+        
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,140 @@
+#!/bin/bash
+
+# Bundle Runner - remote side of bundle mode
+# Runs the bundled createlabs/checklabs scripts and returns the results log, all in
+# the single SSH session that streamed the bundle to the VM
+# Usage: bundle_runner.sh [--timeout <seconds>] [--skip-create] [--skip-check]
+#                         [--jsonl] [--student <name>] [--parallel-checks]
+#
+# Script output goes to stderr. stdout only carries records for the orchestrator:
+#   @@LAB os <pretty name>
+#   @@LAB script <create|check> <script name> <exit status>
+#   @@LAB log <remote path>, then the log lines, then @@LAB end
+#   @@LAB done
+# With --parallel-checks the checkers run at the same time, each logging to its
+# own segment, and every segment is sent as a log record for the orchestrator to
+# merge by timestamp
+
+BUNDLE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TIMEOUT="300"
+RUN_CREATE=true
+RUN_CHECK=true
+RESULTS_FORMAT="text"
+STUDENT_NAME=""
+PARALLEL_CHECKS=false
+
+# Same locations run_vm_labs.sh downloads from, tried in order
+LOG_LOCATIONS=("/tmp/labresults.log" "../../labresults.log" "/root/labresults.log" "/var/log/labresults.log")
+
+while [[ $# -gt 0 ]]; do
+    case $1 in
+        --timeout)
+            TIMEOUT="$2"
+            shift 2
+            ;;
+        --skip-create)
+            RUN_CREATE=false
+            shift
+            ;;
+        --skip-check)
+            RUN_CHECK=false
+            shift
+            ;;
+        --jsonl)
+            RESULTS_FORMAT="jsonl"
+            shift
+            ;;
+        --student)
+            STUDENT_NAME="$2"
+            shift 2
+            ;;
+        --parallel-checks)
+            PARALLEL_CHECKS=true
+            shift
+            ;;
+        *)
+            echo "Unknown option: $1" >&2
+            exit 1
+            ;;
+    esac
+done
+
+# The bundle is extracted into a temporary directory; remove it when done
+trap 'rm -rf "$BUNDLE_DIR"' EXIT
+
+record() {
+    echo "@@LAB $*"
+}
+
+# Copy each script to /tmp and run it from there, as run_remote_script does
+run_phase() {
+    local phase="$1"
+    local scripts_dir="$BUNDLE_DIR/$2"
+
+    for script in "$scripts_dir"/*.sh; do
+        if [[ -f "$script" ]]; then
+            local script_name=$(basename "$script")
+            cp "$script" "/tmp/$script_name" && chmod +x "/tmp/$script_name"
+            (cd /tmp && timeout "$TIMEOUT" sudo env LAB_RESULTS_FORMAT="$RESULTS_FORMAT" \
+                LAB_STUDENT="$STUDENT_NAME" "/tmp/$script_name") >&2
+            record script "$phase" "$script_name" "$?"
+        fi
+    done
+}
+
+# Start every checker at once, each with its own log segment, then report them in order
+run_checks_parallel() {
+    local segment_dir="$BUNDLE_DIR/segments"
+    local pids=()
+    local names=()
+    mkdir -p "$segment_dir"
+    
+    for script in "$BUNDLE_DIR"/checklabs/*.sh; do
+        if [[ -f "$script" ]]; then
+            local script_name=$(basename "$script")
+            cp "$script" "/tmp/$script_name" && chmod +x "/tmp/$script_name"
+            (cd /tmp && timeout "$TIMEOUT" sudo env LAB_RESULTS_FORMAT="$RESULTS_FORMAT" \
+                LAB_STUDENT="$STUDENT_NAME" LAB_RESULTS_LOG="$segment_dir/$script_name.log" \
+                "/tmp/$script_name") >&2 &
+            pids+=("$!")
+            names+=("$script_name")
+        fi
+    done
+    
+    for i in "${!pids[@]}"; do
+        wait "${pids[$i]}"
+        record script check "${names[$i]}" "$?"
+    done
+    
+    for segment in "$segment_dir"/*.log; do
+        if [[ -f "$segment" ]]; then
+            record log "$segment"
+            awk 1 "$segment"
+            record end
+        fi
+    done
+}
+
+record os "$(cat /etc/os-release 2>/dev/null | grep PRETTY_NAME | cut -d= -f2 | tr -d '"' || echo 'Unknown OS')"
+
+if [[ "$RUN_CREATE" == true ]]; then
+    run_phase create createlabs
+fi
+
+if [[ "$RUN_CHECK" == true && "$PARALLEL_CHECKS" == true ]]; then
+    run_checks_parallel
+elif [[ "$RUN_CHECK" == true ]]; then
+    run_phase check checklabs
+
+    for remote_log in "${LOG_LOCATIONS[@]}"; do
+        if [[ -f "$remote_log" ]]; then
+            record log "$remote_log"
+            # awk 1 adds a final newline if the log lacks one
+            awk 1 "$remote_log"
+            record end
+            break
+        fi
+    done
+fi
+
+record done
@@ -9,7 +9,14 @@ NFS_SHARE_NAME="usershare"
 MOUNT_POINT="/home/shares"
 USER_NAME="eric"
 USER_HOME="$MOUNT_POINT/$USER_NAME"
-LOGFILE="../../labresults.log"
+# LAB_RESULTS_LOG gives each checker its own log when they run in parallel
+LOGFILE="${LAB_RESULTS_LOG:-../../labresults.log}"
+
+# Results format: "text" (default) appends "$(date): STATUS: message" lines, "jsonl"
+# appends one JSON record per result with the lab and task named explicitly
+LAB_RESULTS_FORMAT="${LAB_RESULTS_FORMAT:-text}"
+LAB_STUDENT="${LAB_STUDENT:-}"
+LAB_NAME="NFS Configuration"
 
 # Colors for output
 RED='\033[0;31m'
@@ -22,9 +29,21 @@ echo -e "${BLUE}=== NFS Share Verification ===${NC}"
 echo "Checking usershare NFS configuration..."
 echo ""
 
-# Function to log results
+# Escape a value for use inside a JSON string
+json_escape() {
+    local value="${1//\\/\\\\}"
+    printf '%s' "${value//\"/\\\"}"
+}
+
+# Function to log results: log_result "STATUS: message" "Task name"
 log_result() {
-    echo "$(date): $1" >> "$LOGFILE"
+    if [[ "$LAB_RESULTS_FORMAT" == "jsonl" ]]; then
+        printf '{"ts": %s, "tz": "%s", "student": "%s", "lab": "%s", "task": "%s", "status": "%s", "message": "%s"}\n' \
+            "$(date +%s)" "$(date +%z)" "$(json_escape "$LAB_STUDENT")" "$(json_escape "$LAB_NAME")" "$(json_escape "$2")" \
+            "$(json_escape "${1%%: *}")" "$(json_escape "${1#*: }")" >> "$LOGFILE"
+    else
+        echo "$(date): $1" >> "$LOGFILE"
+    fi
 }
 
 # Function to check /etc/fstab for usershare entry
@@ -33,14 +52,14 @@ check_fstab() {
     
     if [[ ! -f /etc/fstab ]]; then
         echo -e "   ${RED}✗ FAIL: /etc/fstab file not found${NC}"
-        log_result "FAIL: /etc/fstab not found"
+        log_result "FAIL: /etc/fstab not found" "FSTAB Configuration"
         return 1
     fi
     
     # Look for usershare in fstab (various possible formats)
     if grep -q "usershare" /etc/fstab 2>/dev/null; then
         echo -e "   ${GREEN}✓ PASS: usershare found in /etc/fstab${NC}"
-        log_result "PASS: usershare found in fstab"
+        log_result "PASS: usershare found in fstab" "FSTAB Configuration"
         
         # Show the matching line(s)
         echo "   Matching entries:"
@@ -51,16 +70,16 @@ check_fstab() {
         # Check if it's pointing to /home/shares
         if grep "usershare.*$MOUNT_POINT" /etc/fstab >/dev/null 2>&1; then
             echo -e "   ${GREEN}✓ BONUS: Entry correctly points to $MOUNT_POINT${NC}"
-            log_result "PASS: usershare correctly configured for $MOUNT_POINT"
+            log_result "PASS: usershare correctly configured for $MOUNT_POINT" "FSTAB Configuration"
         else
             echo -e "   ${YELLOW}⚠ INFO: usershare found but mount point may differ${NC}"
-            log_result "INFO: usershare mount point differs"
+            log_result "INFO: usershare mount point differs" "FSTAB Configuration"
         fi
         
         return 0
     else
         echo -e "   ${RED}✗ FAIL: usershare not found in /etc/fstab${NC}"
-        log_result "FAIL: usershare not in fstab"
+        log_result "FAIL: usershare not in fstab" "FSTAB Configuration"
         
         # Show what IS in fstab for debugging
         echo "   Current /etc/fstab entries:"
@@ -79,14 +98,14 @@ check_mount() {
     # Check if mount point directory exists
     if [[ ! -d "$MOUNT_POINT" ]]; then
         echo -e "   ${RED}✗ FAIL: Mount point directory $MOUNT_POINT does not exist${NC}"
-        log_result "FAIL: Mount point $MOUNT_POINT does not exist"
+        log_result "FAIL: Mount point $MOUNT_POINT does not exist" "NFS Mount"
         return 1
     fi
     
     # Check if something is mounted at the mount point
     if mount | grep -q "$MOUNT_POINT" 2>/dev/null; then
         echo -e "   ${GREEN}✓ PASS: Something is mounted at $MOUNT_POINT${NC}"
-        log_result "PASS: Mount detected at $MOUNT_POINT"
+        log_result "PASS: Mount detected at $MOUNT_POINT" "NFS Mount"
         
         # Show what's mounted there
         echo "   Mount details:"
@@ -97,16 +116,16 @@ check_mount() {
         # Check if it's specifically usershare
         if mount | grep "$MOUNT_POINT" | grep -q "usershare" 2>/dev/null; then
             echo -e "   ${GREEN}✓ BONUS: usershare is specifically mounted at $MOUNT_POINT${NC}"
-            log_result "PASS: usershare mounted at $MOUNT_POINT"
+            log_result "PASS: usershare mounted at $MOUNT_POINT" "NFS Mount"
         else
             echo -e "   ${YELLOW}⚠ INFO: Mount found but may not be usershare${NC}"
-            log_result "INFO: Non-usershare mount at $MOUNT_POINT"
+            log_result "INFO: Non-usershare mount at $MOUNT_POINT" "NFS Mount"
         fi
         
         return 0
     else
         echo -e "   ${RED}✗ FAIL: Nothing mounted at $MOUNT_POINT${NC}"
-        log_result "FAIL: Nothing mounted at $MOUNT_POINT"
+        log_result "FAIL: Nothing mounted at $MOUNT_POINT" "NFS Mount"
         
         # Show current mounts for debugging
         echo "   Current NFS/network mounts:"
@@ -125,7 +144,7 @@ check_user_home() {
     # First check if user exists
     if ! id "$USER_NAME" &>/dev/null; then
         echo -e "   ${RED}✗ FAIL: User '$USER_NAME' does not exist${NC}"
-        log_result "FAIL: User $USER_NAME does not exist"
+        log_result "FAIL: User $USER_NAME does not exist" "User Home Directory"
         return 1
     fi
     
@@ -141,21 +160,21 @@ check_user_home() {
     # Check if home directory is inside /home/shares
     if [[ "$actual_home" == "$USER_HOME" ]]; then
         echo -e "   ${GREEN}✓ PASS: User $USER_NAME home directory is correctly set to $USER_HOME${NC}"
-        log_result "PASS: User $USER_NAME home in $MOUNT_POINT"
+        log_result "PASS: User $USER_NAME home in $MOUNT_POINT" "User Home Directory"
     elif [[ "$actual_home" == $MOUNT_POINT/* ]]; then
         echo -e "   ${GREEN}✓ PASS: User $USER_NAME home directory is inside $MOUNT_POINT${NC}"
         echo "   (Located at: $actual_home)"
-        log_result "PASS: User $USER_NAME home inside $MOUNT_POINT"
+        log_result "PASS: User $USER_NAME home inside $MOUNT_POINT" "User Home Directory"
     else
         echo -e "   ${RED}✗ FAIL: User $USER_NAME home directory is NOT inside $MOUNT_POINT${NC}"
-        log_result "FAIL: User $USER_NAME home not in $MOUNT_POINT"
+        log_result "FAIL: User $USER_NAME home not in $MOUNT_POINT" "User Home Directory"
         return 1
     fi
     
     # Check if the directory actually exists
     if [[ -d "$actual_home" ]]; then
         echo -e "   ${GREEN}✓ PASS: Home directory physically exists${NC}"
-        log_result "PASS: $USER_NAME home directory exists"
+        log_result "PASS: $USER_NAME home directory exists" "Home Directory Exists"
         
         # Show directory contents
         echo "   Directory contents (first few items):"
@@ -166,7 +185,7 @@ check_user_home() {
         return 0
     else
         echo -e "   ${RED}✗ FAIL: Home directory $actual_home does not exist${NC}"
-        log_result "FAIL: $USER_NAME home directory does not exist"
+        log_result "FAIL: $USER_NAME home directory does not exist" "Home Directory Exists"
         return 1
     fi
 }
@@ -215,10 +234,10 @@ main() {
     
     if [[ $exit_code -eq 0 ]]; then
         echo -e "${GREEN}🎉 VERIFICATION PASSED! All NFS share requirements met.${NC}"
-        log_result "NFS VERIFICATION PASSED: All checks successful"
+        log_result "NFS VERIFICATION PASSED: All checks successful" "NFS Lab Complete"
     else
         echo -e "${RED}❌ VERIFICATION FAILED! Some requirements not met.${NC}"
-        log_result "NFS VERIFICATION FAILED: Some checks failed"
+        log_result "NFS VERIFICATION FAILED: Some checks failed" "NFS Lab Complete"
         echo ""
         echo -e "${YELLOW}Common fixes:${NC}"
         echo "1. Add usershare to /etc/fstab: echo 'server:/path/usershare $MOUNT_POINT nfs defaults 0 0' >> /etc/fstab"
@@ -7,7 +7,14 @@ set -e  # Exit on any error
 
 DOMAIN="example.com"
 REPO_DIR="/etc/yum.repos.d"
-LOGFILE="../../labresults.log"
+# LAB_RESULTS_LOG gives each checker its own log when they run in parallel
+LOGFILE="${LAB_RESULTS_LOG:-../../labresults.log}"
+
+# Results format: "text" (default) appends "$(date): STATUS: message" lines, "jsonl"
+# appends one JSON record per result with the lab and task named explicitly
+LAB_RESULTS_FORMAT="${LAB_RESULTS_FORMAT:-text}"
+LAB_STUDENT="${LAB_STUDENT:-}"
+LAB_NAME="Package Management"
 
 # Colors for output
 RED='\033[0;31m'
@@ -20,9 +27,21 @@ echo -e "${BLUE}=== YUM Repository Verification ===${NC}"
 echo "Checking for $DOMAIN repository configuration..."
 echo ""
 
-# Function to log results
+# Escape a value for use inside a JSON string
+json_escape() {
+    local value="${1//\\/\\\\}"
+    printf '%s' "${value//\"/\\\"}"
+}
+
+# Function to log results: log_result "STATUS: message" "Task name"
 log_result() {
-    echo "$(date): $1" >> "$LOGFILE"
+    if [[ "$LAB_RESULTS_FORMAT" == "jsonl" ]]; then
+        printf '{"ts": %s, "tz": "%s", "student": "%s", "lab": "%s", "task": "%s", "status": "%s", "message": "%s"}\n' \
+            "$(date +%s)" "$(date +%z)" "$(json_escape "$LAB_STUDENT")" "$(json_escape "$LAB_NAME")" "$(json_escape "$2")" \
+            "$(json_escape "${1%%: *}")" "$(json_escape "${1#*: }")" >> "$LOGFILE"
+    else
+        echo "$(date): $1" >> "$LOGFILE"
+    fi
 }
 
 # Function to check if /etc/yum.repos.d directory exists
@@ -31,12 +50,12 @@ check_repo_directory() {
     
     if [[ ! -d "$REPO_DIR" ]]; then
         echo -e "   ${RED}✗ FAIL: Repository directory $REPO_DIR does not exist${NC}"
-        log_result "FAIL: $REPO_DIR directory missing"
+        log_result "FAIL: $REPO_DIR directory missing" "Repository Directory"
         return 1
     fi
     
     echo -e "   ${GREEN}✓ PASS: Repository directory $REPO_DIR exists${NC}"
-    log_result "PASS: Repository directory exists"
+    log_result "PASS: Repository directory exists" "Repository Directory"
     
     # Show directory contents
     echo "   Directory contents:"
@@ -70,7 +89,7 @@ check_domain_in_repos() {
     
     if [[ $found_count -gt 0 ]]; then
         echo -e "   ${GREEN}✓ PASS: Found $DOMAIN in $found_count repository file(s)${NC}"
-        log_result "PASS: $DOMAIN found in $found_count repo files"
+        log_result "PASS: $DOMAIN found in $found_count repo files" "Repository Configuration"
         
         # Show which files contain the domain
         echo "   Files containing $DOMAIN:"
@@ -81,7 +100,7 @@ check_domain_in_repos() {
         return 0
     else
         echo -e "   ${RED}✗ FAIL: $DOMAIN not found in any repository files${NC}"
-        log_result "FAIL: $DOMAIN not found in repo files"
+        log_result "FAIL: $DOMAIN not found in repo files" "Repository Configuration"
         return 1
     fi
 }
@@ -129,12 +148,12 @@ analyze_repo_config() {
             # Check for common repository configuration elements
             if grep -q "baseurl.*$DOMAIN" "$repo_file"; then
                 echo -e "   ${GREEN}✓ Found baseurl with $DOMAIN${NC}"
-                log_result "PASS: baseurl with $DOMAIN found"
+                log_result "PASS: baseurl with $DOMAIN found" "Repository URL"
             fi
             
             if grep -q "mirrorlist.*$DOMAIN" "$repo_file"; then
                 echo -e "   ${GREEN}✓ Found mirrorlist with $DOMAIN${NC}"
-                log_result "PASS: mirrorlist with $DOMAIN found"
+                log_result "PASS: mirrorlist with $DOMAIN found" "Repository URL"
             fi
             
             if grep -q "enabled.*1" "$repo_file"; then
@@ -166,7 +185,7 @@ check_creation_method() {
     if [[ -f /root/.bash_history ]]; then
         if grep -q "dnf.*config-manager.*$DOMAIN\|dnf.*config-manager.*example" /root/.bash_history 2>/dev/null; then
             echo -e "   ${GREEN}✓ PASS: DNF config-manager command found in root's history${NC}"
-            log_result "PASS: DNF command found in root history"
+            log_result "PASS: DNF command found in root history" "DNF Command Usage"
             dnf_evidence=true
             
             # Show the actual commands used
@@ -185,7 +204,7 @@ check_creation_method() {
             # Check recent entries for config-manager or example.com
             if grep "$DOMAIN\|config-manager" "$log_file" >/dev/null 2>&1; then
                 echo -e "   ${GREEN}✓ DNF activity found in $log_file${NC}"
-                log_result "PASS: DNF activity found in $log_file"
+                log_result "PASS: DNF activity found in $log_file" "DNF Command Usage"
                 dnf_evidence=true
                 
                 # Show recent relevant entries
@@ -201,7 +220,7 @@ check_creation_method() {
     if command -v dnf >/dev/null 2>&1; then
         if dnf repolist 2>/dev/null | grep -q "$DOMAIN"; then
             echo -e "   ${GREEN}✓ $DOMAIN repository is active in DNF${NC}"
-            log_result "PASS: $DOMAIN repo active in DNF"
+            log_result "PASS: $DOMAIN repo active in DNF" "Repository Active"
             dnf_evidence=true
         fi
     fi
@@ -217,7 +236,7 @@ check_creation_method() {
         for cmd_pattern in "${manual_commands[@]}"; do
             if grep -q "$cmd_pattern" /root/.bash_history 2>/dev/null; then
                 echo -e "   ${GREEN}✓ Manual file creation commands found in history${NC}"
-                log_result "PASS: Manual creation commands found"
+                log_result "PASS: Manual creation commands found" "Manual Creation"
                 manual_evidence=true
                 
                 echo "   Manual creation commands found:"
@@ -274,16 +293,16 @@ check_creation_method() {
     echo -e "\n   ${BLUE}Creation method assessment:${NC}"
     if [[ "$dnf_evidence" == true ]] && [[ "$manual_evidence" == true ]]; then
         echo -e "   ${GREEN}✓ PASS: Evidence of both DNF and manual methods found${NC}"
-        log_result "PASS: Both DNF and manual creation evidence found"
+        log_result "PASS: Both DNF and manual creation evidence found" "Creation Method"
     elif [[ "$dnf_evidence" == true ]]; then
         echo -e "   ${GREEN}✓ PASS: DNF creation method detected${NC}"
-        log_result "PASS: DNF creation method confirmed"
+        log_result "PASS: DNF creation method confirmed" "Creation Method"
     elif [[ "$manual_evidence" == true ]]; then
         echo -e "   ${GREEN}✓ PASS: Manual creation method detected${NC}"
-        log_result "PASS: Manual creation method confirmed"
+        log_result "PASS: Manual creation method confirmed" "Creation Method"
     else
         echo -e "   ${YELLOW}⚠ INFO: Creation method unclear (repository exists but method unknown)${NC}"
-        log_result "INFO: Repository creation method unclear"
+        log_result "INFO: Repository creation method unclear" "Creation Method"
     fi
     
     return 0  # Don't fail based on creation method, just report
@@ -381,10 +400,10 @@ main() {
     
     if [[ $exit_code -eq 0 ]]; then
         echo -e "${GREEN}🎉 VERIFICATION PASSED! Repository for $DOMAIN found.${NC}"
-        log_result "YUM REPO VERIFICATION PASSED: $DOMAIN repository configured"
+        log_result "YUM REPO VERIFICATION PASSED: $DOMAIN repository configured" "Repository Lab Complete"
     else
         echo -e "${RED}❌ VERIFICATION FAILED! Repository for $DOMAIN not properly configured.${NC}"
-        log_result "YUM REPO VERIFICATION FAILED: $DOMAIN repository missing"
+        log_result "YUM REPO VERIFICATION FAILED: $DOMAIN repository missing" "Repository Lab Complete"
         echo ""
         echo -e "${YELLOW}To fix:${NC}"
         echo "1. DNF method: dnf config-manager --add-repo http://$DOMAIN/repo"
@@ -8,7 +8,14 @@ set -e  # Exit on any error
 USERNAME="sally"
 HOME_DIR="/home/$USERNAME"
 COLLECTION_DIR="/root/sally"
-LOGFILE="../../labresults.log"
+# LAB_RESULTS_LOG gives each checker its own log when they run in parallel
+LOGFILE="${LAB_RESULTS_LOG:-../../labresults.log}"
+
+# Results format: "text" (default) appends "$(date): STATUS: message" lines, "jsonl"
+# appends one JSON record per result with the lab and task named explicitly
+LAB_RESULTS_FORMAT="${LAB_RESULTS_FORMAT:-text}"
+LAB_STUDENT="${LAB_STUDENT:-}"
+LAB_NAME="User Management"
 
 # Colors for output
 RED='\033[0;31m'
@@ -21,9 +28,21 @@ echo -e "${BLUE}=== User File Collection Verification ===${NC}"
 echo "Checking file collection status for user: $USERNAME"
 echo ""
 
-# Function to log results
+# Escape a value for use inside a JSON string
+json_escape() {
+    local value="${1//\\/\\\\}"
+    printf '%s' "${value//\"/\\\"}"
+}
+
+# Function to log results: log_result "STATUS: message" "Task name"
 log_result() {
-    echo "$(date): $1" >> "$LOGFILE"
+    if [[ "$LAB_RESULTS_FORMAT" == "jsonl" ]]; then
+        printf '{"ts": %s, "tz": "%s", "student": "%s", "lab": "%s", "task": "%s", "status": "%s", "message": "%s"}\n' \
+            "$(date +%s)" "$(date +%z)" "$(json_escape "$LAB_STUDENT")" "$(json_escape "$LAB_NAME")" "$(json_escape "$2")" \
+            "$(json_escape "${1%%: *}")" "$(json_escape "${1#*: }")" >> "$LOGFILE"
+    else
+        echo "$(date): $1" >> "$LOGFILE"
+    fi
 }
 
 # Function to check if user exists
@@ -31,14 +50,14 @@ check_user_exists() {
     echo -e "${BLUE}1. Checking if user '$USERNAME' exists...${NC}"
     if id "$USERNAME" &>/dev/null; then
         echo -e "   ${GREEN}✓ PASS: User '$USERNAME' exists${NC}"
-        log_result "PASS: User $USERNAME exists"
+        log_result "PASS: User $USERNAME exists" "User Creation"
         
         # Show user details
         echo "   User details: $(id $USERNAME)"
         return 0
     else
         echo -e "   ${RED}✗ FAIL: User '$USERNAME' does not exist${NC}"
-        log_result "FAIL: User $USERNAME does not exist"
+        log_result "FAIL: User $USERNAME does not exist" "User Creation"
         return 1
     fi
 }
@@ -49,7 +68,7 @@ check_source_files() {
     
     if [[ ! -d "$HOME_DIR" ]]; then
         echo -e "   ${RED}✗ FAIL: Home directory $HOME_DIR does not exist${NC}"
-        log_result "FAIL: Home directory missing"
+        log_result "FAIL: Home directory missing" "Source Files"
         return 1
     fi
     
@@ -59,7 +78,7 @@ check_source_files() {
     
     if [[ $file_count -gt 0 ]]; then
         echo -e "   ${GREEN}✓ PASS: Found $file_count files owned by '$USERNAME' in home directory${NC}"
-        log_result "PASS: Found $file_count source files"
+        log_result "PASS: Found $file_count source files" "Source Files"
         
         # List the files
         echo "   Files found:"
@@ -72,7 +91,7 @@ check_source_files() {
         return 0
     else
         echo -e "   ${RED}✗ FAIL: No files owned by '$USERNAME' found in home directory${NC}"
-        log_result "FAIL: No source files found"
+        log_result "FAIL: No source files found" "Source Files"
         return 1
     fi
 }
@@ -83,7 +102,7 @@ check_collection_dir() {
     
     if [[ ! -d "$COLLECTION_DIR" ]]; then
         echo -e "   ${RED}✗ FAIL: Collection directory $COLLECTION_DIR does not exist${NC}"
-        log_result "FAIL: Collection directory missing"
+        log_result "FAIL: Collection directory missing" "File Collection"
         return 1
     fi
     
@@ -93,7 +112,7 @@ check_collection_dir() {
     
     if [[ $collected_count -gt 0 ]]; then
         echo -e "   ${GREEN}✓ PASS: Found $collected_count files in collection directory${NC}"
-        log_result "PASS: Found $collected_count collected files"
+        log_result "PASS: Found $collected_count collected files" "File Collection"
         
         # List collected files
         echo "   Collected files:"
@@ -104,7 +123,7 @@ check_collection_dir() {
         return 0
     else
         echo -e "   ${RED}✗ FAIL: No files found in collection directory${NC}"
-        log_result "FAIL: No files collected"
+        log_result "FAIL: No files collected" "File Collection"
         return 1
     fi
 }
@@ -126,17 +145,17 @@ verify_find_command() {
         if [[ $collected_count -ge $source_count ]]; then
             echo -e "   ${GREEN}✓ PASS: Find command appears to have been executed successfully${NC}"
             echo -e "   ${GREEN}✓ All or more files were collected than expected${NC}"
-            log_result "PASS: Find command executed successfully"
+            log_result "PASS: Find command executed successfully" "Find Command"
             return 0
         else
             echo -e "   ${YELLOW}⚠ PARTIAL: Some files collected but count is lower than expected${NC}"
             echo -e "   ${YELLOW}  This might be normal due to directory structures${NC}"
-            log_result "PARTIAL: Partial collection detected"
+            log_result "PARTIAL: Partial collection detected" "Find Command"
             return 0
         fi
     else
         echo -e "   ${RED}✗ FAIL: Find command does not appear to have been executed${NC}"
-        log_result "FAIL: Find command not executed"
+        log_result "FAIL: Find command not executed" "Find Command"
         return 1
     fi
 }
@@ -160,7 +179,7 @@ check_command_history() {
     if [[ -f /root/.bash_history ]]; then
         if grep -q "find.*-user.*$USERNAME.*exec.*cp" /root/.bash_history 2>/dev/null; then
             echo -e "   ${GREEN}✓ PASS: Find command found in root's command history${NC}"
-            log_result "PASS: Command found in history"
+            log_result "PASS: Command found in history" "Command History"
             
             # Show the actual command used
             echo "   Command(s) found:"
@@ -193,10 +212,10 @@ main() {
     
     if [[ $exit_code -eq 0 ]]; then
         echo -e "${GREEN}🎉 VERIFICATION PASSED! All checks completed successfully.${NC}"
-        log_result "VERIFICATION PASSED: All checks successful"
+        log_result "VERIFICATION PASSED: All checks successful" "User Lab Complete"
     else
         echo -e "${RED}❌ VERIFICATION FAILED! Some checks did not pass.${NC}"
-        log_result "VERIFICATION FAILED: Some checks failed"
+        log_result "VERIFICATION FAILED: Some checks failed" "User Lab Complete"
         echo ""
         echo -e "${YELLOW}To fix issues:${NC}"
         echo "1. Ensure user 'sally' exists: sudo useradd -m sally"
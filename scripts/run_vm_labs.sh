@@ -13,6 +13,8 @@ CHECKLABS_DIR="$SCRIPT_DIR/scripts/checklabs"
 COMPLETED_DIR="$SCRIPT_DIR/completedLabs"
 LOG_FILE="$SCRIPT_DIR/labresults.log"
 GRADER_SCRIPT="$SCRIPT_DIR/grade_labs.py"
+BUNDLE_RUNNER="$SCRIPT_DIR/scripts/bundle_runner.sh"
+REMOTE_SEGMENT_DIR="/tmp/labresults.d"  # Per-checker logs with --parallel-checks
 
 # Colors for output
 RED='\033[0;31m'
@@ -34,6 +36,9 @@ RUN_CREATE=true
 RUN_CHECK=true
 RUN_GRADE=true
 VERBOSE=false
+BUNDLE=false
+RESULTS_FORMAT="text"
+PARALLEL_CHECKS=false
 
 # Usage function
 usage() {
@@ -57,6 +62,9 @@ Optional Arguments:
     --skip-create       Skip lab creation phase
     --skip-check        Skip lab checking phase
     --skip-grade        Skip grading phase
+    --bundle            Run all scripts and fetch the log over a single SSH session
+    --jsonl             Have the checker scripts log structured JSONL records
+    --parallel-checks   Run the checker scripts at the same time, each with its own log
     --verbose           Enable verbose output
     --help             Show this help message
 
@@ -118,6 +126,18 @@ parse_args() {
                 RUN_GRADE=false
                 shift
                 ;;
+            --bundle)
+                BUNDLE=true
+                shift
+                ;;
+            --jsonl)
+                RESULTS_FORMAT="jsonl"
+                shift
+                ;;
+            --parallel-checks)
+                PARALLEL_CHECKS=true
+                shift
+                ;;
             --verbose)
                 VERBOSE=true
                 shift
@@ -209,7 +229,11 @@ run_remote_script() {
     }
     
     # Make script executable and run
-    local remote_cmd="chmod +x /tmp/$script_name && cd /tmp && timeout $TIMEOUT sudo /tmp/$script_name"
+    local script_env=""
+    if [[ "$RESULTS_FORMAT" == jsonl ]]; then
+        script_env="env LAB_RESULTS_FORMAT=jsonl LAB_STUDENT=$(printf %q "$STUDENT_NAME") "
+    fi
+    local remote_cmd="chmod +x /tmp/$script_name && cd /tmp && timeout $TIMEOUT sudo ${script_env}/tmp/$script_name"
     
     if [[ "$VERBOSE" == true ]]; then
         eval "$SSH_CMD '$remote_cmd'" || {
@@ -231,6 +255,11 @@ run_remote_script() {
 download_logs() {
     echo -e "${BLUE}Downloading lab results...${NC}"
     
+    if [[ "$PARALLEL_CHECKS" == true ]]; then
+        download_log_segments
+        return
+    fi
+    
     # Try to download the log file from various possible locations
     local log_locations=("/tmp/labresults.log" "../../labresults.log" "/root/labresults.log" "/var/log/labresults.log")
     local downloaded=false
@@ -243,12 +272,7 @@ download_logs() {
             local temp_log="/tmp/vm_labresults_$(date +%s).log"
             
             if eval "$SCP_CMD '$VM_USER@$VM_IP:$remote_log' '$temp_log'"; then
-                # Append to main log file with student identifier
-                echo "# VM Lab Results for $STUDENT_NAME - $(date)" >> "$LOG_FILE"
-                echo "# VM: $VM_IP ($OS_INFO)" >> "$LOG_FILE"
-                cat "$temp_log" >> "$LOG_FILE"
-                echo "" >> "$LOG_FILE"
-                
+                append_results "$temp_log"
                 rm -f "$temp_log"
                 downloaded=true
                 echo -e "${GREEN}✓ Lab results downloaded${NC}"
@@ -293,6 +317,76 @@ run_create_phase() {
     return 0
 }
 
+# Append a downloaded results log to the main log file with student identifier
+append_results() {
+    local temp_log="$1"
+    
+    echo "# VM Lab Results for $STUDENT_NAME - $(date)" >> "$LOG_FILE"
+    echo "# VM: $VM_IP ($OS_INFO)" >> "$LOG_FILE"
+    cat "$temp_log" >> "$LOG_FILE"
+    echo "" >> "$LOG_FILE"
+}
+
+# Merge the downloaded per-checker segments by timestamp into one results log
+merge_segments() {
+    local segment_dir="$1"
+    local temp_log="$2"
+    
+    python3 "$GRADER_SCRIPT" --log-file "$segment_dir" --merge-segments --write-merged "$temp_log"
+}
+
+# Download the per-checker logs written with --parallel-checks and merge them
+download_log_segments() {
+    local segment_dir=$(mktemp -d /tmp/vm_labresults_XXXXXX)
+    local temp_log="$segment_dir.log"
+    
+    if eval "$SCP_CMD '$VM_USER@$VM_IP:$REMOTE_SEGMENT_DIR/*.log' '$segment_dir/'" 2>/dev/null &&
+            merge_segments "$segment_dir" "$temp_log"; then
+        append_results "$temp_log"
+        echo -e "${GREEN}✓ Lab results downloaded ($(ls "$segment_dir" | wc -l) checker logs merged)${NC}"
+    else
+        echo -e "${YELLOW}⚠ No lab results logs found on VM${NC}"
+    fi
+    rm -rf "$segment_dir" "$temp_log"
+}
+
+# Copy every checker, then start them all in one SSH session; each one logs to
+# its own file in $REMOTE_SEGMENT_DIR so their results do not interleave
+run_checks_parallel() {
+    local script_count=0
+    local success_count=0
+    local script_env=""
+    if [[ "$RESULTS_FORMAT" == jsonl ]]; then
+        script_env="LAB_RESULTS_FORMAT=jsonl LAB_STUDENT=$(printf %q "$STUDENT_NAME") "
+    fi
+    # Start from an empty directory, or the previous run's segments would be downloaded again
+    local remote_cmd="rm -rf $REMOTE_SEGMENT_DIR && mkdir -p $REMOTE_SEGMENT_DIR && cd /tmp"
+    
+    for script in "$CHECKLABS_DIR"/*.sh; do
+        if [[ -f "$script" ]]; then
+            local script_name=$(basename "$script")
+            ((script_count++))
+            eval "$SCP_CMD '$script' '$VM_USER@$VM_IP:/tmp/$script_name'" || {
+                echo -e "${RED}✗ Failed to copy $script_name to VM${NC}"
+                continue
+            }
+            remote_cmd="$remote_cmd && { (chmod +x /tmp/$script_name && timeout $TIMEOUT sudo env ${script_env}LAB_RESULTS_LOG=$REMOTE_SEGMENT_DIR/$script_name.log /tmp/$script_name >/dev/null 2>&1; echo \"$script_name \$?\") & }"
+        fi
+    done
+    
+    echo -e "${YELLOW}Running $script_count checkers in parallel...${NC}"
+    while read -r script_name status; do
+        if [[ "$status" == 0 ]]; then
+            ((success_count++))
+            echo -e "${GREEN}✓ $script_name completed${NC}"
+        else
+            echo -e "${RED}✗ Failed to execute $script_name${NC}"
+        fi
+    done < <(eval "$SSH_CMD '$remote_cmd; wait'" 2>/dev/null)
+    
+    echo -e "\n${CYAN}Check Phase Summary: $success_count/$script_count scripts succeeded${NC}"
+}
+
 # Run lab checking scripts
 run_check_phase() {
     echo -e "\n${BLUE}=== LAB CHECKING PHASE ===${NC}"
@@ -302,6 +396,12 @@ run_check_phase() {
         return 1
     fi
     
+    if [[ "$PARALLEL_CHECKS" == true ]]; then
+        run_checks_parallel
+        download_logs
+        return 0
+    fi
+    
     local script_count=0
     local success_count=0
     
@@ -320,6 +420,104 @@ run_check_phase() {
     return 0
 }
 
+# Stream createlabs/, checklabs/ and bundle_runner.sh to the VM as one archive and run
+# both phases there; the runner's @@LAB records come back over the same SSH session
+run_bundle_phase() {
+    echo -e "\n${BLUE}=== BUNDLE PHASE (single SSH session) ===${NC}"
+    
+    if [[ ! -f "$BUNDLE_RUNNER" ]]; then
+        echo -e "${RED}Error: Bundle runner not found: $BUNDLE_RUNNER${NC}"
+        return 1
+    fi
+    
+    local runner_args="--timeout $TIMEOUT"
+    [[ "$RUN_CREATE" == true ]] || runner_args="$runner_args --skip-create"
+    [[ "$RUN_CHECK" == true ]] || runner_args="$runner_args --skip-check"
+    [[ "$RESULTS_FORMAT" == jsonl ]] && runner_args="$runner_args --jsonl --student $(printf %q "$STUDENT_NAME")"
+    [[ "$PARALLEL_CHECKS" == true ]] && runner_args="$runner_args --parallel-checks"
+    local remote_cmd="bundle=\$(mktemp -d) && tar xzf - -C \"\$bundle\" && bash \"\$bundle/bundle_runner.sh\" $runner_args"
+    local stderr_target=/dev/null
+    [[ "$VERBOSE" == true ]] && stderr_target=/dev/stderr
+    
+    # Each log record is saved as a segment; --parallel-checks sends one per checker
+    local segment_dir=$(mktemp -d /tmp/vm_labresults_XXXXXX)
+    local segment_count=0
+    local segment_file=""
+    local temp_log="$segment_dir.log"
+    local in_log=false
+    local finished=false
+    local create_count=0 create_success=0 check_count=0 check_success=0
+    OS_INFO="Unknown OS"
+    
+    while IFS= read -r line; do
+        if [[ "$in_log" == true ]]; then
+            if [[ "$line" == "@@LAB end" ]]; then
+                in_log=false
+            else
+                echo "$line" >> "$segment_file"
+            fi
+            continue
+        fi
+        
+        case "$line" in
+            "@@LAB os "*)
+                OS_INFO="${line#@@LAB os }"
+                echo -e "${CYAN}VM OS: $OS_INFO${NC}"
+                ;;
+            "@@LAB script "*)
+                read -r _ _ phase script_name status <<< "$line"
+                if [[ "$phase" == create ]]; then
+                    ((create_count++))
+                    [[ "$status" == 0 ]] && ((create_success++))
+                else
+                    ((check_count++))
+                    [[ "$status" == 0 ]] && ((check_success++))
+                fi
+                if [[ "$status" == 0 ]]; then
+                    echo -e "${GREEN}✓ $script_name completed${NC}"
+                else
+                    echo -e "${RED}✗ Failed to execute $script_name${NC}"
+                fi
+                ;;
+            "@@LAB log "*)
+                echo -e "${CYAN}Found log at: ${line#@@LAB log }${NC}"
+                segment_count=$((segment_count + 1))
+                segment_file="$segment_dir/segment_$segment_count.log"
+                : > "$segment_file"
+                in_log=true
+                ;;
+            "@@LAB done")
+                finished=true
+                ;;
+        esac
+    done < <(tar czf - -C "$(dirname "$BUNDLE_RUNNER")" createlabs checklabs "$(basename "$BUNDLE_RUNNER")" |
+             eval "$SSH_CMD '$remote_cmd'" 2>"$stderr_target")
+    
+    [[ "$RUN_CREATE" == true ]] && echo -e "\n${CYAN}Create Phase Summary: $create_success/$create_count scripts succeeded${NC}"
+    [[ "$RUN_CHECK" == true ]] && echo -e "${CYAN}Check Phase Summary: $check_success/$check_count scripts succeeded${NC}"
+    
+    if [[ $segment_count -gt 1 ]]; then
+        merge_segments "$segment_dir" "$temp_log"
+    elif [[ $segment_count -eq 1 ]]; then
+        mv "$segment_file" "$temp_log"
+    fi
+    rm -rf "$segment_dir"
+    
+    if [[ -f "$temp_log" ]]; then
+        append_results "$temp_log"
+        rm -f "$temp_log"
+        echo -e "${GREEN}✓ Lab results downloaded${NC}"
+    elif [[ "$RUN_CHECK" == true ]]; then
+        echo -e "${YELLOW}⚠ No lab results log found on VM${NC}"
+    fi
+    
+    if [[ "$finished" != true ]]; then
+        echo -e "${RED}✗ Bundle session ended early${NC}"
+        return 1
+    fi
+    return 0
+}
+
 # Run grading and generate reports
 run_grade_phase() {
     echo -e "\n${BLUE}=== GRADING PHASE ===${NC}"
@@ -336,19 +534,19 @@ run_grade_phase() {
     local timestamp=$(date +"%Y%m%d_%H%M%S")
     local report_prefix="${STUDENT_NAME}_${timestamp}"
     
-    # Generate reports
+    # Generate reports (--incremental only parses log lines appended since the last run,
+    # and an unchanged log is answered from the report cache without parsing at all)
     echo -e "${YELLOW}Generating grade reports...${NC}"
     
-    # Text report
-    python3 "$GRADER_SCRIPT" --output-file "$COMPLETED_DIR/${report_prefix}_report.txt"
+    # Text, JSON and HTML reports from a single parse of the log
+    if ! python3 "$GRADER_SCRIPT" --incremental --output-format text,json,html \
+            --report-cache "$COMPLETED_DIR/.report_cache" \
+            --output-dir "$COMPLETED_DIR" --report-prefix "$report_prefix" >/dev/null; then
+        echo -e "${RED}✗ Failed to generate grade reports${NC}"
+        return 1
+    fi
     echo -e "${GREEN}✓ Text report: ${report_prefix}_report.txt${NC}"
-    
-    # JSON report
-    python3 "$GRADER_SCRIPT" --output-format json --output-file "$COMPLETED_DIR/${report_prefix}_grades.json"
     echo -e "${GREEN}✓ JSON report: ${report_prefix}_grades.json${NC}"
-    
-    # HTML report
-    python3 "$GRADER_SCRIPT" --output-format html --output-file "$COMPLETED_DIR/${report_prefix}_report.html"
     echo -e "${GREEN}✓ HTML report: ${report_prefix}_report.html${NC}"
     
     # Create summary file
@@ -384,26 +582,36 @@ main() {
     
     # Setup and test connection
     setup_ssh
-    test_connectivity
     
     local overall_success=true
     
-    # Run creation phase
-    if [[ "$RUN_CREATE" == true ]]; then
-        if ! run_create_phase; then
-            overall_success=false
+    if [[ "$BUNDLE" == true ]]; then
+        # One SSH session covers connectivity, both phases and the log download
+        if [[ "$RUN_CREATE" == true || "$RUN_CHECK" == true ]]; then
+            if ! run_bundle_phase; then
+                overall_success=false
+            fi
         fi
     else
-        echo -e "${YELLOW}Skipping lab creation phase${NC}"
-    fi
-    
-    # Run checking phase
-    if [[ "$RUN_CHECK" == true ]]; then
-        if ! run_check_phase; then
-            overall_success=false
+        test_connectivity
+        
+        # Run creation phase
+        if [[ "$RUN_CREATE" == true ]]; then
+            if ! run_create_phase; then
+                overall_success=false
+            fi
+        else
+            echo -e "${YELLOW}Skipping lab creation phase${NC}"
+        fi
+        
+        # Run checking phase
+        if [[ "$RUN_CHECK" == true ]]; then
+            if ! run_check_phase; then
+                overall_success=false
+            fi
+        else
+            echo -e "${YELLOW}Skipping lab checking phase${NC}"
         fi
-    else
-        echo -e "${YELLOW}Skipping lab checking phase${NC}"
     fi
     
     # Run grading phase
@@ -235,6 +235,19 @@ run_batch() {
     echo -e "${CYAN}Results: $success_count/$total_count jobs succeeded${NC}"
 }
 
+# Concurrent batch processing with the Python fleet orchestrator
+run_fleet() {
+    local batch_file="$1"
+    if [[ -z "$batch_file" ]]; then
+        echo -e "${RED}Error: Batch file required${NC}"
+        echo "Usage: $0 fleet <batch_file> [options]"
+        exit 1
+    fi
+    shift
+    
+    python3 "$SCRIPT_DIR/../lab_fleet.py" "$batch_file" --config-dir "$CONFIG_DIR" "$@"
+}
+
 # Usage function
 usage() {
     cat << EOF
@@ -247,6 +260,7 @@ Commands:
     list                    List all available configurations  
     run <name> [options]    Run labs using a saved configuration
     batch <file>            Run multiple configurations from a file
+    fleet <file> [options]  Run a batch file on all VMs concurrently (lab_fleet.py)
     help                    Show this help message
 
 Examples:
@@ -264,6 +278,9 @@ Examples:
     
     # Batch process multiple VMs
     $0 batch student_vms.txt
+    
+    # Same batch file, 20 VMs at a time, graded per student
+    $0 fleet student_vms.txt --concurrency 20
 
 Batch File Format:
     run student1-vm --student-name "John Doe"  
@@ -287,6 +304,9 @@ case "$1" in
     batch)
         run_batch "$2"
         ;;
+    fleet)
+        run_fleet "${@:2}"
+        ;;
     help|--help|-h)
         usage
         ;;
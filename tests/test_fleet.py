@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Fleet tests - lab_fleet.py driving stand-in VMs through the ssh/scp wrappers of benchmarks/fake_ssh.py
+Usage: python3 -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from lab_fleet import FleetOrchestrator, VMTarget, CHECKLABS_DIR
+from lab_progress import ProgressTable
+from fake_ssh import install
+
+class FleetTest(unittest.TestCase):
+    """Each test gets its own fake hosts and output directory; fake_ssh reads its settings from the environment"""
+    
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            install(self.root / 'bin')
+        self.environ({'FAKE_VM_ROOT': str(self.root / 'vms'), 'FAKE_VM_LATENCY': '0',
+                      'PATH': f"{self.root / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"})
+                      
+    def environ(self, settings):
+        patcher = mock.patch.dict(os.environ, settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+    def targets(self, count):
+        return [VMTarget(f"vm{n}", vm_ip=f"10.0.0.{n}", ssh_key='key', student_name=f"student{n}")
+                for n in range(1, count + 1)]
+                
+    def run_fleet(self, targets, output='out', **options):
+        """(orchestrator, failed count, progress log) for one run over targets"""
+        stream = io.StringIO()
+        orchestrator = FleetOrchestrator(targets, self.root / output, backoff=0,
+                                         progress=ProgressTable(targets, stream=stream), **options)
+        failed = orchestrator.run()
+        return orchestrator, failed, stream.getvalue()
+        
+    def vm_file(self, host, path):
+        return self.root / 'vms' / host / path.lstrip('/')
+        
+    def test_refused_connection_is_retried_then_succeeds(self):
+        self.environ({'FAKE_VM_REFUSE': '1'})
+        targets = self.targets(2)
+        
+        orchestrator, failed, log = self.run_fleet(targets, retries=2)
+        
+        self.assertEqual(failed, 0)
+        self.assertEqual([orchestrator.results[id(target)] for target in targets], ['done', 'done'])
+        self.assertEqual(log.count(': retrying - '), 2)
+        self.assertEqual(sorted(orchestrator.cohort.graders), ['student1', 'student2'])
+        
+    def test_retries_are_exhausted(self):
+        self.environ({'FAKE_VM_UNREACHABLE': '10.0.0.1'})
+        targets = self.targets(1)
+        
+        orchestrator, failed, log = self.run_fleet(targets, retries=2)
+        
+        self.assertEqual(failed, 1)
+        self.assertIn('Connection refused', orchestrator.results[id(targets[0])])
+        self.assertEqual(log.count(': retrying - '), 2)
+        self.assertIn(': failed - ', log)
+        self.assertEqual(orchestrator.cohort.graders, {})
+        
+    def test_failing_vm_does_not_stop_the_others(self):
+        self.environ({'FAKE_VM_UNREACHABLE': '10.0.0.2'})
+        targets = self.targets(3)
+        
+        orchestrator, failed, _ = self.run_fleet(targets, retries=1, concurrency=2)
+        
+        self.assertEqual(failed, 1)
+        self.assertEqual([orchestrator.results[id(target)] == 'done' for target in targets], [True, False, True])
+        self.assertEqual(sorted(orchestrator.cohort.graders), ['student1', 'student3'])
+        
+    def test_retry_resumes_after_the_completed_phases(self):
+        # A clean run on one host counts the connections a VM needs; the last one downloads the log
+        self.run_fleet(self.targets(1), output='clean')
+        connections = int(self.vm_file('10.0.0.1', '/var/lib/fake_vm/connections').read_text())
+        self.environ({'FAKE_VM_REFUSE': str(connections)})
+        target = VMTarget('vm2', vm_ip='10.0.0.2', ssh_key='key', student_name='student2')
+        
+        with mock.patch.object(FleetOrchestrator, '_run_scripts', autospec=True,
+                               side_effect=FleetOrchestrator._run_scripts) as run_scripts:
+            orchestrator, failed, log = self.run_fleet([target], retries=1)
+            
+        self.assertEqual(failed, 0)
+        self.assertEqual(log.count(': retrying - '), 1)
+        self.assertEqual([call.args[2] for call in run_scripts.call_args_list], ['create', 'check'])
+        runs = {runs_file.stem: runs_file.read_text() for runs_file in
+                self.vm_file('10.0.0.2', '/var/lib/fake_vm').glob('*.runs')}
+        self.assertEqual(runs, {script.name: '1' for script in CHECKLABS_DIR.glob('*.sh') if script.name in runs})
+        self.assertTrue(runs)
+        self.assertIn('student2', orchestrator.cohort.graders)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Incremental grading tests - grade_labs.py --incremental resuming from its checkpoint
+Usage: python3 -m unittest discover tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from grade_labs import LabGrader
+
+class IncrementalTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.log_file = Path(temp_dir.name) / 'labresults.log'
+        
+    def grade(self):
+        grader = LabGrader(self.log_file)
+        grader.parse_log_incremental()
+        return grader
+        
+    def test_last_line_without_newline_is_graded_once(self):
+        self.log_file.write_text("Mon Jul 21 14:30:01 UTC 2025: FAIL: User eric does not exist\n"
+                                 "Mon Jul 21 14:30:02 UTC 2025: PASS: User eric exists")
+                                 
+        first = self.grade()
+        self.assertEqual([result['status'] for result in first.results], ['FAIL', 'PASS'])
+        
+        with open(self.log_file, 'a') as f:
+            f.write("\nMon Jul 21 14:30:03 UTC 2025: PASS: User sally exists\n")
+        second = self.grade()
+        
+        self.assertEqual([result['message'] for result in second.results],
+                         ['User eric exists', 'User sally exists'])
+        self.assertEqual(second.line_number, 3)
+        self.assertEqual(sum(stats['attempts'] for stats in second.get_task_stats().values()), 3)
+
+if __name__ == "__main__":
+    unittest.main()
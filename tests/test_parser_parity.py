@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Parser parity tests - the fast parser must grade a log exactly as the legacy regex/strptime parser
+Usage: python3 -m unittest discover tests
+"""
+
+import sys
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+import grade_labs
+from grade_labs import LabGrader
+from generate_log import LogGenerator
+
+# Lines the generator never writes: every status keyword, padded days, other zones and
+# timestamp formats, extra colons, unparseable timestamps, and blank or garbage lines
+EDGE_CASE_LINES = [
+    "# VM Lab Results for john_doe - Mon Jul 21 14:30:00 UTC 2025",
+    "Mon Jul 21 14:30:01 UTC 2025: PASS: User eric exists",
+    "Mon Jul 21 14:30:02 UTC 2025: FAIL: Home directory for eric is not on the NFS share",
+    "Mon Jul 21 14:30:03 UTC 2025: PARTIAL: Some NFS exports found",
+    "Mon Jul 21 14:30:04 UTC 2025: INFO: Checking usershare mount",
+    "Mon Jul 21 14:30:05 UTC 2025: VERIFICATION PASSED: User configuration complete",
+    "Mon Jul 21 14:30:06 UTC 2025: VERIFICATION FAILED: User configuration incomplete",
+    "Mon Jul 21 14:30:07 UTC 2025: NFS VERIFICATION PASSED: All NFS checks passed",
+    "Mon Jul 21 14:30:08 UTC 2025: NFS VERIFICATION FAILED: NFS checks failed",
+    "Mon Jul 21 14:30:09 UTC 2025: YUM REPO VERIFICATION PASSED: Repository configured",
+    "Mon Jul 21 14:30:10 UTC 2025: YUM REPO VERIFICATION FAILED: Repository missing",
+    "Mon Jul  7 09:05:03 UTC 2025: PASS: NFS mount active at /home/shares",
+    "Mon Jul  7 09:05:04 GMT 2025: FAIL: fstab entry missing for usershare",
+    "Tue Jul 22 08:00:00 EDT 2025: PASS: Repository file exists",
+    "Tue Jul 22 08:00:01 CEST 2025: FAIL: Repository baseurl unreachable",
+    "2025-07-22 08:00:02: PASS: GPG check disabled",
+    "Tue Jul 22 08:00:03 UTC 2025: FAIL: baseurl=http://repo.lab:8080/el9: connection refused",
+    "Tue Jul 22 08:00:04 UTC 2025:   PASS:   User eric: uid=1001: groups=wheel",
+    "Tue Jul 22 08:00:05 UTC 2025: INFO: Status: PASS: nested status in message",
+    "yesterday: PASS: User eric exists",
+    "Tue Foo 99 25:61:61 UTC 2025: FAIL: NFS mount missing",
+    "Tue Jul 22 08:00:06 2025: PASS: Repository enabled",
+    "",
+    "   ",
+    "random text without a status",
+    "PASS: no timestamp",
+    "Tue Jul 22 08:00:07 UTC 2025: UNKNOWN: not a status keyword",
+    ":: PASS: empty timestamp",
+    "Tue Jul 22 08:00:08 UTC 2025:PASS:no spaces",
+    "{not json",
+]
+
+# Fallback timestamp for lines whose timestamp does not parse, the same in both runs
+FIXED_NOW = datetime(2025, 7, 23, 12, 0, 0)
+
+# (task name, status, timestamp) the pre-fast-parser grader recorded for each edge case line; FIXED_NOW
+# marks the current-time fallback
+BASELINE_GRADES = {
+    "# VM Lab Results for john_doe - Mon Jul 21 14:30:00 UTC 2025": None,
+    "Mon Jul 21 14:30:01 UTC 2025: PASS: User eric exists":
+        ('User Creation', 'PASS', datetime(2025, 7, 21, 14, 30, 1)),
+    "Mon Jul 21 14:30:02 UTC 2025: FAIL: Home directory for eric is not on the NFS share":
+        ('Home Directory For', 'FAIL', datetime(2025, 7, 21, 14, 30, 2)),
+    "Mon Jul 21 14:30:03 UTC 2025: PARTIAL: Some NFS exports found":
+        ('Some Nfs Exports', 'PARTIAL', datetime(2025, 7, 21, 14, 30, 3)),
+    "Mon Jul 21 14:30:04 UTC 2025: INFO: Checking usershare mount":
+        ('Checking Usershare Mount', 'INFO', datetime(2025, 7, 21, 14, 30, 4)),
+    "Mon Jul 21 14:30:05 UTC 2025: VERIFICATION PASSED: User configuration complete":
+        ('User Configuration Complete', 'PASS', datetime(2025, 7, 21, 14, 30, 5)),
+    "Mon Jul 21 14:30:06 UTC 2025: VERIFICATION FAILED: User configuration incomplete":
+        ('User Configuration Incomplete', 'FAIL', datetime(2025, 7, 21, 14, 30, 6)),
+    "Mon Jul 21 14:30:07 UTC 2025: NFS VERIFICATION PASSED: All NFS checks passed":
+        ('All Nfs Checks', 'PASS', datetime(2025, 7, 21, 14, 30, 7)),
+    "Mon Jul 21 14:30:08 UTC 2025: NFS VERIFICATION FAILED: NFS checks failed":
+        ('Nfs Checks Failed', 'FAIL', datetime(2025, 7, 21, 14, 30, 8)),
+    "Mon Jul 21 14:30:09 UTC 2025: YUM REPO VERIFICATION PASSED: Repository configured":
+        ('Repository Configured', 'PASS', datetime(2025, 7, 21, 14, 30, 9)),
+    "Mon Jul 21 14:30:10 UTC 2025: YUM REPO VERIFICATION FAILED: Repository missing":
+        ('Repository Missing', 'FAIL', datetime(2025, 7, 21, 14, 30, 10)),
+    "Mon Jul  7 09:05:03 UTC 2025: PASS: NFS mount active at /home/shares":
+        ('NFS Mount', 'PASS', datetime(2025, 7, 7, 9, 5, 3)),
+    "Mon Jul  7 09:05:04 GMT 2025: FAIL: fstab entry missing for usershare":
+        ('FSTAB Configuration', 'FAIL', datetime(2025, 7, 7, 9, 5, 4)),
+    "Tue Jul 22 08:00:00 EDT 2025: PASS: Repository file exists": ('Repository File Exists', 'PASS', FIXED_NOW),
+    "Tue Jul 22 08:00:01 CEST 2025: FAIL: Repository baseurl unreachable":
+        ('Repository Baseurl Unreachable', 'FAIL', FIXED_NOW),
+    "2025-07-22 08:00:02: PASS: GPG check disabled":
+        ('Gpg Check Disabled', 'PASS', datetime(2025, 7, 22, 8, 0, 2)),
+    "Tue Jul 22 08:00:03 UTC 2025: FAIL: baseurl=http://repo.lab:8080/el9: connection refused":
+        ('Baseurl=Http://Repo.Lab:8080/El9: Connection Refused', 'FAIL', datetime(2025, 7, 22, 8, 0, 3)),
+    "Tue Jul 22 08:00:04 UTC 2025:   PASS:   User eric: uid=1001: groups=wheel":
+        ('User Eric: Uid=1001:', 'PASS', datetime(2025, 7, 22, 8, 0, 4)),
+    "Tue Jul 22 08:00:05 UTC 2025: INFO: Status: PASS: nested status in message":
+        ('Status: Pass: Nested', 'INFO', datetime(2025, 7, 22, 8, 0, 5)),
+    "yesterday: PASS: User eric exists": ('User Creation', 'PASS', FIXED_NOW),
+    "Tue Foo 99 25:61:61 UTC 2025: FAIL: NFS mount missing": ('NFS Mount', 'FAIL', FIXED_NOW),
+    "Tue Jul 22 08:00:06 2025: PASS: Repository enabled": ('Repository Enabled', 'PASS', FIXED_NOW),
+    "": None,
+    "   ": None,
+    "random text without a status": None,
+    "PASS: no timestamp": None,
+    "Tue Jul 22 08:00:07 UTC 2025: UNKNOWN: not a status keyword": None,
+    ":: PASS: empty timestamp": ('Empty Timestamp', 'PASS', FIXED_NOW),
+    "Tue Jul 22 08:00:08 UTC 2025:PASS:no spaces": None,
+    "{not json": None,
+}
+
+class _FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_NOW
+
+class ParserParityTest(unittest.TestCase):
+    """Parse the same log with fast_parser=True and False and compare everything they record"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.log_file = Path(cls.temp_dir.name) / 'labresults.log'
+        with open(cls.log_file, 'w') as f:
+            LogGenerator(students=20, start=datetime(2025, 7, 21, 9, 0), seed=7).write(f, 3000)
+            for line in EDGE_CASE_LINES:
+                f.write(line + "\n")
+                
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+        
+    def parse(self, fast_parser, log_file=None):
+        grade_labs._decode_timestamp_cached.cache_clear()
+        grader = LabGrader(log_file or self.log_file, fast_parser=fast_parser)
+        with mock.patch('grade_labs.datetime', _FixedDatetime):
+            grader.parse_log_file()
+        return grader
+        
+    def assert_same_grades(self, fast, legacy):
+        self.assertEqual(fast.results, legacy.results)
+        self.assertEqual(dict(fast.task_attempts), dict(legacy.task_attempts))
+        self.assertEqual(fast.final_status, legacy.final_status)
+        self.assertEqual(dict(fast.lab_sessions), dict(legacy.lab_sessions))
+        self.assertEqual((fast.blank_lines, fast.unmatched_lines, fast.timestamp_fallbacks),
+                         (legacy.blank_lines, legacy.unmatched_lines, legacy.timestamp_fallbacks))
+                         
+    def test_generated_log_with_edge_cases(self):
+        fast, legacy = self.parse(True), self.parse(False)
+        
+        self.assert_same_grades(fast, legacy)
+        self.assertGreater(fast.total_entries, 1000)
+        self.assertGreater(fast.timestamp_fallbacks, 0)  # The strptime fallback path was exercised
+        
+    def test_each_edge_case_line(self):
+        for line in EDGE_CASE_LINES:
+            with self.subTest(line=line):
+                log_file = Path(self.temp_dir.name) / 'edge.log'
+                log_file.write_text(line + "\n")
+                self.assert_same_grades(self.parse(True, log_file), self.parse(False, log_file))
+                
+    def test_edge_cases_match_the_baseline_grades(self):
+        self.assertEqual(list(BASELINE_GRADES), EDGE_CASE_LINES)
+        log_file = Path(self.temp_dir.name) / 'edge.log'
+        for line, expected in BASELINE_GRADES.items():
+            log_file.write_text(line + "\n")
+            for fast_parser in (True, False):
+                with self.subTest(line=line, fast_parser=fast_parser):
+                    grader = self.parse(fast_parser, log_file)
+                    grades = [(task_name, attempt['status'], attempt['timestamp'])
+                              for task_name, attempts in grader.task_attempts.items() for attempt in attempts]
+                    self.assertEqual(grades, [] if expected is None else [expected])
+                    
+    def test_every_status_keyword_is_recorded(self):
+        statuses = {result['status'] for result in self.parse(True).results}
+        self.assertEqual(statuses, {'PASS', 'FAIL', 'PARTIAL', 'INFO'})
+
+class StructuredRecordTest(unittest.TestCase):
+    """JSONL records with fields of the wrong type are counted as unmatched, not graded"""
+    
+    RECORD = {"ts": 1753088701, "tz": "+0000", "lab": "User Management", "task": "User Creation",
+              "status": "PASS", "message": "User sally exists"}
+              
+    def test_fields_that_are_not_strings(self):
+        records = [self.RECORD] + [dict(self.RECORD, **{field: value})
+                                   for field in ('lab', 'task', 'status', 'message')
+                                   for value in (None, 1, ["PASS"], {"text": "x"})]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = Path(temp_dir) / 'labresults.log'
+            log_file.write_text("".join(json.dumps(record) + "\n" for record in records))
+            for fast_parser in (True, False):
+                with self.subTest(fast_parser=fast_parser):
+                    grader = LabGrader(log_file, fast_parser=fast_parser)
+                    grader.parse_log_file()
+                    
+                    self.assertEqual([result['message'] for result in grader.results], ["User sally exists"])
+                    self.assertEqual((grader.structured_lines, grader.unmatched_lines), (1, len(records) - 1))
+                    
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Provisioning tests - lab_provision.py against the mock Proxmox API in benchmarks/mock_proxmox.py
+Usage: python3 -m unittest discover tests
+"""
+
+import io
+import sys
+import unittest
+import threading
+import http.client
+from pathlib import Path
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from lab_progress import ProgressTable
+from lab_provision import ProxmoxClient, ClassProvisioner, vm_names
+from mock_proxmox import make_server, DEFAULT_TEMPLATE_VMID
+
+NODE = 'pve'
+
+class _DroppingHandler(BaseHTTPRequestHandler):
+    """Answers GETs over keep-alive, but closes the connection on every POST without replying"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        body = b'{"data": null}'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.posts += 1
+        self.close_connection = True
+        
+    def log_message(self, format, *args):
+        pass
+
+class ProvisionTest(unittest.TestCase):
+    """Each test gets a fresh mock cluster with short tasks and a fast poll interval"""
+    
+    def setUp(self):
+        self.server = make_server(port=0, latency=0, node=NODE, clone_seconds=0.05, start_seconds=0.02)
+        self.cluster = self.server.cluster
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        patcher = mock.patch('lab_provision.TASK_POLL_INTERVAL', 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        
+    def client(self, pool_size=4):
+        client = ProxmoxClient(f"http://127.0.0.1:{self.server.server_port}", 'test@pve!token', 'secret',
+                               pool_size=pool_size)
+        self.addCleanup(client.close)
+        return client
+        
+    def provision(self, client, names, workers=4, **options):
+        """(provisioner, vms, failed) for one plan() and run() over names"""
+        provisioner = ClassProvisioner(client, NODE, DEFAULT_TEMPLATE_VMID, workers=workers, **options)
+        vms = provisioner.plan(names)
+        failed = provisioner.run(vms, progress=ProgressTable(vms, stream=io.StringIO()))
+        return provisioner, vms, failed
+        
+    def task_log(self):
+        """(task type, VMID) of every task the cluster has run, in order"""
+        return [(upid.split(':')[5], int(upid.split(':')[6])) for upid in self.cluster.tasks]
+        
+    def test_plan_skips_existing_names_and_used_vmids(self):
+        self.cluster.vms[100] = {'name': 'lab-02', 'template': 0, 'status': 'running'}
+        self.cluster.vms[101] = {'name': 'other-vm', 'template': 0, 'status': 'stopped'}
+        provisioner = ClassProvisioner(self.client(), NODE, DEFAULT_TEMPLATE_VMID)
+        
+        vms = provisioner.plan(vm_names('lab-', 3), start_vmid=100)
+        
+        self.assertEqual([(vm.name, vm.vmid, vm.exists, vm.running) for vm in vms],
+                         [('lab-01', 102, False, False), ('lab-02', 100, True, True),
+                          ('lab-03', 103, False, False)])
+                          
+    def test_rerun_after_partial_failure_only_starts_existing_vms(self):
+        # One worker runs the tasks in order: clone 01, start 01, clone 02 (fails), clone 03, start 03 (fails)
+        self.cluster.fail_rate = 0.5
+        with mock.patch('mock_proxmox.random.random', side_effect=[0.9, 0.9, 0.1, 0.9, 0.1]):
+            _, vms, failed = self.provision(self.client(), vm_names('lab-', 3), workers=1)
+        self.assertEqual(failed, 2)
+        self.assertEqual(sorted(vm['name'] for vm in self.cluster.vms.values() if not vm['template']),
+                         ['lab-01', 'lab-03'])
+                         
+        self.cluster.fail_rate = 0.0
+        first_run_tasks = len(self.cluster.tasks)
+        provisioner, vms, failed = self.provision(self.client(), vm_names('lab-', 3))
+        
+        vmids = {vm.name: vm.vmid for vm in vms}
+        self.assertEqual(failed, 0)
+        self.assertEqual(sorted(self.task_log()[first_run_tasks:]),
+                         sorted([('qmclone', vmids['lab-02']), ('qmstart', vmids['lab-02']),
+                                 ('qmstart', vmids['lab-03'])]))
+        self.assertTrue(all(self.cluster.vms[vmid]['status'] == 'running' for vmid in vmids.values()))
+        
+    def test_failed_clone_is_reported_without_stopping_the_pool(self):
+        self.cluster.fail_rate = 1.0
+        provisioner, vms, failed = self.provision(self.client(), vm_names('lab-', 6), workers=3)
+        
+        self.assertEqual(failed, 6)
+        self.assertEqual(sorted(provisioner.results), sorted(vm.vmid for vm in vms))
+        for result in provisioner.results.values():
+            self.assertIn('qmclone failed', result)
+        self.assertNotIn('qmstart', [task_type for task_type, _ in self.task_log()])
+        
+    def test_wait_for_task_times_out(self):
+        self.cluster.clone_seconds = 5
+        client = self.client()
+        upid = client.request('POST', f"/nodes/{NODE}/qemu/{DEFAULT_TEMPLATE_VMID}/clone",
+                              {'newid': 200, 'name': 'slow'})
+                              
+        with self.assertRaises(TimeoutError):
+            client.wait_for_task(NODE, upid, timeout=0.1)
+            
+    def test_connections_stay_within_pool_size(self):
+        client = self.client(pool_size=4)
+        _, vms, failed = self.provision(client, vm_names('lab-', 12), workers=4)
+        
+        self.assertEqual(failed, 0)
+        self.assertLessEqual(client.connections_opened, 4)
+        self.assertLessEqual(self.server.connections, 4)
+        self.assertGreater(client.requests, client.connections_opened)
+
+class RetryTest(unittest.TestCase):
+    
+    def test_post_is_not_resent_after_the_connection_drops(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _DroppingHandler)
+        server.daemon_threads = True
+        server.posts = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = ProxmoxClient(f"http://127.0.0.1:{server.server_port}", 'test@pve!token', 'secret', pool_size=1)
+        self.addCleanup(client.close)
+        
+        client.request('GET', '/version')  # Leaves a keep-alive connection in the pool
+        with self.assertRaises(http.client.RemoteDisconnected):
+            client.request('POST', f"/nodes/{NODE}/qemu/{DEFAULT_TEMPLATE_VMID}/clone", {'newid': 200})
+        self.assertEqual(server.posts, 1)
+
+if __name__ == "__main__":
+    unittest.main()
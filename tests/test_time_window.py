@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Time-window tests - grading --since/--until through the TimeIndex and by reading the whole log
+Usage: python3 -m unittest discover tests
+"""
+
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from grade_labs import LabGrader, TIME_INDEX_BLOCK_BYTES
+
+class TimeWindowTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.log_file = Path(temp_dir.name) / 'labresults.log'
+        
+    def grade(self, log_file, since=None, until=None):
+        grader = LabGrader(log_file, since=since, until=until)
+        grader.parse_log_file()
+        return [(result['line_number'], result['status'], result['message']) for result in grader.results]
+        
+    def test_indexed_and_full_scan_agree_on_unparseable_timestamps(self):
+        # The unparseable line starts a block of older results, so the index's bounds for it are in the past
+        old_line = "Tue Jul  1 09:00:00 UTC 2025: FAIL: User eric does not exist\n"
+        with open(self.log_file, 'w') as f:
+            f.write("Tue Jul 22 08:00:00 EDT 2025: PASS: Repository file exists\n")
+            f.write(old_line * (TIME_INDEX_BLOCK_BYTES // len(old_line) + 1))
+            f.write("Mon Jul 21 10:00:00 UTC 2025: PASS: User eric exists\n")
+            f.write("Mon Jul 21 11:00:00 UTC 2025: PASS: User sally exists\n")
+        full_scan = self.log_file.with_name('labresults.lo[g]')  # A glob is read in full, without the index
+        
+        for since, until in ((datetime(2025, 7, 21, 10, 30), None), (datetime(2025, 7, 21), datetime(2025, 7, 22)),
+                             (None, datetime(2025, 7, 2)), (datetime(2025, 7, 1), None)):
+            with self.subTest(since=since, until=until):
+                indexed = self.grade(self.log_file, since, until)
+                self.assertEqual(indexed, self.grade(full_scan, since, until))
+                self.assertNotIn('Repository file exists', [message for _, _, message in indexed])
+
+if __name__ == "__main__":
+    unittest.main()